@@ -1,15 +1,85 @@
-from .units import Unit, Pikeman, Archer, Knight
-from .civilizations import Civilization, CivilizationConfig
-from .army import Army, InsufficientGoldError, InsufficientUnitsError, InvalidTransformationError
-from .battle import BattleSystem, BattleRecord, BattleResult
+import os
+from importlib import import_module
 
-__all__ = [
+# Public names and the submodule defining them. Submodules are imported on
+# first attribute access so short-lived processes only pay for what they use.
+_EXPORTS = {
     # Units
-    'Unit', 'Pikeman', 'Archer', 'Knight',
+    'units': ('Unit', 'Pikeman', 'Archer', 'Knight', 'AgingRule'),
     # Civilizations
-    'Civilization', 'CivilizationConfig',
+    'civilizations': ('Civilization', 'CivilizationConfig'),
+    # Catalog
+    'catalog': ('CivilizationCatalog', 'CatalogCivilization', 'CatalogError', 'default_catalog'),
     # Army
-    'Army', 'InsufficientGoldError', 'InsufficientUnitsError', 'InvalidTransformationError',
+    'army': ('Army', 'InsufficientGoldError', 'InsufficientUnitsError', 'InvalidTransformationError'),
     # Battle
-    'BattleSystem', 'BattleRecord', 'BattleResult'
-] 
\ No newline at end of file
+    'battle': ('BattleSystem', 'BattleRecord', 'BattleResult', 'BattleOutcome', 'BattlePrediction',
+               'CoalitionOutcome'),
+    # Battle rule sets
+    'rules': ('RuleSet', 'LossPolicy', 'BatchOutcome'),
+    # Outcome cache
+    'outcome_cache': ('BattleOutcomeCache',),
+    # Ladder
+    'ladder': ('RatingLadder',),
+    # Matchmaking
+    'matchmaking': ('MatchmakingIndex',),
+    # Campaign
+    'campaign': ('CampaignSimulator', 'CampaignResult'),
+    # Shared storage
+    'shared_storage': ('SharedArmyStore', 'SharedStorageError'),
+    # Aging
+    'aging': ('WorldClock', 'AgingReport', 'age_armies'),
+    # Transactions
+    'transaction': ('ArmyTransaction', 'TransactionResult', 'TransactionError'),
+    # Formations
+    'formations': ('FormationTree', 'Formation', 'FormationError'),
+    # Events
+    'events': ('EventBus', 'Subscription', 'OverflowPolicy', 'ArmyEvent',
+               'UnitAdded', 'UnitTrained', 'UnitModified', 'UnitTransformed', 'UnitRemoved',
+               'UnitsAged', 'BattleFought', 'ArmyReset', 'BattleResolved', 'CoalitionBattleResolved'),
+    # Unit queries
+    'query': ('UnitQuery',),
+    # Checkpoints
+    'checkpoint': ('ArmyChangeTracker', 'ArmyChanges', 'CheckpointWriter', 'CheckpointError',
+                   'load_checkpoint', 'read_checkpoint'),
+    # Operation log
+    'oplog': ('OperationLog', 'OperationLogError', 'replay'),
+    # Tournaments
+    'tournament': ('TournamentRunner', 'TournamentStanding'),
+    # World pool
+    'world': ('ArmyWorld', 'ArmyHandle', 'EconomyRules', 'TickReport'),
+    # Balance sweeps
+    'sweep': ('CompositionSweep', 'SweepPolicy', 'SweepResult', 'SweepEntry', 'SweepCache',
+              'composition_grid', 'sample_compositions', 'apply_policy'),
+    # Sharding
+    'sharding': ('ShardedWorld', 'ShardStats', 'BattleFront', 'ShardError'),
+    # Profiling
+    'profiling': ('Profiler', 'enable_profiling', 'disable_profiling', 'phase'),
+    # Streaming
+    'streaming': ('stream_battles', 'stream_tournament', 'stream_campaign', 'StreamTally',
+                  'BattleEvent', 'ArmyDelta'),
+    # Scheduling
+    'scheduler': ('EventScheduler', 'SchedulerStats'),
+}
+
+# ARMY_PROFILE (profiling.PROFILE_ENV_VAR) profiles the whole process, so
+# it has to take effect when the package is imported
+if os.environ.get("ARMY_PROFILE"):
+    import_module(".profiling", __name__)
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
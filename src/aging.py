@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Type, TYPE_CHECKING
+
+from .strength_index import UnitKey
+from .units import AgingRule, Unit
+
+if TYPE_CHECKING:
+    from .army import Army
+
+
+@dataclass
+class AgingReport:
+    years: int
+    units_aged: int = 0
+    units_retired: int = 0
+    strength_lost: int = 0
+
+
+class WorldClock:
+    
+    def __init__(self, year: int = 0):
+        self._year = year
+        self._rules: Dict[Type[Unit], AgingRule] = {}
+    
+    @property
+    def year(self) -> int:
+        return self._year
+    
+    def tick(self, armies: Iterable['Army'], years: int = 1) -> AgingReport:
+        if years < 0:
+            raise ValueError("Time cannot run backwards")
+        
+        report = AgingReport(years=years)
+        if years:
+            for army in armies:
+                self._age_army(army, years, report)
+        self._year += years
+        return report
+    
+    def _rule(self, unit: Unit) -> AgingRule:
+        unit_type = unit.__class__
+        rule = self._rules.get(unit_type)
+        if rule is None:
+            rule = self._rules[unit_type] = unit.get_aging_rule()
+        return rule
+    
+    def _age_army(self, army: 'Army', years: int, report: AgingReport) -> None:
+        army._sync()
+        changed: List[UnitKey] = []
+        added: List[UnitKey] = []
+        kept: List[Unit] = []
+        strength_before = army._strength_total
+        observers = army._unit_observers
+        for observer in observers:
+            observer.units_aged(years)
+        
+        # One pass over the unit list; only units that actually lose strength
+        # or retire touch the army's aggregates
+        for unit in army._units:
+            rule = self._rule(unit)
+            age = unit._age_in_years + years
+            unit._age_in_years = age
+            
+            if rule.is_retired(age):
+                changed.append((unit.__class__.__name__, unit.total_strength))
+                for observer in observers:
+                    observer.unit_removed(unit)
+                continue
+            
+            kept.append(unit)
+            penalty = rule.penalty(age, unit._base_strength)
+            if penalty != unit._age_penalty:
+                changed.append((unit.__class__.__name__, unit.total_strength))
+                unit._age_penalty = penalty
+                added.append((unit.__class__.__name__, unit.total_strength))
+                for observer in observers:
+                    observer.unit_modified(unit)
+        
+        report.units_aged += len(army._units)
+        report.units_retired += len(army._units) - len(kept)
+        if not changed:
+            return
+        
+        if len(kept) != len(army._units):
+            army._units[:] = kept
+        for key in changed:
+            army._untrack(key)
+        for key in added:
+            army._track(key)
+        report.strength_lost += strength_before - army._strength_total
+        army._notify_strength_watchers()
+
+
+def age_armies(armies: Iterable['Army'], years: int = 1) -> AgingReport:
+    return WorldClock().tick(armies, years)
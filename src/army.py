@@ -1,7 +1,16 @@
-from typing import List, Optional, Dict, Type
+from typing import Callable, Iterable, List, Optional, Dict, Type, Tuple, FrozenSet, TYPE_CHECKING
 from .units import Unit, Pikeman, Archer, Knight
 from .civilizations import Civilization
+from .catalog import AnyCivilization, civilization_id, unit_template
+from .strength_index import StrengthIndex, TYPE_RANK, UnitKey, unit_key
 from .battle import BattleRecord, BattleSystem
+from .observers import ArmyObserver
+
+if TYPE_CHECKING:
+    from .event_bus import EventBus
+    from .events import ArmyEventPublisher
+    from .query import UnitIndex, UnitQuery
+    from .outcome_cache import BattleOutcomeCache
 
 
 class InsufficientGoldError(Exception):
@@ -16,22 +25,63 @@ class InvalidTransformationError(Exception):
     pass
 
 
+def _strength_of(unit: Unit) -> int:
+    return unit.total_strength
+
+
 class Army:
     INITIAL_GOLD = 1000
     
-    def __init__(self, civilization: Civilization):
+    def __init__(self, civilization: AnyCivilization):
+        self._setup(civilization, self.INITIAL_GOLD)
+        
+        # Initialize units based on civilization
+        self._initialize_units()
+    
+    @classmethod
+    def from_units(cls, civilization: AnyCivilization, units: Iterable[Unit],
+                   gold: int = INITIAL_GOLD) -> 'Army':
+        army = cls.__new__(cls)
+        army._setup(civilization, gold)
+        army._units = list(units)
+        army._rebuild_aggregates()
+        return army
+    
+    def _setup(self, civilization: AnyCivilization, gold: int) -> None:
         self._civilization = civilization
-        self._gold = self.INITIAL_GOLD
+        self._civilization_id = civilization_id(civilization)
+        self._civilization_name = str(civilization)
+        self._gold = gold
         self._units: List[Unit] = []
         self._battle_history: List[BattleRecord] = []
         
-        # Initialize units based on civilization
-        self._initialize_units()
+        # Aggregates maintained incrementally by the Army mutators; they are
+        # rebuilt if the unit list is replaced or resized behind our back
+        self._histogram: Dict[UnitKey, int] = {}
+        self._strength_index = StrengthIndex(self._histogram)
+        self._strength_total = 0
+        self._tracked_units: Optional[List[Unit]] = None
+        self._tracked_len = 0
+        self._state_key: Optional[FrozenSet[Tuple[UnitKey, int]]] = None
+        
+        # Called with the army after any mutation that may change its strength
+        self._strength_watchers: List[Callable[['Army'], None]] = []
+        
+        # Told about every unit-level change (ArmyChangeTracker, UnitIndex, ...)
+        self._unit_observers: List[ArmyObserver] = []
+        # Queries and events load their modules on first use
+        self._unit_index: Optional['UnitIndex'] = None
+        self._event_bus: Optional['EventBus'] = None
+        self._event_publisher: Optional['ArmyEventPublisher'] = None
     
     @property
-    def civilization(self) -> Civilization:
+    def civilization(self) -> AnyCivilization:
         return self._civilization
     
+    @property
+    def civilization_id(self) -> int:
+        return self._civilization_id
+    
     @property
     def gold(self) -> int:
         return self._gold
@@ -46,7 +96,8 @@ class Army:
     
     @property
     def total_strength(self) -> int:
-        return sum(unit.total_strength for unit in self._units)
+        self._sync()
+        return self._strength_total
     
     @property
     def unit_count(self) -> int:
@@ -61,6 +112,21 @@ class Army:
     def get_units_by_type(self, unit_type: Type[Unit]) -> List[Unit]:
         return [unit for unit in self._units if isinstance(unit, unit_type)]
     
+    @property
+    def events(self) -> 'EventBus':
+        # Events are only produced while the bus has subscribers
+        if self._event_bus is None:
+            from .event_bus import EventBus
+            self._event_bus = EventBus(self._set_event_publishing)
+        return self._event_bus
+    
+    def query(self) -> 'UnitQuery':
+        # The secondary index is built on the first query and kept current
+        from .query import UnitIndex, UnitQuery
+        if self._unit_index is None:
+            self._unit_index = UnitIndex(self)
+        return UnitQuery(self._unit_index)
+    
     def train_unit(self, unit: Unit) -> None:
         if unit not in self._units:
             raise ValueError("Unit is not part of this army")
@@ -71,8 +137,15 @@ class Army:
                 f"Not enough gold for training. Need {cost}, have {self._gold}"
             )
         
+        self._sync()
+        old_key = unit_key(unit)
         training_cost = unit.train()
         self._gold -= training_cost
+        self._untrack(old_key)
+        self._track(unit_key(unit))
+        for observer in self._unit_observers:
+            observer.unit_trained(unit)
+        self._notify_strength_watchers()
     
     def train_all_units_of_type(self, unit_type: Type[Unit]) -> int:
         units_to_train = self.get_units_by_type(unit_type)
@@ -116,7 +189,9 @@ class Army:
             )
         
         # Remove old unit and create new one
+        self._sync()
         self._units.remove(unit)
+        self._untrack(unit_key(unit))
         # Create new unit based on target type
         if target_type == "Archer":
             new_unit = Archer(unit.age_in_years)
@@ -125,44 +200,327 @@ class Army:
         else:
             new_unit = Pikeman(unit.age_in_years)
         self._units.append(new_unit)
+        self._track(unit_key(new_unit))
         self._gold -= transformation_cost
+        for observer in self._unit_observers:
+            observer.unit_transformed(unit, new_unit)
+        self._notify_strength_watchers()
         
         return new_unit
     
-    def attack(self, target_army: 'Army') -> None:
-        BattleSystem.resolve_battle(self, target_army)
+    def split(self, count: Optional[int] = None, unit_types: Optional[Dict[Type[Unit], int]] = None,
+              strength: Optional[int] = None, gold: int = 0) -> 'Army':
+        # Detaches units into a new army of the same civilization: the last
+        # `count` units, the last units of each requested type, or units from
+        # the end of the list until their strength reaches `strength`
+        if sum(option is not None for option in (count, unit_types, strength)) != 1:
+            raise ValueError("Specify exactly one of count, unit_types or strength")
+        if gold < 0:
+            raise ValueError("Detachment gold cannot be negative")
+        if gold > self._gold:
+            raise InsufficientGoldError(
+                f"Not enough gold for detachment. Need {gold}, have {self._gold}"
+            )
+        
+        self._sync()
+        units = self._units
+        if unit_types is not None:
+            kept, detached = self._select_by_type(unit_types)
+        else:
+            if count is not None:
+                if not 0 <= count <= len(units):
+                    raise InsufficientUnitsError(
+                        f"Cannot detach {count} units from an army of {len(units)}"
+                    )
+                split_at = len(units) - count
+            else:
+                split_at = len(units)
+                detached_strength = 0
+                while split_at > 0 and detached_strength < strength:
+                    split_at -= 1
+                    detached_strength += units[split_at].total_strength
+                if detached_strength < strength:
+                    raise InsufficientUnitsError(
+                        f"Army strength {detached_strength} is below the requested {strength}"
+                    )
+            kept, detached = units[:split_at], units[split_at:]
+        
+        # Only the smaller side is re-keyed; the other side's histogram is the
+        # difference from the current one
+        if len(detached) <= len(kept):
+            detached_histogram = self._histogram_of(detached)
+            kept_histogram = self._subtract_histogram(detached_histogram)
+        else:
+            kept_histogram = self._histogram_of(kept)
+            detached_histogram = self._subtract_histogram(kept_histogram)
+        
+        detachment = Army.__new__(Army)
+        detachment._setup(self._civilization, gold)
+        detachment._units = detached
+        detachment._set_aggregates(detached_histogram)
+        
+        units[:] = kept
+        self._gold -= gold
+        self._set_aggregates(kept_histogram)
+        return detachment
     
-    def _initialize_units(self) -> None:
-        config = self._civilization.config
+    def merge(self, other: 'Army') -> None:
+        # Absorbs another army of the same civilization, which is left empty
+        if other is self:
+            raise ValueError("An army cannot merge with itself")
+        # Ids are only unique within one catalog; each civilization object
+        # belongs to exactly one, so identity compares the catalog as well
+        if other._civilization is not self._civilization:
+            raise ValueError("Only armies of the same civilization can merge")
         
-        # Create pikemen
-        for _ in range(config.pikemen):
-            self._units.append(Pikeman())
+        self._sync()
+        other._sync()
+        histogram = dict(self._histogram)
+        for key, count in other._histogram.items():
+            histogram[key] = histogram.get(key, 0) + count
         
-        # Create archers
-        for _ in range(config.archers):
-            self._units.append(Archer())
+        self._units.extend(other._units)
+        self._gold += other._gold
+        for record in other._battle_history:
+            self._record_battle(record)
+        other._units.clear()
+        other._gold = 0
+        other._battle_history.clear()
+        other._set_aggregates({})
+        self._set_aggregates(histogram)
+    
+    def strength_after_losses(self, count: int) -> int:
+        self._sync()
+        return self._strength_index.strength_without_top(count)
+    
+    def state_fingerprint(self) -> Tuple[int, FrozenSet[Tuple[UnitKey, int]]]:
+        self._sync()
+        if self._state_key is None:
+            self._state_key = frozenset(self._histogram.items())
+        return (self._gold, self._state_key)
+    
+    def add_strength_watcher(self, watcher: Callable[['Army'], None]) -> None:
+        self._strength_watchers.append(watcher)
+    
+    def remove_strength_watcher(self, watcher: Callable[['Army'], None]) -> None:
+        self._strength_watchers.remove(watcher)
+    
+    def attack(self, target_army: 'Army', cache: Optional['BattleOutcomeCache'] = None) -> None:
+        BattleSystem.resolve_battle(self, target_army, cache=cache)
+    
+    def _initialize_units(self) -> None:
+        # Unit templates are precomputed per civilization composition
+        self._units = [unit_class() for unit_class in unit_template(self._civilization)]
+        self._rebuild_aggregates()
+    
+    def _set_event_publishing(self, active: bool) -> None:
+        if active:
+            from .events import ArmyEventPublisher
+            self._event_publisher = ArmyEventPublisher(self, self._event_bus)
+            self._unit_observers.append(self._event_publisher)
+        else:
+            self._unit_observers.remove(self._event_publisher)
+            self._event_publisher = None
+    
+    def _record_battle(self, record: BattleRecord) -> None:
+        self._battle_history.append(record)
+        for observer in self._unit_observers:
+            observer.battle_recorded(record)
+    
+    def _forget_battle(self) -> BattleRecord:
+        record = self._battle_history.pop()
+        for observer in self._unit_observers:
+            observer.battle_forgotten(record)
+        return record
+    
+    def _rebuild_aggregates(self) -> None:
+        self._set_aggregates(self._histogram_of(self._units))
+    
+    @staticmethod
+    def _histogram_of(units: Iterable[Unit]) -> Dict[UnitKey, int]:
+        histogram: Dict[UnitKey, int] = {}
+        for unit in units:
+            key = unit_key(unit)
+            histogram[key] = histogram.get(key, 0) + 1
+        return histogram
+    
+    def _subtract_histogram(self, part: Dict[UnitKey, int]) -> Dict[UnitKey, int]:
+        histogram = dict(self._histogram)
+        for key, count in part.items():
+            remaining = histogram[key] - count
+            if remaining:
+                histogram[key] = remaining
+            else:
+                del histogram[key]
+        return histogram
+    
+    def _select_by_type(self, unit_types: Dict[Type[Unit], int]) -> Tuple[List[Unit], List[Unit]]:
+        # Takes the last units of each type; both sides keep their list order
+        wanted = dict(unit_types)
+        if any(count < 0 for count in wanted.values()):
+            raise ValueError("Unit counts cannot be negative")
+        kept: List[Unit] = []
+        detached: List[Unit] = []
+        for unit in reversed(self._units):
+            for unit_type, count in wanted.items():
+                if count and isinstance(unit, unit_type):
+                    wanted[unit_type] = count - 1
+                    detached.append(unit)
+                    break
+            else:
+                kept.append(unit)
         
-        # Create knights
-        for _ in range(config.knights):
-            self._units.append(Knight())
+        missing = {unit_type.__name__: count for unit_type, count in wanted.items() if count}
+        if missing:
+            raise InsufficientUnitsError(f"Not enough units to detach: missing {missing}")
+        kept.reverse()
+        detached.reverse()
+        return kept, detached
     
-    def _remove_strongest_units(self, count: int) -> int:
-        if not self._units:
+    def _set_aggregates(self, histogram: Dict[UnitKey, int]) -> None:
+        self._histogram = histogram
+        self._strength_index = StrengthIndex(histogram)
+        self._strength_total = sum(key[1] * count for key, count in histogram.items())
+        self._tracked_units = self._units
+        self._tracked_len = len(self._units)
+        self._state_key = None
+        for observer in self._unit_observers:
+            observer.resync()
+        self._notify_strength_watchers()
+    
+    def _sync(self) -> None:
+        if self._tracked_units is not self._units or self._tracked_len != len(self._units):
+            self._rebuild_aggregates()
+    
+    def _notify_strength_watchers(self) -> None:
+        for watcher in self._strength_watchers:
+            watcher(self)
+    
+    def _track(self, key: UnitKey) -> None:
+        count = self._histogram.get(key, 0)
+        self._histogram[key] = count + 1
+        if count:
+            self._strength_index.mark_dirty()
+        else:
+            self._strength_index.bucket_added(key)
+        self._strength_total += key[1]
+        self._tracked_len = len(self._units)
+        self._state_key = None
+    
+    def _untrack(self, key: UnitKey) -> None:
+        remaining = self._histogram[key] - 1
+        if remaining:
+            self._histogram[key] = remaining
+            self._strength_index.mark_dirty()
+        else:
+            del self._histogram[key]
+            self._strength_index.bucket_removed(key)
+        self._strength_total -= key[1]
+        self._tracked_len = len(self._units)
+        self._state_key = None
+    
+    def _strongest_keys(self, count: int, skip: int = 0) -> Tuple[UnitKey, ...]:
+        # Equal strengths are broken by unit class, so the keys depend only on
+        # the histogram and outcomes built from them can be cached
+        self._sync()
+        return self._strength_index.top_keys(count, skip)
+    
+    def _ordered_strongest_keys(self, count: int, skip: int = 0) -> Tuple[UnitKey, ...]:
+        # Same ranks, but equal strengths keep their unit list order; only
+        # strengths shared by several unit types need the list
+        keys = self._strongest_keys(count, skip)
+        histogram = self._histogram
+        for strength in {key[1] for key in keys}:
+            if sum((type_name, strength) in histogram for type_name in TYPE_RANK) > 1:
+                ranked = sorted(self._units, key=_strength_of, reverse=True)
+                return tuple(unit_key(unit) for unit in ranked[skip:skip + count])
+        return keys
+    
+    def _units_for_keys(self, keys: Tuple[UnitKey, ...],
+                        skipped: Tuple[UnitKey, ...] = ()) -> List[Unit]:
+        # The units _remove_units_by_keys would take, after `skipped` are gone
+        self._sync()
+        skip: Dict[UnitKey, int] = {}
+        for key in skipped:
+            skip[key] = skip.get(key, 0) + 1
+        pending: Dict[UnitKey, int] = {}
+        for key in keys:
+            pending[key] = pending.get(key, 0) + 1
+        
+        selected: List[Unit] = []
+        for unit in self._units:
+            if len(selected) == len(keys):
+                break
+            key = unit_key(unit)
+            if skip.get(key):
+                skip[key] -= 1
+            elif pending.get(key):
+                pending[key] -= 1
+                selected.append(unit)
+        return selected
+    
+    def _remove_units_by_keys(self, keys: Tuple[UnitKey, ...]) -> int:
+        if not keys:
             return 0
         
-        # Sort units by strength (descending) and remove the strongest ones
-        self._units.sort(key=lambda u: u.total_strength, reverse=True)
-        units_to_remove = min(count, len(self._units))
+        self._sync()
+        pending: Dict[UnitKey, int] = {}
+        for key in keys:
+            pending[key] = pending.get(key, 0) + 1
+        
+        # Units within a bucket are removed in list order; the rest keep their order
+        observers = self._unit_observers
+        kept: List[Unit] = []
+        removed: List[UnitKey] = []
+        for unit in self._units:
+            key = unit_key(unit)
+            if pending.get(key):
+                pending[key] -= 1
+                removed.append(key)
+                for observer in observers:
+                    observer.unit_removed(unit)
+            else:
+                kept.append(unit)
         
-        for _ in range(units_to_remove):
-            self._units.pop(0)
+        # Losses leave the survivors strongest first, equal strengths in their
+        # previous order
+        kept.sort(key=_strength_of, reverse=True)
+        self._units[:] = kept
+        for key in removed:
+            self._untrack(key)
+        for observer in observers:
+            observer.units_reordered()
+        self._notify_strength_watchers()
+        return len(removed)
+    
+    def _discard_units(self, units: Iterable[Unit]) -> int:
+        self._sync()
+        removed = {id(unit) for unit in units}
+        observers = self._unit_observers
+        kept: List[Unit] = []
+        keys: List[UnitKey] = []
+        for unit in self._units:
+            if id(unit) in removed:
+                keys.append(unit_key(unit))
+                for observer in observers:
+                    observer.unit_removed(unit)
+            else:
+                kept.append(unit)
+        if not keys:
+            return 0
         
-        return units_to_remove
+        self._units[:] = kept
+        for key in keys:
+            self._untrack(key)
+        self._notify_strength_watchers()
+        return len(keys)
+    
+    def _remove_strongest_units(self, count: int) -> int:
+        return self._remove_units_by_keys(self._ordered_strongest_keys(count))
     
     def __str__(self) -> str:
         unit_counts = self.get_unit_counts()
-        return (f"{self._civilization} Army: "
+        return (f"{self._civilization_name} Army: "
                 f"{unit_counts['Pikeman']} Pikemen, "
                 f"{unit_counts['Archer']} Archers, "
                 f"{unit_counts['Knight']} Knights "
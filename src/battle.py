@@ -1,9 +1,16 @@
-from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING
+import heapq
+from itertools import islice
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
 from enum import Enum
 
+from .event_bus import EventBus
+from .strength_index import TYPE_RANK
+
 if TYPE_CHECKING:
     from .army import Army
+    from .outcome_cache import BattleOutcomeCache
+    from .units import Unit
 
 
 class BattleResult(Enum):
@@ -20,6 +27,7 @@ class BattleRecord:
     opponent_strength: int
     gold_gained: int
     units_lost: int
+    opponent_civilization_id: Optional[int] = None
     
     def __str__(self) -> str:
         return (f"Battle vs {self.opponent_civilization}: {self.result.value} "
@@ -27,73 +35,272 @@ class BattleRecord:
                 f"Gold: {self.gold_gained:+d}, Units lost: {self.units_lost}")
 
 
+@dataclass(frozen=True)
+class BattleOutcome:
+    # Result and removals are expressed from army1's point of view
+    result: BattleResult
+    army1_strength: int
+    army2_strength: int
+    army1_gold_gained: int
+    army2_gold_gained: int
+    army1_removed: Tuple[Tuple[str, int], ...]
+    army2_removed: Tuple[Tuple[str, int], ...]
+    
+    @property
+    def margin(self) -> int:
+        return self.army1_strength - self.army2_strength
+
+
+@dataclass(frozen=True)
+class BattlePrediction:
+    army1: 'Army'
+    army2: 'Army'
+    outcome: BattleOutcome
+    army1_losses: int = 0
+    army2_losses: int = 0
+    
+    @property
+    def winner(self) -> Optional['Army']:
+        if self.outcome.result == BattleResult.WIN:
+            return self.army1
+        if self.outcome.result == BattleResult.LOSS:
+            return self.army2
+        return None
+    
+    @property
+    def margin(self) -> int:
+        return self.outcome.margin
+    
+    def army1_removed_units(self) -> List['Unit']:
+        return self.army1._units_for_keys(self.outcome.army1_removed,
+                                          self.army1._ordered_strongest_keys(self.army1_losses))
+    
+    def army2_removed_units(self) -> List['Unit']:
+        return self.army2._units_for_keys(self.outcome.army2_removed,
+                                          self.army2._ordered_strongest_keys(self.army2_losses))
+
+
+@dataclass(frozen=True)
+class CoalitionOutcome:
+    # Result from side1's point of view; per-army tuples follow side order
+    result: BattleResult
+    side1_strength: int
+    side2_strength: int
+    side1_gold_gained: Tuple[int, ...]
+    side2_gold_gained: Tuple[int, ...]
+    side1_removed: Tuple[Tuple[Tuple[str, int], ...], ...]
+    side2_removed: Tuple[Tuple[Tuple[str, int], ...], ...]
+
+
+def _split_reward(total: int, weights: Sequence[int]) -> Tuple[int, ...]:
+    # Proportional integer split using largest remainders
+    weight_sum = sum(weights)
+    if weight_sum <= 0:
+        weights = [1] * len(weights)
+        weight_sum = len(weights)
+    shares = [total * weight // weight_sum for weight in weights]
+    leftover = total - sum(shares)
+    by_remainder = sorted(range(len(weights)),
+                          key=lambda i: (-(total * weights[i] % weight_sum), i))
+    for i in by_remainder[:leftover]:
+        shares[i] += 1
+    return tuple(shares)
+
+
+def _coalition_losses(armies: Sequence['Army'], count: int) -> Tuple[Tuple[Tuple[str, int], ...], ...]:
+    # The `count` strongest units across all allies: each army's own top
+    # `count` keys, merged strongest first (knights first, then earlier
+    # allies, on equal strength)
+    ranked = [[(i, key) for key in army._ordered_strongest_keys(count)]
+              for i, army in enumerate(armies)]
+    removed: List[List[Tuple[str, int]]] = [[] for _ in armies]
+    merged = heapq.merge(*ranked, key=lambda item: (-item[1][1], -TYPE_RANK[item[1][0]]))
+    for i, key in islice(merged, max(count, 0)):
+        removed[i].append(key)
+    return tuple(tuple(keys) for keys in removed)
+
+
+def _side_name(armies: Sequence['Army']) -> Tuple[str, Optional[int]]:
+    civilization_ids = {army._civilization_id for army in armies}
+    if len(civilization_ids) == 1:
+        return armies[0]._civilization_name, armies[0]._civilization_id
+    names = sorted({army._civilization_name for army in armies})
+    return f"Coalition({', '.join(names)})", None
+
+
+_OPPOSITE_RESULT = {
+    BattleResult.WIN: BattleResult.LOSS,
+    BattleResult.LOSS: BattleResult.WIN,
+    BattleResult.TIE: BattleResult.TIE,
+}
+
+
 class BattleSystem:
     
     WINNER_GOLD_REWARD = 100
     UNITS_LOST_ON_DEFEAT = 2
     
+    # Publishes a BattleResolved for every resolve_battle call and a
+    # CoalitionBattleResolved for every resolve_coalition_battle call
+    events = EventBus()
+    
+    # Whether losses are the strongest units, so uncached battles may pick
+    # equal-strength losses in unit list order
+    _STRONGEST_LOSSES = True
+    
+    # Whether an outcome depends only on the armies' state, so it may be
+    # served from a BattleOutcomeCache
+    _DETERMINISTIC = True
+    
+    @classmethod
+    def resolve_battle(cls, army1: 'Army', army2: 'Army',
+                       cache: Optional['BattleOutcomeCache'] = None) -> BattleOutcome:
+        if cache is None:
+            outcome = cls.compute_outcome(army1, army2)
+        elif not cls._DETERMINISTIC:
+            raise ValueError("Battles with random losses cannot be cached")
+        else:
+            key = (cls, army1.state_fingerprint(), army2.state_fingerprint())
+            outcome = cache.get(key)
+            if outcome is None:
+                outcome = cls.compute_outcome(army1, army2)
+                cache.put(key, outcome)
+        # Cached or not, equal-strength losses are taken in unit list order
+        outcome = cls._in_list_order(army1, army2, outcome)
+        
+        cls.apply_outcome(army1, army2, outcome)
+        if cls.events.active:
+            from .events import BattleResolved
+            cls.events.publish(BattleResolved(army1, army2, outcome))
+        return outcome
+    
     @classmethod
-    def resolve_battle(cls, army1: 'Army', army2: 'Army') -> None:
-        army1_strength = army1.total_strength
-        army2_strength = army2.total_strength
+    def compute_outcome(cls, army1: 'Army', army2: 'Army',
+                        army1_losses: int = 0, army2_losses: int = 0) -> BattleOutcome:
+        # The losses arguments evaluate the battle as if each army had
+        # already lost that many of its strongest units
+        army1_strength = army1.strength_after_losses(army1_losses)
+        army2_strength = army2.strength_after_losses(army2_losses)
         
         if army1_strength > army2_strength:
-            cls._handle_victory(army1, army2, army1_strength, army2_strength)
+            return BattleOutcome(BattleResult.WIN, army1_strength, army2_strength,
+                                 cls.WINNER_GOLD_REWARD, 0,
+                                 (), army2._strongest_keys(cls.UNITS_LOST_ON_DEFEAT, army2_losses))
         elif army2_strength > army1_strength:
-            cls._handle_victory(army2, army1, army2_strength, army1_strength)
+            return BattleOutcome(BattleResult.LOSS, army1_strength, army2_strength,
+                                 0, cls.WINNER_GOLD_REWARD,
+                                 army1._strongest_keys(cls.UNITS_LOST_ON_DEFEAT, army1_losses), ())
         else:
-            cls._handle_tie(army1, army2, army1_strength)
+            return BattleOutcome(BattleResult.TIE, army1_strength, army2_strength, 0, 0,
+                                 army1._strongest_keys(1, army1_losses),
+                                 army2._strongest_keys(1, army2_losses))
     
     @classmethod
-    def _handle_victory(cls, winner: 'Army', loser: 'Army', 
-                       winner_strength: int, loser_strength: int) -> None:
-        winner._gold += cls.WINNER_GOLD_REWARD
-        
-        units_lost = loser._remove_strongest_units(cls.UNITS_LOST_ON_DEFEAT)
-        
-        winner_record = BattleRecord(
-            opponent_civilization=str(loser.civilization),
-            result=BattleResult.WIN,
-            own_strength=winner_strength,
-            opponent_strength=loser_strength,
-            gold_gained=cls.WINNER_GOLD_REWARD,
-            units_lost=0
-        )
-        
-        loser_record = BattleRecord(
-            opponent_civilization=str(winner.civilization),
-            result=BattleResult.LOSS,
-            own_strength=loser_strength,
-            opponent_strength=winner_strength,
-            gold_gained=0,
-            units_lost=units_lost
-        )
-        
-        winner._battle_history.append(winner_record)
-        loser._battle_history.append(loser_record)
+    def predict(cls, army1: 'Army', army2: 'Army',
+                army1_losses: int = 0, army2_losses: int = 0) -> BattlePrediction:
+        outcome = cls.compute_outcome(army1, army2, army1_losses, army2_losses)
+        outcome = cls._in_list_order(army1, army2, outcome, army1_losses, army2_losses)
+        return BattlePrediction(army1, army2, outcome, army1_losses, army2_losses)
+    
+    @classmethod
+    def _in_list_order(cls, army1: 'Army', army2: 'Army', outcome: BattleOutcome,
+                       army1_losses: int = 0, army2_losses: int = 0) -> BattleOutcome:
+        # compute_outcome breaks equal strengths by unit class so outcomes can
+        # be cached by fingerprint; the losses actually applied follow the
+        # unit list as they always have. Strengths and gold are unchanged.
+        if not cls._STRONGEST_LOSSES:
+            return outcome
+        removed1 = army1._ordered_strongest_keys(len(outcome.army1_removed), army1_losses)
+        removed2 = army2._ordered_strongest_keys(len(outcome.army2_removed), army2_losses)
+        if removed1 == outcome.army1_removed and removed2 == outcome.army2_removed:
+            return outcome
+        return replace(outcome, army1_removed=removed1, army2_removed=removed2)
+    
+    @classmethod
+    def apply_outcome(cls, army1: 'Army', army2: 'Army', outcome: BattleOutcome) -> None:
+        cls.apply_side(army1, outcome.result, outcome.army1_strength, outcome.army2_strength,
+                       outcome.army1_gold_gained, outcome.army1_removed,
+                       army2._civilization_name, army2._civilization_id)
+        cls.apply_side(army2, _OPPOSITE_RESULT[outcome.result], outcome.army2_strength,
+                       outcome.army1_strength, outcome.army2_gold_gained, outcome.army2_removed,
+                       army1._civilization_name, army1._civilization_id)
+    
+    @classmethod
+    def apply_side(cls, army: 'Army', result: BattleResult, own_strength: int,
+                   opponent_strength: int, gold_gained: int, removed: Tuple[Tuple[str, int], ...],
+                   opponent_name: str, opponent_id: Optional[int]) -> int:
+        # Applies one army's share of an outcome; the opponent is only named,
+        # so it may live elsewhere (another coalition member, another process)
+        army._gold += gold_gained
+        units_lost = army._remove_units_by_keys(removed)
+        army._record_battle(BattleRecord(
+            opponent_civilization=opponent_name,
+            result=result,
+            own_strength=own_strength,
+            opponent_strength=opponent_strength,
+            gold_gained=gold_gained,
+            units_lost=units_lost,
+            opponent_civilization_id=opponent_id
+        ))
+        return units_lost
+    
+    @classmethod
+    def resolve_coalition_battle(cls, side1: Sequence['Army'],
+                                 side2: Sequence['Army']) -> CoalitionOutcome:
+        outcome = cls.compute_coalition_outcome(side1, side2)
+        cls.apply_coalition_outcome(side1, side2, outcome)
+        if cls.events.active:
+            from .events import CoalitionBattleResolved
+            cls.events.publish(CoalitionBattleResolved(tuple(side1), tuple(side2), outcome))
+        return outcome
     
     @classmethod
-    def _handle_tie(cls, army1: 'Army', army2: 'Army', strength: int) -> None:
-        units_lost_1 = army1._remove_strongest_units(1)
-        units_lost_2 = army2._remove_strongest_units(1)
+    def compute_coalition_outcome(cls, side1: Sequence['Army'],
+                                  side2: Sequence['Army']) -> CoalitionOutcome:
+        # One pass per side: a 1-vs-1 coalition resolves exactly like
+        # resolve_battle; larger losing sides lose UNITS_LOST_ON_DEFEAT units
+        # per army, taken from the strongest units across the alliance
+        if not side1 or not side2:
+            raise ValueError("Both sides need at least one army")
+        if len({id(army) for army in side1} | {id(army) for army in side2}) != len(side1) + len(side2):
+            raise ValueError("An army can only appear once in a coalition battle")
         
-        army1_record = BattleRecord(
-            opponent_civilization=str(army2.civilization),
-            result=BattleResult.TIE,
-            own_strength=strength,
-            opponent_strength=strength,
-            gold_gained=0,
-            units_lost=units_lost_1
-        )
+        strengths1 = [army.total_strength for army in side1]
+        strengths2 = [army.total_strength for army in side2]
+        total1 = sum(strengths1)
+        total2 = sum(strengths2)
+        no_gold1 = (0,) * len(side1)
+        no_gold2 = (0,) * len(side2)
         
-        army2_record = BattleRecord(
-            opponent_civilization=str(army1.civilization),
-            result=BattleResult.TIE,
-            own_strength=strength,
-            opponent_strength=strength,
-            gold_gained=0,
-            units_lost=units_lost_2
+        if total1 > total2:
+            return CoalitionOutcome(
+                BattleResult.WIN, total1, total2,
+                _split_reward(cls.WINNER_GOLD_REWARD, strengths1), no_gold2,
+                ((),) * len(side1),
+                _coalition_losses(side2, cls.UNITS_LOST_ON_DEFEAT * len(side2)))
+        elif total2 > total1:
+            return CoalitionOutcome(
+                BattleResult.LOSS, total1, total2,
+                no_gold1, _split_reward(cls.WINNER_GOLD_REWARD, strengths2),
+                _coalition_losses(side1, cls.UNITS_LOST_ON_DEFEAT * len(side1)),
+                ((),) * len(side2))
+        else:
+            return CoalitionOutcome(
+                BattleResult.TIE, total1, total2, no_gold1, no_gold2,
+                _coalition_losses(side1, len(side1)),
+                _coalition_losses(side2, len(side2)))
+    
+    @classmethod
+    def apply_coalition_outcome(cls, side1: Sequence['Army'], side2: Sequence['Army'],
+                                outcome: CoalitionOutcome) -> None:
+        sides = (
+            (side1, outcome.result, outcome.side1_strength, outcome.side2_strength,
+             outcome.side1_gold_gained, outcome.side1_removed, _side_name(side2)),
+            (side2, _OPPOSITE_RESULT[outcome.result], outcome.side2_strength, outcome.side1_strength,
+             outcome.side2_gold_gained, outcome.side2_removed, _side_name(side1)),
         )
-        
-        army1._battle_history.append(army1_record)
-        army2._battle_history.append(army2_record) 
\ No newline at end of file
+        for armies, result, own_strength, opponent_strength, gold, removed, opponent in sides:
+            opponent_name, opponent_id = opponent
+            for army, gold_gained, keys in zip(armies, gold, removed):
+                cls.apply_side(army, result, own_strength, opponent_strength, gold_gained, keys,
+                               opponent_name, opponent_id)
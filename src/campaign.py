@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import List, Optional, TYPE_CHECKING
+
+from .strength_index import UnitKey, unit_key
+from .battle import BattleRecord, BattleResult, BattleSystem
+
+if TYPE_CHECKING:
+    from .army import Army
+
+
+@dataclass
+class CampaignResult:
+    rounds: int
+    winner: Optional['Army']
+    army1_units_lost: int
+    army2_units_lost: int
+    army1_gold_gained: int
+    army2_gold_gained: int
+
+
+class _Side:
+    # Strongest-first unit keys of one army with prefix sums over their
+    # strengths; equal strengths keep their list order, as in army.attack
+
+    def __init__(self, army: 'Army'):
+        self.army = army
+        self.keys: List[UnitKey] = [unit_key(unit) for unit in sorted(
+            army._units, key=lambda unit: unit.total_strength, reverse=True)]
+        self.prefix = [0] + list(accumulate(key[1] for key in self.keys))
+        self.removed = 0
+        self.gold_gained = 0
+        self.records: List[BattleRecord] = []
+
+    @property
+    def remaining(self) -> int:
+        return len(self.keys) - self.removed
+
+    @property
+    def strength(self) -> int:
+        return self.prefix[-1] - self.prefix[self.removed]
+
+    def record(self, opponent: '_Side', result: BattleResult, own_strength: int,
+               opponent_strength: int, gold_gained: int, units_lost: int) -> None:
+        self.records.append(BattleRecord(
+            opponent_civilization=opponent.army._civilization_name,
+            result=result,
+            own_strength=own_strength,
+            opponent_strength=opponent_strength,
+            gold_gained=gold_gained,
+            units_lost=units_lost,
+            opponent_civilization_id=opponent.army._civilization_id
+        ))
+
+
+class CampaignSimulator:
+
+    @classmethod
+    def run(cls, army1: 'Army', army2: 'Army', max_rounds: Optional[int] = None,
+            battle_system: type = BattleSystem) -> CampaignResult:
+        # Equivalent to calling army1.attack(army2) until one side is empty or
+        # max_rounds is reached. Once one side is stronger it keeps winning,
+        # since only the loser's strength drops, so only ties need stepping.
+        if battle_system.UNITS_LOST_ON_DEFEAT <= 0:
+            raise ValueError("Campaigns require battles that remove units")
+        rules = getattr(battle_system, "RULES", None)
+        if rules is not None and not rules.is_classic_campaign:
+            raise ValueError("Campaigns require fixed rewards and strongest-first losses")
+
+        side1 = _Side(army1)
+        side2 = _Side(army2)
+        rounds = 0
+        limit = max_rounds if max_rounds is not None else float('inf')
+
+        while rounds < limit and side1.remaining and side2.remaining:
+            strength1 = side1.strength
+            strength2 = side2.strength
+            if strength1 == strength2:
+                side1.removed += 1
+                side2.removed += 1
+                side1.record(side2, BattleResult.TIE, strength1, strength2, 0, 1)
+                side2.record(side1, BattleResult.TIE, strength2, strength1, 0, 1)
+                rounds += 1
+            elif strength1 > strength2:
+                rounds += cls._fast_forward(side1, side2, limit - rounds, battle_system)
+            else:
+                rounds += cls._fast_forward(side2, side1, limit - rounds, battle_system)
+
+        winner = None
+        if side1.remaining and not side2.remaining:
+            winner = army1
+        elif side2.remaining and not side1.remaining:
+            winner = army2
+
+        for side in (side1, side2):
+            side.army._gold += side.gold_gained
+            side.army._remove_units_by_keys(tuple(side.keys[:side.removed]))
+            for record in side.records:
+                side.army._record_battle(record)
+
+        return CampaignResult(rounds=rounds, winner=winner,
+                              army1_units_lost=side1.removed, army2_units_lost=side2.removed,
+                              army1_gold_gained=side1.gold_gained,
+                              army2_gold_gained=side2.gold_gained)
+
+    @staticmethod
+    def _fast_forward(winner: '_Side', loser: '_Side', rounds_left: float,
+                      battle_system: type) -> int:
+        losses = battle_system.UNITS_LOST_ON_DEFEAT
+        reward = battle_system.WINNER_GOLD_REWARD
+        winner_strength = winner.strength
+
+        # Rounds needed to eliminate the loser, capped by the round limit
+        rounds = int(min(-(-loser.remaining // losses), rounds_left))
+
+        for _ in range(rounds):
+            loser_strength = loser.strength
+            lost = min(losses, loser.remaining)
+            loser.removed += lost
+            winner.record(loser, BattleResult.WIN, winner_strength, loser_strength, reward, 0)
+            loser.record(winner, BattleResult.LOSS, loser_strength, winner_strength, 0, lost)
+
+        winner.gold_gained += reward * rounds
+        return rounds
@@ -0,0 +1,188 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Type, Union
+
+from .civilizations import Civilization, CivilizationConfig
+from .units import Unit, Pikeman, Archer, Knight
+
+
+class CatalogError(Exception):
+    pass
+
+
+UnitTemplate = Tuple[Type[Unit], ...]
+
+
+@dataclass(frozen=True, eq=False)
+class CatalogCivilization:
+    civ_id: int
+    name: str
+    config: CivilizationConfig
+
+    @property
+    def pikemen_count(self) -> int:
+        return self.config.pikemen
+
+    @property
+    def archers_count(self) -> int:
+        return self.config.archers
+
+    @property
+    def knights_count(self) -> int:
+        return self.config.knights
+
+    def __str__(self) -> str:
+        return self.name.title()
+
+
+AnyCivilization = Union[Civilization, CatalogCivilization]
+
+# Built-in members always occupy the first IDs, in declaration order
+BUILTIN_IDS: Dict[Civilization, int] = {civ: i for i, civ in enumerate(Civilization)}
+
+# Parsed catalog files keyed by (path, mtime, size)
+_PARSE_CACHE: Dict[Tuple[str, int, int], List[Tuple[str, int, int, int]]] = {}
+
+# Unit templates shared by every civilization with the same composition
+_TEMPLATE_CACHE: Dict[Tuple[int, int, int], UnitTemplate] = {}
+
+
+def build_template(config: CivilizationConfig) -> UnitTemplate:
+    key = (config.pikemen, config.archers, config.knights)
+    template = _TEMPLATE_CACHE.get(key)
+    if template is None:
+        template = ((Pikeman,) * config.pikemen +
+                    (Archer,) * config.archers +
+                    (Knight,) * config.knights)
+        _TEMPLATE_CACHE[key] = template
+    return template
+
+
+_BUILTIN_TEMPLATES: Dict[Civilization, UnitTemplate] = {
+    civ: build_template(civ.config) for civ in Civilization
+}
+
+
+def civilization_id(civilization: AnyCivilization) -> int:
+    if isinstance(civilization, Civilization):
+        return BUILTIN_IDS[civilization]
+    return civilization.civ_id
+
+
+def unit_template(civilization: AnyCivilization) -> UnitTemplate:
+    if isinstance(civilization, Civilization):
+        return _BUILTIN_TEMPLATES[civilization]
+    return build_template(civilization.config)
+
+
+class CivilizationCatalog:
+
+    def __init__(self):
+        self._entries: List[AnyCivilization] = []
+        self._by_name: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._configs: Dict[Tuple[int, int, int], CivilizationConfig] = {}
+        self._templates: List[UnitTemplate] = []
+
+        for civ in Civilization:
+            self._configs[self._config_key(civ.config)] = civ.config
+            self._append(civ.name, civ, _BUILTIN_TEMPLATES[civ])
+
+    @staticmethod
+    def _config_key(config: CivilizationConfig) -> Tuple[int, int, int]:
+        return (config.pikemen, config.archers, config.knights)
+
+    def _append(self, name: str, civilization: AnyCivilization,
+                template: UnitTemplate) -> None:
+        self._by_name[name] = len(self._entries)
+        self._entries.append(civilization)
+        self._names.append(str(civilization))
+        self._templates.append(template)
+
+    def intern_config(self, pikemen: int, archers: int, knights: int) -> CivilizationConfig:
+        key = (pikemen, archers, knights)
+        config = self._configs.get(key)
+        if config is None:
+            config = CivilizationConfig(pikemen=pikemen, archers=archers, knights=knights)
+            self._configs[key] = config
+        return config
+
+    def register(self, name: str, pikemen: int, archers: int, knights: int) -> CatalogCivilization:
+        name = name.upper()
+        self._check_entry(name, pikemen, archers, knights)
+        config = self.intern_config(pikemen, archers, knights)
+        civilization = CatalogCivilization(civ_id=len(self._entries), name=name, config=config)
+        self._append(name, civilization, build_template(config))
+        return civilization
+
+    def load(self, path: str) -> List[CatalogCivilization]:
+        # The whole file is checked first, so a bad entry registers nothing
+        rows = self._parse_file(path)
+        seen = set()
+        for name, pikemen, archers, knights in rows:
+            name = name.upper()
+            if name in seen:
+                raise CatalogError(f"Civilization {name} appears twice in {path}")
+            self._check_entry(name, pikemen, archers, knights)
+            seen.add(name)
+        return [self.register(*row) for row in rows]
+
+    def _check_entry(self, name: str, pikemen: int, archers: int, knights: int) -> None:
+        if name in self._by_name:
+            raise CatalogError(f"Civilization {name} is already registered")
+        if min(pikemen, archers, knights) < 0:
+            raise CatalogError(f"Civilization {name} has negative unit counts")
+
+    def get(self, name: str) -> AnyCivilization:
+        try:
+            return self._entries[self._by_name[name.upper()]]
+        except KeyError:
+            raise CatalogError(f"Unknown civilization: {name}") from None
+
+    def by_id(self, civ_id: int) -> AnyCivilization:
+        return self._entries[civ_id]
+
+    def display_name(self, civ_id: int) -> str:
+        return self._names[civ_id]
+
+    def template(self, civ_id: int) -> UnitTemplate:
+        return self._templates[civ_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name.upper() in self._by_name
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    @staticmethod
+    def _parse_file(path: str) -> List[Tuple[str, int, int, int]]:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cache_key = (path, stat.st_mtime_ns, stat.st_size)
+        rows = _PARSE_CACHE.get(cache_key)
+        if rows is not None:
+            return rows
+
+        # json is only needed by the few processes that load catalogs
+        import json
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if isinstance(data, dict):
+            data = data.get("civilizations", [])
+
+        rows = []
+        for entry in data:
+            try:
+                rows.append((str(entry["name"]), int(entry.get("pikemen", 0)),
+                             int(entry.get("archers", 0)), int(entry.get("knights", 0))))
+            except (KeyError, TypeError, ValueError) as exc:
+                raise CatalogError(f"Invalid civilization entry in {path}: {entry!r}") from exc
+
+        _PARSE_CACHE[cache_key] = rows
+        return rows
+
+
+default_catalog = CivilizationCatalog()
@@ -0,0 +1,378 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from .army import Army
+from .battle import BattleRecord, BattleResult
+from .catalog import CivilizationCatalog, default_catalog
+from .observers import ArmyObserver
+from .units import Unit, Pikeman, Archer, Knight
+
+
+UNIT_TYPES = {"Pikeman": Pikeman, "Archer": Archer, "Knight": Knight}
+
+# Type name, age, additional strength, age penalty
+UnitState = Tuple[str, int, int, int]
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+COMMIT = "commit"
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def unit_state(unit: Unit) -> UnitState:
+    return (unit.__class__.__name__, unit._age_in_years,
+            unit._additional_strength, unit._age_penalty)
+
+
+def build_unit(state: UnitState) -> Unit:
+    type_name, age, additional, penalty = state
+    unit = UNIT_TYPES[type_name](age)
+    unit._additional_strength = additional
+    unit._age_penalty = penalty
+    return unit
+
+
+@dataclass
+class ArmyChanges:
+    gold_change: int = 0
+    aged_years: int = 0
+    added: List[Tuple[int, UnitState]] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    modified: List[Tuple[int, UnitState]] = field(default_factory=list)
+    battles: List[BattleRecord] = field(default_factory=list)
+    # Unit ids in list order, if battle losses re-sorted the units
+    order: Optional[List[int]] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.gold_change or self.aged_years or self.added or self.removed
+                    or self.modified or self.battles or self.order)
+
+
+class ArmyChangeTracker(ArmyObserver):
+    # Records which units an army added, removed or modified since the last
+    # checkpoint. Units get stable ids so deltas can refer to them. Gold and
+    # battle records are compared against the values at the last checkpoint.
+
+    def __init__(self, army: Army):
+        if any(isinstance(observer, ArmyChangeTracker) for observer in army._unit_observers):
+            raise CheckpointError("Army already has a change tracker")
+        army._sync()
+        self._army = army
+        self._next_uid = 0
+        self._uids: Dict[int, int] = {}
+        # Holding the units keeps their id() stable while they are tracked
+        self._units: Dict[int, Unit] = {}
+        self._reset_baseline()
+        army._unit_observers.append(self)
+
+    @property
+    def army(self) -> Army:
+        return self._army
+
+    @property
+    def needs_snapshot(self) -> bool:
+        self._army._sync()
+        return self._needs_snapshot
+
+    def detach(self) -> None:
+        if self in self._army._unit_observers:
+            self._army._unit_observers.remove(self)
+
+    def unit_added(self, unit: Unit) -> None:
+        uid = self._register(unit)
+        self._added[uid] = unit
+
+    def unit_removed(self, unit: Unit) -> None:
+        uid = self._uids.pop(id(unit), None)
+        if uid is None:
+            return
+        del self._units[uid]
+        if self._added.pop(uid, None) is None:
+            self._modified.pop(uid, None)
+            self._removed.append(uid)
+
+    def unit_modified(self, unit: Unit) -> None:
+        uid = self._uids.get(id(unit))
+        if uid is not None and uid not in self._added:
+            self._modified[uid] = unit
+
+    def units_aged(self, years: int) -> None:
+        self._aged_years += years
+
+    def units_reordered(self) -> None:
+        self._reordered = True
+
+    def battle_forgotten(self, record: BattleRecord) -> None:
+        self._history_length = min(self._history_length, len(self._army._battle_history))
+
+    def resync(self) -> None:
+        # The unit list was replaced wholesale; only a snapshot can describe it
+        self._needs_snapshot = True
+
+    def collect(self) -> ArmyChanges:
+        if self.needs_snapshot:
+            raise CheckpointError("Army was rebuilt; take a snapshot instead")
+        army = self._army
+        history = army._battle_history
+        changes = ArmyChanges(
+            gold_change=army._gold - self._gold,
+            aged_years=self._aged_years,
+            added=[(uid, unit_state(unit)) for uid, unit in self._added.items()],
+            removed=self._removed,
+            modified=[(uid, unit_state(unit)) for uid, unit in self._modified.items()],
+            battles=history[min(self._history_length, len(history)):],
+        )
+        if self._reordered:
+            changes.order = [self._uids[id(unit)] for unit in army._units]
+        self._start_interval()
+        return changes
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._reset_baseline()
+        army = self._army
+        return {
+            "civilization": army._civilization.name,
+            "gold": army._gold,
+            "units": [[self._uids[id(unit)], *unit_state(unit)] for unit in army._units],
+            "battles": [_record_to_list(record) for record in army._battle_history],
+        }
+
+    def _register(self, unit: Unit) -> int:
+        uid = self._next_uid
+        self._next_uid += 1
+        self._uids[id(unit)] = uid
+        self._units[uid] = unit
+        return uid
+
+    def _reset_baseline(self) -> None:
+        self._army._sync()
+        self._uids = {}
+        self._units = {}
+        for unit in self._army._units:
+            self._register(unit)
+        self._needs_snapshot = False
+        self._start_interval()
+
+    def _start_interval(self) -> None:
+        self._gold = self._army._gold
+        self._history_length = len(self._army._battle_history)
+        self._aged_years = 0
+        self._added: Dict[int, Unit] = {}
+        self._removed: List[int] = []
+        self._modified: Dict[int, Unit] = {}
+        self._reordered = False
+
+
+def _record_to_list(record: BattleRecord) -> List[Any]:
+    return [record.opponent_civilization, record.result.value, record.own_strength,
+            record.opponent_strength, record.gold_gained, record.units_lost,
+            record.opponent_civilization_id]
+
+
+def _record_from_list(values: List[Any]) -> BattleRecord:
+    return BattleRecord(values[0], BattleResult(values[1]), *values[2:])
+
+
+def _delta_line(name: str, changes: ArmyChanges) -> Dict[str, Any]:
+    # Empty fields are left out to keep the lines short
+    line: Dict[str, Any] = {"kind": DELTA, "army": name}
+    if changes.gold_change:
+        line["gold"] = changes.gold_change
+    if changes.aged_years:
+        line["aged"] = changes.aged_years
+    if changes.removed:
+        line["removed"] = changes.removed
+    if changes.modified:
+        line["modified"] = [[uid, *state] for uid, state in changes.modified]
+    if changes.added:
+        line["added"] = [[uid, *state] for uid, state in changes.added]
+    if changes.battles:
+        line["battles"] = [_record_to_list(record) for record in changes.battles]
+    if changes.order is not None:
+        line["order"] = changes.order
+    return line
+
+
+class CheckpointWriter:
+    # Appends one JSON line per changed army per checkpoint. Every
+    # `compact_every` checkpoints the file is rewritten as one snapshot per
+    # army, so replay never has to walk an unbounded delta chain.
+
+    def __init__(self, path: str, compact_every: int = 100):
+        if compact_every < 1:
+            raise ValueError("compact_every must be at least 1")
+        self._path = path
+        self._compact_every = compact_every
+        self._trackers: Dict[str, ArmyChangeTracker] = {}
+        self._since_compaction = 0
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._handle: Optional[TextIO] = open(path, "a", encoding="utf-8")
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def __enter__(self) -> 'CheckpointWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def track(self, name: str, army: Army) -> ArmyChangeTracker:
+        if name in self._trackers:
+            raise CheckpointError(f"Army {name} is already tracked")
+        tracker = ArmyChangeTracker(army)
+        self._trackers[name] = tracker
+        self._write([self._snapshot_line(name, tracker)])
+        return tracker
+
+    def untrack(self, name: str) -> None:
+        self._trackers.pop(name).detach()
+
+    def checkpoint(self, metadata: Optional[Dict[str, Any]] = None) -> int:
+        # With metadata the batch ends in a commit line; readers then ignore
+        # anything written after the last commit, such as a torn batch
+        lines = []
+        for name, tracker in self._trackers.items():
+            if tracker.needs_snapshot:
+                lines.append(self._snapshot_line(name, tracker))
+                continue
+            changes = tracker.collect()
+            if not changes.is_empty:
+                lines.append(_delta_line(name, changes))
+        army_lines = len(lines)
+        if metadata is not None:
+            self._metadata = metadata
+            lines.append({"kind": COMMIT, "data": metadata})
+        self._write(lines)
+
+        self._since_compaction += 1
+        if self._since_compaction >= self._compact_every:
+            self.compact()
+        return army_lines
+
+    def compact(self) -> None:
+        # Pending changes are folded into the snapshots, so nothing is lost
+        temporary = self._path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            for name, tracker in self._trackers.items():
+                handle.write(json.dumps(self._snapshot_line(name, tracker), separators=(",", ":")))
+                handle.write("\n")
+            if self._metadata is not None:
+                handle.write(json.dumps({"kind": COMMIT, "data": self._metadata},
+                                        separators=(",", ":")))
+                handle.write("\n")
+        self._handle.close()
+        os.replace(temporary, self._path)
+        self._handle = open(self._path, "a", encoding="utf-8")
+        self._since_compaction = 0
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        for tracker in self._trackers.values():
+            tracker.detach()
+        self._trackers.clear()
+
+    @staticmethod
+    def _snapshot_line(name: str, tracker: ArmyChangeTracker) -> Dict[str, Any]:
+        return {"kind": SNAPSHOT, "army": name, **tracker.snapshot()}
+
+    def _write(self, lines: List[Dict[str, Any]]) -> None:
+        if self._handle is None:
+            raise CheckpointError("Checkpoint writer is closed")
+        if lines:
+            self._handle.write("".join(json.dumps(line, separators=(",", ":")) + "\n"
+                                       for line in lines))
+            self._handle.flush()
+
+
+class _ReplayState:
+
+    def __init__(self, line: Dict[str, Any]):
+        self.civilization = line["civilization"]
+        self.gold = line["gold"]
+        # Insertion order mirrors the army's unit order
+        self.units: Dict[int, List[Any]] = {entry[0]: entry[1:] for entry in line["units"]}
+        self.battles: List[List[Any]] = list(line["battles"])
+
+    def apply(self, line: Dict[str, Any]) -> None:
+        units = self.units
+        self.gold += line.get("gold", 0)
+        for uid in line.get("removed", ()):
+            del units[uid]
+        years = line.get("aged")
+        if years:
+            for state in units.values():
+                state[1] += years
+        for entry in line.get("modified", ()):
+            units[entry[0]] = entry[1:]
+        for entry in line.get("added", ()):
+            units[entry[0]] = entry[1:]
+        order = line.get("order")
+        if order is not None:
+            self.units = {uid: units[uid] for uid in order}
+        self.battles.extend(line.get("battles", ()))
+
+
+def _read_lines(path: str) -> List[Dict[str, Any]]:
+    # A final line without its newline is a torn write and is dropped
+    with open(path, encoding="utf-8") as handle:
+        raw_lines = handle.readlines()
+    if raw_lines and not raw_lines[-1].endswith("\n"):
+        raw_lines.pop()
+
+    lines = []
+    for line_number, line in enumerate(raw_lines, 1):
+        if not line.strip():
+            continue
+        try:
+            lines.append(json.loads(line))
+        except json.JSONDecodeError as exc:
+            raise CheckpointError(f"Corrupt checkpoint line {line_number} in {path}") from exc
+
+    commits = [i for i, line in enumerate(lines) if line["kind"] == COMMIT]
+    if commits:
+        del lines[commits[-1] + 1:]
+    return lines
+
+
+def load_checkpoint(path: str, catalog: CivilizationCatalog = default_catalog) -> Dict[str, Army]:
+    return read_checkpoint(path, catalog)[0]
+
+
+def read_checkpoint(path: str, catalog: CivilizationCatalog = default_catalog
+                    ) -> Tuple[Dict[str, Army], Optional[Dict[str, Any]]]:
+    # Deltas are folded into plain per-army state first; each Army is then
+    # built once, whatever the length of its delta chain. Returns the armies
+    # and the metadata of the last commit, if any.
+    states: Dict[str, _ReplayState] = {}
+    metadata: Optional[Dict[str, Any]] = None
+    for line in _read_lines(path):
+        if line["kind"] == COMMIT:
+            metadata = line["data"]
+            continue
+        name = line["army"]
+        if line["kind"] == SNAPSHOT:
+            states[name] = _ReplayState(line)
+        else:
+            state = states.get(name)
+            if state is None:
+                raise CheckpointError(f"Delta for army {name} precedes its snapshot")
+            state.apply(line)
+
+    armies: Dict[str, Army] = {}
+    for name, state in states.items():
+        army = Army.from_units(catalog.get(state.civilization),
+                               (build_unit(unit) for unit in state.units.values()),
+                               gold=state.gold)
+        army._battle_history = [_record_from_list(record) for record in state.battles]
+        armies[name] = army
+    return armies, metadata
@@ -0,0 +1,263 @@
+import argparse
+import sys
+from itertools import combinations, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .army import Army
+from .battle import BattleResult, BattleSystem
+from .catalog import CatalogError, CivilizationCatalog, default_catalog
+from .units import Unit, Pikeman, Archer, Knight
+
+
+UNIT_TYPES = {
+    "pikeman": Pikeman, "pikemen": Pikeman,
+    "archer": Archer, "archers": Archer,
+    "knight": Knight, "knights": Knight,
+}
+
+DEFAULT_BATCH_SIZE = 1024
+
+# Profiling is loaded only by --profile or ARMY_PROFILE; until then no
+# profiler can be active
+_PROFILING = __package__ + ".profiling"
+
+# Profiling phase each command is attributed to
+PHASES = {
+    "create": "army_creation",
+    "train": "economy",
+    "transform": "economy",
+    "attack": "battles",
+    "tournament": "battles",
+    "status": "reporting",
+}
+
+USAGE = """commands (one per line, '#' starts a comment):
+  create <army> <civilization>
+  train <army> <unit type> [count|all]
+  transform <army> <unit type> [count]
+  attack <attacker> <defender>
+  tournament <army> <army> [<army> ...]
+  status <army>"""
+
+
+class CommandError(Exception):
+    pass
+
+
+class BatchSimulator:
+
+    def __init__(self, catalog: CivilizationCatalog = default_catalog):
+        self._catalog = catalog
+        self._armies: Dict[str, Army] = {}
+        self._handlers: Dict[str, Callable[[List[str]], List[str]]] = {
+            "create": self._create,
+            "train": self._train,
+            "transform": self._transform,
+            "attack": self._attack,
+            "tournament": self._tournament,
+            "status": self._status,
+        }
+
+    @property
+    def armies(self) -> Dict[str, Army]:
+        return dict(self._armies)
+
+    def execute(self, line: str) -> List[str]:
+        parts = line.split('#', 1)[0].split()
+        if not parts:
+            return []
+        command = parts[0].lower()
+        handler = self._handlers.get(command)
+        if handler is None:
+            raise CommandError(f"Unknown command: {parts[0]}")
+        profiling = sys.modules.get(_PROFILING)
+        if profiling is None or profiling.active_profiler() is None:
+            return handler(parts[1:])
+        with profiling.phase(PHASES[command]):
+            return handler(parts[1:])
+
+    def run(self, lines: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+        # Yields one block of output per batch of input lines
+        numbered = enumerate(lines, 1)
+        while True:
+            batch = list(islice(numbered, batch_size))
+            if not batch:
+                return
+            output: List[str] = []
+            for line_number, line in batch:
+                try:
+                    output.extend(self.execute(line))
+                except (CommandError, CatalogError, ValueError) as exc:
+                    output.append(f"error line {line_number}: {exc}")
+                except Exception as exc:
+                    output.append(f"error line {line_number}: {exc.__class__.__name__}: {exc}")
+            if output:
+                yield "\n".join(output) + "\n"
+
+    def _army(self, name: str) -> Army:
+        try:
+            return self._armies[name]
+        except KeyError:
+            raise CommandError(f"Unknown army: {name}") from None
+
+    @staticmethod
+    def _unit_type(name: str) -> type:
+        unit_type = UNIT_TYPES.get(name.lower())
+        if unit_type is None:
+            raise CommandError(f"Unknown unit type: {name}")
+        return unit_type
+
+    @staticmethod
+    def _expect(args: List[str], minimum: int, maximum: int, usage: str) -> None:
+        if not minimum <= len(args) <= maximum:
+            raise CommandError(f"Usage: {usage}")
+
+    def _create(self, args: List[str]) -> List[str]:
+        self._expect(args, 2, 2, "create <army> <civilization>")
+        name, civilization = args
+        if name in self._armies:
+            raise CommandError(f"Army {name} already exists")
+        army = Army(self._catalog.get(civilization))
+        self._armies[name] = army
+        return [f"created {name} {army.civilization} strength={army.total_strength} gold={army.gold}"]
+
+    def _train(self, args: List[str]) -> List[str]:
+        self._expect(args, 2, 3, "train <army> <unit type> [count|all]")
+        army = self._army(args[0])
+        unit_type = self._unit_type(args[1])
+        if len(args) == 3 and args[2].lower() == "all":
+            trained = army.train_all_units_of_type(unit_type)
+        else:
+            units = self._units(army, args, unit_type)
+            self._check_gold(army, sum(unit.get_training_cost() for unit in units), "training")
+            for unit in units:
+                army.train_unit(unit)
+            trained = len(units)
+        return [f"trained {args[0]} {unit_type.__name__} count={trained} gold={army.gold}"]
+
+    def _transform(self, args: List[str]) -> List[str]:
+        self._expect(args, 2, 3, "transform <army> <unit type> [count]")
+        army = self._army(args[0])
+        unit_type = self._unit_type(args[1])
+        units = self._units(army, args, unit_type)
+        if units[0].get_transformation_cost() is None:
+            raise CommandError(f"{unit_type.__name__} units cannot be transformed")
+        self._check_gold(army, sum(unit.get_transformation_cost() for unit in units),
+                         "transformation")
+        target = None
+        for unit in units:
+            target = army.transform_unit(unit).__class__.__name__
+        return [f"transformed {args[0]} {unit_type.__name__}->{target} count={len(units)} gold={army.gold}"]
+
+    @staticmethod
+    def _units(army: Army, args: List[str], unit_type: type) -> List[Unit]:
+        # The first `count` units of the type; the whole request or nothing
+        try:
+            count = int(args[2]) if len(args) == 3 else 1
+        except ValueError:
+            raise CommandError(f"Invalid count: {args[2]}") from None
+        if count < 1:
+            raise CommandError(f"Count must be at least 1, got {count}")
+        units = army.get_units_by_type(unit_type)[:count]
+        if len(units) < count:
+            raise CommandError(f"{args[0]} has only {len(units)} {unit_type.__name__} units")
+        return units
+
+    @staticmethod
+    def _check_gold(army: Army, cost: int, action: str) -> None:
+        # Checked up front so a request that cannot be paid changes nothing
+        if army.gold < cost:
+            raise CommandError(f"Not enough gold for {action}. Need {cost}, have {army.gold}")
+
+    def _attack(self, args: List[str]) -> List[str]:
+        self._expect(args, 2, 2, "attack <attacker> <defender>")
+        return [self._battle(args[0], args[1])[0]]
+
+    def _battle(self, attacker_name: str, defender_name: str) -> Tuple[str, BattleResult]:
+        attacker = self._army(attacker_name)
+        defender = self._army(defender_name)
+        if attacker is defender:
+            raise CommandError("An army cannot attack itself")
+        outcome = BattleSystem.resolve_battle(attacker, defender)
+        line = (f"battle {attacker_name} vs {defender_name} {outcome.result.value} "
+                f"{outcome.army1_strength}-{outcome.army2_strength}")
+        return line, outcome.result
+
+    def _tournament(self, args: List[str]) -> List[str]:
+        if len(args) < 2 or len(set(args)) != len(args):
+            raise CommandError("Usage: tournament <army> <army> [<army> ...] (distinct armies)")
+        for name in args:
+            self._army(name)
+
+        wins = {name: 0 for name in args}
+        output = []
+        for first, second in combinations(args, 2):
+            line, result = self._battle(first, second)
+            if result == BattleResult.WIN:
+                wins[first] += 1
+            elif result == BattleResult.LOSS:
+                wins[second] += 1
+            output.append(line)
+
+        standings = sorted(args, key=lambda name: wins[name], reverse=True)
+        output.append("tournament " + " ".join(f"{name}={wins[name]}" for name in standings))
+        return output
+
+    def _status(self, args: List[str]) -> List[str]:
+        self._expect(args, 1, 1, "status <army>")
+        return [f"status {args[0]} {self._army(args[0])}"]
+
+
+def main(argv: Optional[List[str]] = None, stdin: Optional[TextIO] = None,
+         stdout: Optional[TextIO] = None, stderr: Optional[TextIO] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Run army simulation commands from a file or stdin.",
+        epilog=USAGE,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", nargs="?", default="-",
+                        help="command file, or '-' for stdin (default)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="commands executed per output flush")
+    parser.add_argument("--catalog", action="append", default=[],
+                        help="JSON civilization catalog to load (repeatable)")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="profile each phase, write collapsed stacks and timings to DIR "
+                             "and print the timing table to stderr")
+    args = parser.parse_args(argv)
+
+    catalog = CivilizationCatalog() if args.catalog else default_catalog
+    for path in args.catalog:
+        try:
+            catalog.load(path)
+        except (CatalogError, OSError, ValueError) as exc:
+            parser.error(f"cannot load catalog {path}: {exc}")
+
+    profiler = None
+    if args.profile:
+        from .profiling import active_profiler, enable_profiling
+        profiling_was_active = active_profiler() is not None
+        profiler = enable_profiling()
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    simulator = BatchSimulator(catalog)
+    source = stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        for block in simulator.run(source, batch_size=max(args.batch_size, 1)):
+            stdout.write(block)
+            stdout.flush()
+    finally:
+        if source is not stdin:
+            source.close()
+    if profiler is not None:
+        if not profiling_was_active:
+            from .profiling import disable_profiling
+            disable_profiling()
+        profiler.write(args.profile)
+        # Kept off stdout so the command output can still be piped
+        stderr.write(profiler.timing_table() + "\n")
+    return 0
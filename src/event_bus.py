@@ -0,0 +1,141 @@
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Iterator, List, Optional, Tuple, Type
+
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BLOCK = "block"
+
+
+class Subscription:
+    # A bounded queue of events for one consumer. A full queue drops its
+    # oldest or the newest event, or blocks the publisher for up to
+    # `block_timeout` seconds and then drops the new event. Publishers are
+    # observer hooks running inside army mutators, so they must never raise.
+
+    def __init__(self, bus: 'EventBus', maxsize: int, policy: OverflowPolicy,
+                 event_types: Tuple[type, ...], block_timeout: Optional[float]):
+        self._bus = bus
+        self._maxsize = maxsize
+        self._policy = policy
+        self._event_types = event_types
+        self._block_timeout = block_timeout
+        self._events: Deque[Any] = deque()
+        # threading is loaded by the first subscriber, not by every battle
+        import threading
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[Any]:
+        # Events queued so far, without waiting for more
+        while True:
+            event = self.get(timeout=0)
+            if event is None:
+                return
+            yield event
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        # Waits for the next event; None once the timeout passes or the
+        # subscription is closed with nothing left to read
+        with self._condition:
+            if not self._events and not self._closed:
+                self._condition.wait_for(lambda: self._events or self._closed, timeout)
+            if not self._events:
+                return None
+            event = self._events.popleft()
+            self._condition.notify_all()
+            return event
+
+    def drain(self) -> List[Any]:
+        with self._condition:
+            events = list(self._events)
+            self._events.clear()
+            self._condition.notify_all()
+            return events
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._bus._unsubscribe(self)
+
+    def _put(self, event: Any) -> None:
+        if self._event_types and not isinstance(event, self._event_types):
+            return
+        with self._condition:
+            if len(self._events) >= self._maxsize:
+                if self._policy is OverflowPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                if self._policy is OverflowPolicy.DROP_OLDEST:
+                    self._events.popleft()
+                    self.dropped += 1
+                elif not self._condition.wait_for(
+                        lambda: len(self._events) < self._maxsize or self._closed,
+                        self._block_timeout):
+                    self.dropped += 1
+                    return
+                elif self._closed:
+                    return
+            self._events.append(event)
+            self._condition.notify_all()
+
+
+class EventBus:
+    # Fans events out to subscriptions. Publishers check `active` first, so a
+    # bus nobody listens to costs one attribute read; `on_activity` is told
+    # when the first subscriber arrives and when the last one leaves.
+
+    def __init__(self, on_activity: Optional[Callable[[bool], None]] = None):
+        self._subscriptions: List[Subscription] = []
+        self._on_activity = on_activity
+        self.active = False
+
+    def subscribe(self, maxsize: int = 1024, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                  event_types: Tuple[Type[Any], ...] = (),
+                  block_timeout: Optional[float] = None) -> Subscription:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        subscription = Subscription(self, maxsize, policy, tuple(event_types), block_timeout)
+        # Copy on write, so publishing never sees a list being changed
+        self._subscriptions = self._subscriptions + [subscription]
+        if not self.active:
+            self.active = True
+            if self._on_activity is not None:
+                self._on_activity(True)
+        return subscription
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, event: Any) -> None:
+        for subscription in self._subscriptions:
+            subscription._put(event)
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions = [entry for entry in self._subscriptions if entry is not subscription]
+        if not self._subscriptions:
+            self.active = False
+            if self._on_activity is not None:
+                self._on_activity(False)
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from typing import Tuple, TYPE_CHECKING
+
+# The bus lives in event_bus, so BattleSystem can own one without loading
+# the event types; they are re-exported here
+from .event_bus import EventBus, OverflowPolicy, Subscription
+from .observers import ArmyObserver
+
+if TYPE_CHECKING:
+    from .army import Army
+    from .battle import BattleOutcome, BattleRecord, CoalitionOutcome
+    from .units import Unit
+
+
+@dataclass(frozen=True)
+class ArmyEvent:
+    # `gold` is the army's gold once the change has been applied
+    army: 'Army'
+    gold: int
+
+
+@dataclass(frozen=True)
+class UnitAdded(ArmyEvent):
+    unit_type: str
+    strength: int
+
+
+@dataclass(frozen=True)
+class UnitTrained(ArmyEvent):
+    unit_type: str
+    strength: int
+
+
+@dataclass(frozen=True)
+class UnitTransformed(ArmyEvent):
+    from_type: str
+    to_type: str
+    strength: int
+
+
+@dataclass(frozen=True)
+class UnitModified(ArmyEvent):
+    # Strength changed without training, e.g. an age penalty
+    unit_type: str
+    strength: int
+
+
+@dataclass(frozen=True)
+class UnitRemoved(ArmyEvent):
+    unit_type: str
+    strength: int
+
+
+@dataclass(frozen=True)
+class UnitsAged(ArmyEvent):
+    years: int
+
+
+@dataclass(frozen=True)
+class BattleFought(ArmyEvent):
+    record: 'BattleRecord'
+
+
+@dataclass(frozen=True)
+class ArmyReset(ArmyEvent):
+    # The unit list was replaced wholesale (split, merge, rollback, ...)
+    unit_count: int
+
+
+@dataclass(frozen=True)
+class BattleResolved:
+    army1: 'Army'
+    army2: 'Army'
+    outcome: 'BattleOutcome'
+
+
+@dataclass(frozen=True)
+class CoalitionBattleResolved:
+    side1: Tuple['Army', ...]
+    side2: Tuple['Army', ...]
+    outcome: 'CoalitionOutcome'
+
+
+class ArmyEventPublisher(ArmyObserver):
+    # Turns an army's observer notifications into events. It is only
+    # registered with the army while its bus has subscribers.
+
+    def __init__(self, army: 'Army', bus: EventBus):
+        self._army = army
+        self._bus = bus
+
+    def unit_added(self, unit: 'Unit') -> None:
+        self._bus.publish(UnitAdded(self._army, self._army._gold, unit.__class__.__name__,
+                                    unit.total_strength))
+
+    def unit_removed(self, unit: 'Unit') -> None:
+        self._bus.publish(UnitRemoved(self._army, self._army._gold, unit.__class__.__name__,
+                                      unit.total_strength))
+
+    def unit_modified(self, unit: 'Unit') -> None:
+        self._bus.publish(UnitModified(self._army, self._army._gold, unit.__class__.__name__,
+                                       unit.total_strength))
+
+    def unit_trained(self, unit: 'Unit') -> None:
+        self._bus.publish(UnitTrained(self._army, self._army._gold, unit.__class__.__name__,
+                                      unit.total_strength))
+
+    def unit_transformed(self, unit: 'Unit', new_unit: 'Unit') -> None:
+        self._bus.publish(UnitTransformed(self._army, self._army._gold, unit.__class__.__name__,
+                                          new_unit.__class__.__name__, new_unit.total_strength))
+
+    def units_aged(self, years: int) -> None:
+        self._bus.publish(UnitsAged(self._army, self._army._gold, years))
+
+    def battle_recorded(self, record: 'BattleRecord') -> None:
+        self._bus.publish(BattleFought(self._army, self._army._gold, record))
+
+    def resync(self) -> None:
+        self._bus.publish(ArmyReset(self._army, self._army._gold, len(self._army._units)))
@@ -0,0 +1,51 @@
+from array import array
+from typing import List
+
+
+class FenwickTree:
+
+    def __init__(self, size: int):
+        self._size = size
+        self._tree = array('l', [0]) * (size + 1)
+        self._top_bit = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, index: int, delta: int) -> None:
+        index += 1
+        while index <= self._size:
+            self._tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, index: int) -> int:
+        # Sum of positions [0, index)
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, k: int) -> int:
+        # Smallest position whose prefix sum reaches k (1-based k)
+        position = 0
+        bit = self._top_bit
+        while bit:
+            candidate = position + bit
+            if candidate <= self._size and self._tree[candidate] < k:
+                position = candidate
+                k -= self._tree[candidate]
+            bit >>= 1
+        return position
+
+    def range_sum(self, start: int, stop: int) -> int:
+        # Sum of positions [start, stop)
+        return self.prefix_sum(stop) - self.prefix_sum(start)
+
+    @classmethod
+    def from_values(cls, values: List[int]) -> 'FenwickTree':
+        # O(n) construction
+        tree = cls(len(values))
+        for index, value in enumerate(values, 1):
+            tree._tree[index] += value
+            parent = index + (index & -index)
+            if parent <= tree._size:
+                tree._tree[parent] += tree._tree[index]
+        return tree
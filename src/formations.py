@@ -0,0 +1,263 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .army import Army
+from .battle import BattleOutcome, BattleSystem
+from .fenwick import FenwickTree
+from .observers import ArmyObserver
+from .strength_index import UnitKey, unit_key
+from .units import Unit
+
+
+ARMY = "army"
+DIVISION = "division"
+SQUAD = "squad"
+
+UNIT_TYPE_NAMES = ("Pikeman", "Archer", "Knight")
+
+
+class FormationError(Exception):
+    pass
+
+
+class Formation:
+
+    def __init__(self, name: str, kind: str, parent: Optional['Formation'] = None):
+        self._name = name
+        self._kind = kind
+        self._parent = parent
+        self._children: List['Formation'] = []
+        # Squads only: assigned units keyed by id, in assignment order
+        self._units: Dict[int, Unit] = {}
+        # Range of squad positions covered by this subtree
+        self._start = 0
+        self._stop = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    @property
+    def parent(self) -> Optional['Formation']:
+        return self._parent
+
+    @property
+    def children(self) -> List['Formation']:
+        return self._children.copy()
+
+    def __repr__(self) -> str:
+        return f"Formation({self._kind}={self._name!r}, children={len(self._children)})"
+
+
+class FormationTree(ArmyObserver):
+    # Army -> divisions -> squads -> units. Squads are laid out in tree order
+    # so every subtree is a contiguous range of squad positions, and Fenwick
+    # trees over those positions give subtree strength and per-type counts.
+    # The tree observes its army, so changes made directly on the army are
+    # applied unit by unit, and a transformed unit's replacement stays in
+    # its squad.
+
+    def __init__(self, army: Army):
+        self._army = army
+        self._root = Formation(str(army.civilization), ARMY)
+        self._squads: List[Formation] = []
+        self._squad_of: Dict[int, Formation] = {}
+        self._position: Dict[int, int] = {}
+        self._keys: Dict[int, UnitKey] = {}
+        self._strength = FenwickTree(0)
+        self._counts: Dict[str, FenwickTree] = {}
+        self._layout_dirty = True
+        self._stale = False
+        army._unit_observers.append(self)
+
+    @property
+    def root(self) -> Formation:
+        return self._root
+
+    @property
+    def army(self) -> Army:
+        return self._army
+
+    def detach(self) -> None:
+        if self in self._army._unit_observers:
+            self._army._unit_observers.remove(self)
+
+    def add_division(self, name: str) -> Formation:
+        division = Formation(name, DIVISION, self._root)
+        self._root._children.append(division)
+        return division
+
+    def add_squad(self, division: Formation, name: str) -> Formation:
+        if division.kind != DIVISION:
+            raise FormationError("Squads can only be added to divisions")
+        squad = Formation(name, SQUAD, division)
+        division._children.append(squad)
+        self._layout_dirty = True
+        return squad
+
+    def assign(self, units: Iterable[Unit], squad: Formation) -> None:
+        if squad.kind != SQUAD:
+            raise FormationError("Units can only be assigned to squads")
+        self._refresh()
+        members = {id(unit) for unit in self._army._units}
+        for unit in units:
+            if id(unit) not in members:
+                raise ValueError("Unit is not part of this army")
+            self._remove(unit)
+            self._add(unit, squad)
+
+    def unassign(self, unit: Unit) -> None:
+        self._refresh()
+        self._remove(unit)
+
+    def squad_of(self, unit: Unit) -> Optional[Formation]:
+        self._refresh()
+        return self._squad_of.get(id(unit))
+
+    def strength(self, formation: Formation) -> int:
+        if formation.kind == ARMY:
+            return self._army.total_strength
+        self._refresh()
+        return self._strength.range_sum(formation._start, formation._stop)
+
+    def unit_counts(self, formation: Formation) -> Dict[str, int]:
+        if formation.kind == ARMY:
+            return self._army.get_unit_counts()
+        self._refresh()
+        return {name: tree.range_sum(formation._start, formation._stop)
+                for name, tree in self._counts.items()}
+
+    def units(self, formation: Formation) -> Iterator[Unit]:
+        if formation.kind == ARMY:
+            yield from self._army._units
+            return
+        self._refresh()
+        for squad in self._squads[formation._start:formation._stop]:
+            yield from squad._units.values()
+
+    def train_unit(self, unit: Unit) -> None:
+        self._refresh()
+        self._army.train_unit(unit)
+
+    def transform_unit(self, unit: Unit) -> Unit:
+        self._refresh()
+        return self._army.transform_unit(unit)
+
+    def resolve_battle(self, formations: Iterable[Formation], opponent: Army,
+                       battle_system: type = BattleSystem) -> BattleOutcome:
+        # Only the units of the committed formations fight; gold, losses and
+        # the battle record are then carried back to the whole army
+        self._refresh()
+        committed_ids = set()
+        for formation in formations:
+            committed_ids.update(id(unit) for unit in self.units(formation))
+        committed = [unit for unit in self._army._units if id(unit) in committed_ids]
+        if not committed:
+            raise FormationError("No units committed to the battle")
+
+        detachment = Army.from_units(self._army.civilization, committed, gold=self._army._gold)
+        outcome = battle_system.resolve_battle(detachment, opponent)
+
+        survivors = {id(unit) for unit in detachment._units}
+        lost = [unit for unit in committed if id(unit) not in survivors]
+        self._army._gold = detachment._gold
+        for record in detachment._battle_history:
+            self._army._record_battle(record)
+        self._army._discard_units(lost)
+        return outcome
+
+    def unit_removed(self, unit: Unit) -> None:
+        self._remove(unit)
+
+    def unit_modified(self, unit: Unit) -> None:
+        old_key = self._keys.get(id(unit))
+        if old_key is not None:
+            self._update(unit, old_key)
+
+    def unit_transformed(self, unit: Unit, new_unit: Unit) -> None:
+        squad = self._squad_of.get(id(unit))
+        if squad is not None:
+            self._remove(unit)
+            self._add(new_unit, squad)
+
+    def resync(self) -> None:
+        self._stale = True
+
+    def _refresh(self) -> None:
+        self._army._sync()
+        if self._layout_dirty:
+            self._relayout()
+        if self._stale:
+            self._resync()
+
+    def _relayout(self) -> None:
+        self._squads = []
+        for division in self._root._children:
+            division._start = len(self._squads)
+            for squad in division._children:
+                squad._start = len(self._squads)
+                self._squads.append(squad)
+                squad._stop = len(self._squads)
+            division._stop = len(self._squads)
+        self._root._start, self._root._stop = 0, len(self._squads)
+
+        strengths = [0] * len(self._squads)
+        counts = {name: [0] * len(self._squads) for name in UNIT_TYPE_NAMES}
+        self._position = {}
+        for position, squad in enumerate(self._squads):
+            self._position[id(squad)] = position
+            for unit_id in squad._units:
+                type_name, strength = self._keys[unit_id]
+                strengths[position] += strength
+                counts[type_name][position] += 1
+
+        self._strength = FenwickTree.from_values(strengths)
+        self._counts = {name: FenwickTree.from_values(values) for name, values in counts.items()}
+        self._layout_dirty = False
+
+    def _resync(self) -> None:
+        # The army's unit list was replaced wholesale: drop lost units,
+        # re-key the rest
+        present = {id(unit) for unit in self._army._units}
+        for squad in self._squads:
+            for unit in list(squad._units.values()):
+                if id(unit) not in present:
+                    self._remove(unit)
+                else:
+                    self._update(unit, self._keys[id(unit)])
+        self._stale = False
+
+    def _add(self, unit: Unit, squad: Formation) -> None:
+        key = unit_key(unit)
+        squad._units[id(unit)] = unit
+        self._squad_of[id(unit)] = squad
+        self._keys[id(unit)] = key
+        if not self._layout_dirty:
+            self._apply_delta(squad, key, 1)
+
+    def _remove(self, unit: Unit) -> None:
+        squad = self._squad_of.pop(id(unit), None)
+        if squad is None:
+            return
+        del squad._units[id(unit)]
+        key = self._keys.pop(id(unit))
+        if not self._layout_dirty:
+            self._apply_delta(squad, key, -1)
+
+    def _update(self, unit: Unit, old_key: UnitKey) -> None:
+        squad = self._squad_of.get(id(unit))
+        new_key = unit_key(unit)
+        if squad is None or new_key == old_key:
+            return
+        self._keys[id(unit)] = new_key
+        if not self._layout_dirty:
+            self._apply_delta(squad, old_key, -1)
+            self._apply_delta(squad, new_key, 1)
+
+    def _apply_delta(self, squad: Formation, key: UnitKey, sign: int) -> None:
+        position = self._position[id(squad)]
+        self._strength.add(position, sign * key[1])
+        self._counts[key[0]].add(position, sign)
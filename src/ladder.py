@@ -0,0 +1,148 @@
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .battle import BattleOutcome, BattleResult, BattleSystem
+from .fenwick import FenwickTree
+
+if TYPE_CHECKING:
+    from .army import Army
+
+
+_SCORES = {
+    BattleResult.WIN: 1.0,
+    BattleResult.LOSS: 0.0,
+    BattleResult.TIE: 0.5,
+}
+
+
+class RatingLadder:
+
+    INITIAL_RATING = 1500.0
+    K_FACTOR = 32.0
+    MIN_RATING = 0.0
+    MAX_RATING = 4000.0
+
+    def __init__(self, k_factor: float = K_FACTOR, initial_rating: float = INITIAL_RATING,
+                 resolution: float = 1.0):
+        self._k_factor = k_factor
+        self._initial_rating = initial_rating
+        self._resolution = resolution
+        self._bucket_count = int((self.MAX_RATING - self.MIN_RATING) / resolution) + 1
+
+        self._armies: List['Army'] = []
+        self._ids: Dict[int, int] = {}
+        self._ratings = array('d')
+        self._games = array('l')
+        self._bucket_of = array('l')
+        # Rating each army is filed under in its bucket
+        self._placed = array('d')
+
+        # Order-statistic index: army counts per rating bucket, plus each
+        # bucket's members as sorted (-rating, army id) entries
+        self._tree = FenwickTree(self._bucket_count)
+        self._buckets: Dict[int, List[Tuple[float, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._armies)
+
+    def __contains__(self, army: 'Army') -> bool:
+        return id(army) in self._ids
+
+    def register(self, army: 'Army', rating: Optional[float] = None) -> int:
+        army_id = self._ids.get(id(army))
+        if army_id is not None:
+            return army_id
+
+        army_id = len(self._armies)
+        self._ids[id(army)] = army_id
+        self._armies.append(army)
+        self._ratings.append(self._initial_rating if rating is None else rating)
+        self._games.append(0)
+        self._bucket_of.append(-1)
+        self._placed.append(0.0)
+        self._place(army_id)
+        return army_id
+
+    def army_id(self, army: 'Army') -> int:
+        try:
+            return self._ids[id(army)]
+        except KeyError:
+            raise ValueError("Army is not registered in this ladder") from None
+
+    def army(self, army_id: int) -> 'Army':
+        return self._armies[army_id]
+
+    def rating(self, army: 'Army') -> float:
+        return self._ratings[self.army_id(army)]
+
+    def games_played(self, army: 'Army') -> int:
+        return self._games[self.army_id(army)]
+
+    def record(self, army1: 'Army', army2: 'Army', outcome: BattleOutcome) -> None:
+        id1 = self.register(army1)
+        id2 = self.register(army2)
+        rating1 = self._ratings[id1]
+        rating2 = self._ratings[id2]
+
+        expected1 = 1.0 / (1.0 + 10.0 ** ((rating2 - rating1) / 400.0))
+        delta = self._k_factor * (_SCORES[outcome.result] - expected1)
+
+        self._ratings[id1] = rating1 + delta
+        self._ratings[id2] = rating2 - delta
+        self._games[id1] += 1
+        self._games[id2] += 1
+        self._place(id1)
+        self._place(id2)
+
+    def resolve_battle(self, army1: 'Army', army2: 'Army',
+                       battle_system: type = BattleSystem) -> BattleOutcome:
+        outcome = battle_system.resolve_battle(army1, army2)
+        self.record(army1, army2, outcome)
+        return outcome
+
+    def rank(self, army: 'Army') -> int:
+        # 1-based; armies with equal ratings share a rank. Higher buckets are
+        # counted by the tree, higher ratings in the army's own bucket by a
+        # binary search.
+        army_id = self.army_id(army)
+        bucket = self._bucket_of[army_id]
+        above = len(self._armies) - self._tree.prefix_sum(bucket + 1)
+        return above + bisect_left(self._buckets[bucket], (-self._ratings[army_id],)) + 1
+
+    def top(self, k: int) -> List[Tuple['Army', float]]:
+        # Highest rating first, earlier registration first on equal ratings
+        result: List[Tuple['Army', float]] = []
+        total = len(self._armies)
+        taken = 0
+        while len(result) < min(k, total):
+            bucket = self._tree.find(total - taken)
+            members = self._buckets[bucket]
+            for negated, army_id in members[:k - len(result)]:
+                result.append((self._armies[army_id], -negated))
+            taken += len(members)
+        return result
+
+    def _bucket(self, rating: float) -> int:
+        bucket = int((rating - self.MIN_RATING) / self._resolution)
+        return min(max(bucket, 0), self._bucket_count - 1)
+
+    def _place(self, army_id: int) -> None:
+        rating = self._ratings[army_id]
+        new_bucket = self._bucket(rating)
+        old_bucket = self._bucket_of[army_id]
+        if old_bucket >= 0:
+            if rating == self._placed[army_id]:
+                return
+            members = self._buckets[old_bucket]
+            del members[bisect_left(members, (-self._placed[army_id], army_id))]
+            if not members:
+                del self._buckets[old_bucket]
+            if new_bucket != old_bucket:
+                self._tree.add(old_bucket, -1)
+        if new_bucket != old_bucket:
+            self._tree.add(new_bucket, 1)
+
+        insort(self._buckets.setdefault(new_bucket, []), (-rating, army_id))
+        self._bucket_of[army_id] = new_bucket
+        self._placed[army_id] = rating
@@ -0,0 +1,122 @@
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .army import Army
+
+
+class MatchmakingIndex:
+    
+    def __init__(self, armies: Iterable['Army'] = ()):
+        self._armies: Dict[int, 'Army'] = {}
+        self._ids: Dict[int, int] = {}
+        self._strength_of: Dict[int, int] = {}
+        self._next_id = 0
+        self._civilization_of: Dict[int, int] = {}
+        # Sorted (strength, army_id) pairs, overall and per civilization
+        self._entries: List[Tuple[int, int]] = []
+        self._by_civilization: Dict[int, List[Tuple[int, int]]] = {}
+        
+        for army in armies:
+            self.add(army)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, army: 'Army') -> bool:
+        return id(army) in self._ids
+    
+    def add(self, army: 'Army') -> None:
+        if id(army) in self._ids:
+            return
+        
+        army_id = self._next_id
+        self._next_id += 1
+        self._ids[id(army)] = army_id
+        self._armies[army_id] = army
+        self._strength_of[army_id] = army.total_strength
+        self._civilization_of[army_id] = army.civilization_id
+        self._insert_entry(army_id)
+        army.add_strength_watcher(self.refresh)
+    
+    def remove(self, army: 'Army') -> None:
+        army_id = self._ids.pop(id(army), None)
+        if army_id is None:
+            raise ValueError("Army is not part of this index")
+        
+        self._discard_entry(army_id)
+        del self._armies[army_id]
+        del self._strength_of[army_id]
+        del self._civilization_of[army_id]
+        army.remove_strength_watcher(self.refresh)
+    
+    def refresh(self, army: 'Army') -> None:
+        army_id = self._ids[id(army)]
+        strength = army.total_strength
+        if strength == self._strength_of[army_id]:
+            return
+        
+        self._discard_entry(army_id)
+        self._strength_of[army_id] = strength
+        self._insert_entry(army_id)
+    
+    def find_opponents(self, army: 'Army', k: int, max_difference: int,
+                       exclude_same_civilization: bool = True) -> List['Army']:
+        excluded = army.civilization_id if exclude_same_civilization else None
+        return self.nearest(army.total_strength, k, max_difference,
+                            exclude_civilization_id=excluded, exclude=army)
+    
+    def nearest(self, strength: int, k: int, max_difference: int,
+                exclude_civilization_id: Optional[int] = None,
+                exclude: Optional['Army'] = None) -> List['Army']:
+        # Every allowed list gets a cursor walking down and one walking up
+        # from the query strength; a heap hands out the closest candidate
+        # across cursors, so excluded civilizations are never scanned
+        if exclude_civilization_id is None:
+            sources = [self._entries]
+        else:
+            sources = [entries for civilization_id, entries in self._by_civilization.items()
+                       if civilization_id != exclude_civilization_id]
+        low = strength - max_difference
+        high = strength + max_difference
+        heap: List[Tuple[Tuple[int, int, int], int, int, List[Tuple[int, int]]]] = []
+        for entries in sources:
+            right = bisect_left(entries, (strength, -1))
+            self._push_cursor(heap, entries, right - 1, -1, strength, low, high)
+            self._push_cursor(heap, entries, right, 1, strength, low, high)
+        
+        result: List['Army'] = []
+        while heap and len(result) < k:
+            _, position, step, entries = heapq.heappop(heap)
+            candidate = self._armies[entries[position][1]]
+            self._push_cursor(heap, entries, position + step, step, strength, low, high)
+            if candidate is not exclude:
+                result.append(candidate)
+        return result
+    
+    @staticmethod
+    def _push_cursor(heap: list, entries: List[Tuple[int, int]], position: int, step: int,
+                     strength: int, low: int, high: int) -> None:
+        # Closest first; on equal distance the weaker side first, and within
+        # a strength in the order a single outward scan would meet them
+        if not 0 <= position < len(entries):
+            return
+        entry_strength, army_id = entries[position]
+        if not low <= entry_strength <= high:
+            return
+        if step < 0:
+            key = (strength - entry_strength, 0, -army_id)
+        else:
+            key = (entry_strength - strength, 1, army_id)
+        heapq.heappush(heap, (key, position, step, entries))
+    
+    def _insert_entry(self, army_id: int) -> None:
+        entry = (self._strength_of[army_id], army_id)
+        insort(self._entries, entry)
+        insort(self._by_civilization.setdefault(self._civilization_of[army_id], []), entry)
+    
+    def _discard_entry(self, army_id: int) -> None:
+        entry = (self._strength_of[army_id], army_id)
+        for entries in (self._entries, self._by_civilization[self._civilization_of[army_id]]):
+            del entries[bisect_left(entries, entry)]
@@ -0,0 +1,46 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .battle import BattleRecord
+    from .units import Unit
+
+
+class ArmyObserver:
+    # Notified by an Army of every unit-level change. The semantic hooks
+    # fall back to the generic ones, so observers that only care about which
+    # units exist need not tell training or transformation apart.
+
+    def unit_added(self, unit: 'Unit') -> None:
+        pass
+
+    def unit_removed(self, unit: 'Unit') -> None:
+        pass
+
+    def unit_modified(self, unit: 'Unit') -> None:
+        pass
+
+    def unit_trained(self, unit: 'Unit') -> None:
+        self.unit_modified(unit)
+
+    def unit_transformed(self, unit: 'Unit', new_unit: 'Unit') -> None:
+        self.unit_removed(unit)
+        self.unit_added(new_unit)
+
+    def units_aged(self, years: int) -> None:
+        pass
+
+    def battle_recorded(self, record: 'BattleRecord') -> None:
+        pass
+
+    def battle_forgotten(self, record: 'BattleRecord') -> None:
+        # The latest record was dropped from the history; its gold and
+        # losses stand
+        pass
+
+    def units_reordered(self) -> None:
+        # Battle losses left the units sorted strongest first
+        pass
+
+    def resync(self) -> None:
+        # The unit list was replaced wholesale
+        pass
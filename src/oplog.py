@@ -0,0 +1,317 @@
+import struct
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from .army import Army
+from .battle import BattleRecord, BattleResult
+from .catalog import AnyCivilization, CivilizationCatalog, default_catalog
+from .observers import ArmyObserver
+from .units import Unit, Pikeman, Archer, Knight
+
+
+class OperationLogError(Exception):
+    pass
+
+
+# Every record is an opcode, an army id and five int32 arguments
+RECORD = struct.Struct("<BIiiiii")
+
+CREATE = 1      # civilization id, gold
+TRAIN = 2       # unit id
+TRANSFORM = 3   # unit id; the new unit takes the next unit id
+REMOVE = 4      # unit id
+AGE = 5         # years
+BATTLE = 6      # own strength, opponent strength, gold gained, units lost, result | opponent << 2
+REBUILD = 7     # gold, unit count; followed by that many UNIT records
+UNIT = 8        # type, additional strength, age, age penalty
+NAME = 9        # name id, byte length; followed by the UTF-8 bytes
+SORT = 10       # units sorted strongest first, equal strengths keeping their order
+FORGET = 11     # latest battle record dropped from the history
+
+UNIT_TYPES: Tuple[type, ...] = (Pikeman, Archer, Knight)
+_TYPE_CODES = {unit_type: code for code, unit_type in enumerate(UNIT_TYPES)}
+_PROTOTYPES = tuple(unit_type() for unit_type in UNIT_TYPES)
+_RESULTS = (BattleResult.WIN, BattleResult.LOSS, BattleResult.TIE)
+_RESULT_CODES = {result: code for code, result in enumerate(_RESULTS)}
+
+
+class _ArmyLogger(ArmyObserver):
+    # Gives every unit the same id the replayer will assign, and turns army
+    # notifications into records
+
+    def __init__(self, log: 'OperationLog', army_id: int, army: Army):
+        self._log = log
+        self._army_id = army_id
+        self._army = army
+        self._uids: Dict[int, int] = {}
+        # Holding the units keeps their id() stable while they are logged
+        self._units: Dict[int, Unit] = {}
+        self._next_uid = 0
+
+    def assign_all(self) -> None:
+        self._uids = {}
+        self._units = {}
+        self._next_uid = 0
+        for unit in self._army._units:
+            self._assign(unit)
+
+    def unit_trained(self, unit: Unit) -> None:
+        self._log._write(TRAIN, self._army_id, self._uids[id(unit)])
+
+    def unit_transformed(self, unit: Unit, new_unit: Unit) -> None:
+        self._log._write(TRANSFORM, self._army_id, self._forget(unit))
+        self._assign(new_unit)
+
+    def unit_removed(self, unit: Unit) -> None:
+        self._log._write(REMOVE, self._army_id, self._forget(unit))
+
+    def unit_added(self, unit: Unit) -> None:
+        # Not produced by any Army operation; log the full state instead
+        self.resync()
+
+    def units_aged(self, years: int) -> None:
+        # Penalty changes follow from the ages on replay, so unit_modified
+        # notifications from ageing need no records of their own
+        self._log._write(AGE, self._army_id, years)
+
+    def battle_recorded(self, record: BattleRecord) -> None:
+        if record.opponent_civilization_id is not None:
+            opponent = record.opponent_civilization_id
+        else:
+            opponent = -1 - self._log._name_id(record.opponent_civilization)
+        self._log._write(BATTLE, self._army_id, record.own_strength, record.opponent_strength,
+                         record.gold_gained, record.units_lost,
+                         _RESULT_CODES[record.result] | (opponent << 2))
+
+    def battle_forgotten(self, record: BattleRecord) -> None:
+        self._log._write(FORGET, self._army_id)
+
+    def units_reordered(self) -> None:
+        self._log._write(SORT, self._army_id)
+
+    def resync(self) -> None:
+        army = self._army
+        self._log._write(REBUILD, self._army_id, army._gold, len(army._units))
+        for unit in army._units:
+            self._log._write(UNIT, self._army_id, _TYPE_CODES[type(unit)],
+                             unit._additional_strength, unit._age_in_years, unit._age_penalty)
+        self.assign_all()
+
+    def _assign(self, unit: Unit) -> None:
+        self._uids[id(unit)] = self._next_uid
+        self._units[self._next_uid] = unit
+        self._next_uid += 1
+
+    def _forget(self, unit: Unit) -> int:
+        uid = self._uids.pop(id(unit))
+        del self._units[uid]
+        return uid
+
+
+class OperationLog:
+    # Append-only binary log of army mutations. Records are buffered and
+    # written in blocks of `buffer_size` bytes.
+
+    def __init__(self, target: Union[str, BinaryIO], buffer_size: int = 1 << 16):
+        if isinstance(target, str):
+            self._handle: Optional[BinaryIO] = open(target, "ab")
+            self._owns_handle = True
+        else:
+            self._handle = target
+            self._owns_handle = False
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self._loggers: Dict[int, _ArmyLogger] = {}
+        self._next_army_id = 0
+        self._names: Dict[str, int] = {}
+
+    def __enter__(self) -> 'OperationLog':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def create(self, civilization: AnyCivilization) -> Army:
+        army = Army(civilization)
+        logger = self._register(army)
+        self._write(CREATE, logger._army_id, army.civilization_id, army._gold)
+        logger.assign_all()
+        return army
+
+    def attach(self, army: Army) -> int:
+        army._sync()
+        logger = self._register(army)
+        self._write(CREATE, logger._army_id, army.civilization_id, army._gold)
+        logger.resync()
+        return logger._army_id
+
+    def army_id(self, army: Army) -> int:
+        logger = self._loggers.get(id(army))
+        if logger is None:
+            raise OperationLogError("Army is not logged")
+        return logger._army_id
+
+    def detach(self, army: Army) -> None:
+        logger = self._loggers.pop(id(army))
+        army._unit_observers.remove(logger)
+
+    def flush(self) -> None:
+        if self._handle is None:
+            raise OperationLogError("Operation log is closed")
+        if self._buffer:
+            self._handle.write(self._buffer)
+            self._buffer.clear()
+        self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        self.flush()
+        for logger in self._loggers.values():
+            logger._army._unit_observers.remove(logger)
+        self._loggers.clear()
+        if self._owns_handle:
+            self._handle.close()
+        self._handle = None
+
+    def _register(self, army: Army) -> _ArmyLogger:
+        if self._handle is None:
+            raise OperationLogError("Operation log is closed")
+        if id(army) in self._loggers:
+            raise OperationLogError("Army is already logged")
+        logger = _ArmyLogger(self, self._next_army_id, army)
+        self._next_army_id += 1
+        self._loggers[id(army)] = logger
+        army._unit_observers.append(logger)
+        return logger
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._names)
+            encoded = name.encode("utf-8")
+            self._write(NAME, 0, name_id, len(encoded))
+            self._buffer += encoded
+        return name_id
+
+    def _write(self, opcode: int, army_id: int, a: int = 0, b: int = 0, c: int = 0,
+               d: int = 0, e: int = 0) -> None:
+        self._buffer += RECORD.pack(opcode, army_id, a, b, c, d, e)
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+
+class _ReplayArmy:
+    __slots__ = ("civilization_id", "gold", "units", "next_uid", "history")
+
+    def __init__(self, civilization_id: int, gold: int):
+        self.civilization_id = civilization_id
+        self.gold = gold
+        # uid -> [type code, additional strength, age, age penalty]
+        self.units: Dict[int, List[int]] = {}
+        self.next_uid = 0
+        self.history: List[BattleRecord] = []
+
+
+def replay(data: Union[bytes, str], catalog: CivilizationCatalog = default_catalog) -> Dict[int, Army]:
+    # Folds the whole log into plain per-army state, then builds each Army
+    # once; no Army methods run per record
+    if isinstance(data, str):
+        with open(data, "rb") as handle:
+            data = handle.read()
+
+    costs = [prototype.get_training_cost() for prototype in _PROTOTYPES]
+    gains = [prototype.get_training_strength_gain() for prototype in _PROTOTYPES]
+    bases = [prototype._get_base_strength() for prototype in _PROTOTYPES]
+    rules = [prototype.get_aging_rule() for prototype in _PROTOTYPES]
+    transform_costs = [prototype.get_transformation_cost() for prototype in _PROTOTYPES]
+    codes_by_name = {unit_type.__name__: code for unit_type, code in _TYPE_CODES.items()}
+    transform_targets = [codes_by_name.get(prototype.get_transformation_target())
+                         for prototype in _PROTOTYPES]
+
+    armies: Dict[int, _ReplayArmy] = {}
+    names: Dict[int, str] = {}
+    unpack = RECORD.unpack_from
+    size = RECORD.size
+    offset = 0
+    end = len(data)
+    while offset + size <= end:
+        opcode, army_id, a, b, c, d, e = unpack(data, offset)
+        offset += size
+
+        if opcode == NAME:
+            names[a] = bytes(data[offset:offset + b]).decode("utf-8")
+            offset += b
+            continue
+        if opcode == CREATE:
+            state = armies[army_id] = _ReplayArmy(a, b)
+            for unit_type in catalog.template(a):
+                state.units[state.next_uid] = [_TYPE_CODES[unit_type], 0, 0, 0]
+                state.next_uid += 1
+            continue
+        if opcode == REBUILD:
+            state = armies.get(army_id)
+            if state is None:
+                raise OperationLogError(f"Rebuild of army {army_id} before it was created")
+            state.gold = a
+            state.units = {}
+            state.next_uid = 0
+            for _ in range(b):
+                _, _, type_code, additional, age, penalty, _ = unpack(data, offset)
+                offset += size
+                state.units[state.next_uid] = [type_code, additional, age, penalty]
+                state.next_uid += 1
+            continue
+
+        state = armies.get(army_id)
+        if state is None:
+            raise OperationLogError(f"Record for army {army_id} before it was created")
+        units = state.units
+        if opcode == TRAIN:
+            unit = units[a]
+            unit[1] += gains[unit[0]]
+            state.gold -= costs[unit[0]]
+        elif opcode == TRANSFORM:
+            unit = units.pop(a)
+            target = transform_targets[unit[0]]
+            state.gold -= transform_costs[unit[0]]
+            units[state.next_uid] = [target, 0, unit[2],
+                                     rules[target].penalty(unit[2], bases[target])]
+            state.next_uid += 1
+        elif opcode == REMOVE:
+            del units[a]
+        elif opcode == SORT:
+            state.units = dict(sorted(
+                units.items(), key=lambda item: bases[item[1][0]] + item[1][1] - item[1][3],
+                reverse=True))
+        elif opcode == AGE:
+            for unit in units.values():
+                unit[2] += a
+                unit[3] = rules[unit[0]].penalty(unit[2], bases[unit[0]])
+        elif opcode == BATTLE:
+            state.gold += c
+            opponent = e >> 2
+            if opponent >= 0:
+                name, civilization_id = catalog.display_name(opponent), opponent
+            else:
+                name, civilization_id = names[-1 - opponent], None
+            state.history.append(BattleRecord(name, _RESULTS[e & 3], a, b, c, d, civilization_id))
+        elif opcode == FORGET:
+            state.history.pop()
+        else:
+            raise OperationLogError(f"Unknown opcode {opcode} at byte {offset - size}")
+
+    if offset != end:
+        raise OperationLogError("Operation log ends with a truncated record")
+
+    result: Dict[int, Army] = {}
+    for army_id, state in armies.items():
+        built: List[Unit] = []
+        for type_code, additional, age, penalty in state.units.values():
+            unit = UNIT_TYPES[type_code](age)
+            unit._additional_strength = additional
+            unit._age_penalty = penalty
+            built.append(unit)
+        army = Army.from_units(catalog.by_id(state.civilization_id), built, gold=state.gold)
+        army._battle_history = state.history
+        result[army_id] = army
+    return result
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from .battle import BattleOutcome
+
+
+class BattleOutcomeCache:
+    
+    DEFAULT_MAX_SIZE = 4096
+    
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self._max_size = max_size
+        self._entries: 'OrderedDict[Hashable, BattleOutcome]' = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+    
+    @property
+    def hits(self) -> int:
+        return self._hits
+    
+    @property
+    def misses(self) -> int:
+        return self._misses
+    
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+    
+    def get(self, key: Hashable) -> Optional[BattleOutcome]:
+        outcome = self._entries.get(key)
+        if outcome is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return outcome
+    
+    def put(self, key: Hashable, outcome: BattleOutcome) -> None:
+        self._entries[key] = outcome
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": self.hit_rate,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
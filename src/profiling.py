@@ -0,0 +1,253 @@
+import atexit
+import os
+import sys
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
+
+
+PROFILE_ENV_VAR = "ARMY_PROFILE"
+
+# Root phase that ARMY_PROFILE opens for the whole process
+PROCESS_PHASE = "process"
+
+_NO_PHASE = nullcontext()
+
+
+@dataclass
+class PhaseTiming:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class _Frame:
+    __slots__ = ("name", "start", "child_time", "is_phase")
+
+    def __init__(self, name: str, start: float, is_phase: bool = False):
+        self.name = name
+        self.start = start
+        self.child_time = 0.0
+        self.is_phase = is_phase
+
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    # co_qualname is new in Python 3.11
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _builtin_name(function: Any) -> str:
+    module = getattr(function, "__module__", None) or "builtins"
+    return f"{module}:{getattr(function, '__qualname__', repr(function))}"
+
+
+class Profiler:
+    # Deterministic profiler scoped to named phases. Every Python and C call
+    # made inside a phase is attributed its self time under the full stack,
+    # rooted at the phase names, which is the collapsed-stack format that
+    # flamegraph tools read.
+
+    def __init__(self):
+        self._timings: Dict[str, PhaseTiming] = {}
+        self._stacks: Dict[Tuple[str, ...], float] = {}
+        self._frames: List[_Frame] = []
+        self._phase_depths: List[int] = []
+        self._previous_profile: Any = None
+
+    def phase(self, name: str) -> '_Phase':
+        return _Phase(self, name)
+
+    @property
+    def timings(self) -> Dict[str, PhaseTiming]:
+        return dict(self._timings)
+
+    def collapsed_stacks(self) -> List[str]:
+        # One "frame;frame;... <microseconds>" line per distinct stack
+        lines = []
+        for stack, seconds in sorted(self._stacks.items()):
+            microseconds = round(seconds * 1_000_000)
+            if microseconds > 0:
+                lines.append(f"{';'.join(stack)} {microseconds}")
+        return lines
+
+    def timing_table(self) -> str:
+        total = sum(timing.seconds for name, timing in self._timings.items() if "/" not in name)
+        rows = [("phase", "calls", "total s", "mean ms", "share")]
+        for name, timing in sorted(self._timings.items()):
+            share = timing.seconds / total * 100 if total and "/" not in name else None
+            rows.append((name, str(timing.calls), f"{timing.seconds:.6f}",
+                         f"{timing.seconds / timing.calls * 1000:.3f}",
+                         "" if share is None else f"{share:.1f}%"))
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                      for column, (cell, width) in enumerate(zip(row, widths))).rstrip()
+            for row in rows)
+
+    def write(self, directory: str) -> List[str]:
+        # profile.folded holds every phase; <phase>.folded files hold one each
+        os.makedirs(directory, exist_ok=True)
+        lines = self.collapsed_stacks()
+        by_phase: Dict[str, List[str]] = {}
+        for line in lines:
+            by_phase.setdefault(line.split(";", 1)[0].split(" ", 1)[0], []).append(line)
+
+        written = [self._write_lines(os.path.join(directory, "profile.folded"), lines)]
+        for phase, phase_lines in sorted(by_phase.items()):
+            written.append(self._write_lines(os.path.join(directory, f"{phase}.folded"), phase_lines))
+        written.append(self._write_lines(os.path.join(directory, "timings.txt"),
+                                         self.timing_table().splitlines()))
+        return written
+
+    def reset(self) -> None:
+        if self._phase_depths:
+            raise RuntimeError("Cannot reset a profiler inside a phase")
+        self._timings.clear()
+        self._stacks.clear()
+
+    @staticmethod
+    def _write_lines(path: str, lines: List[str]) -> str:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.writelines(line + "\n" for line in lines)
+        return path
+
+    def _enter(self, name: str) -> None:
+        if not self._phase_depths:
+            self._frames = []
+            self._previous_profile = sys.getprofile()
+        else:
+            sys.setprofile(None)
+            self._drop_machinery("_Phase.__enter__")
+        self._phase_depths.append(len(self._frames))
+        self._frames.append(_Frame(name, time.perf_counter(), is_phase=True))
+        sys.setprofile(self._trace)
+
+    def _exit(self) -> None:
+        sys.setprofile(None)
+        now = time.perf_counter()
+        depth = self._phase_depths.pop()
+        # Only the with-statement machinery can still be open above the phase
+        del self._frames[depth + 1:]
+        phase_name = "/".join(frame.name for frame in self._frames if frame.is_phase)
+        started = self._frames[depth].start
+        self._close(depth, now)
+        del self._frames[depth]
+
+        timing = self._timings.setdefault(phase_name, PhaseTiming())
+        timing.calls += 1
+        timing.seconds += now - started
+
+        if self._phase_depths:
+            sys.setprofile(self._trace)
+        else:
+            sys.setprofile(self._previous_profile)
+
+    def _drop_machinery(self, entry_point: str) -> None:
+        for index in range(len(self._frames) - 1, self._phase_depths[-1], -1):
+            if self._frames[index].name.endswith(entry_point):
+                del self._frames[index:]
+                return
+
+    def _close(self, index: int, now: float) -> None:
+        frame = self._frames[index]
+        elapsed = now - frame.start
+        stack = tuple(entry.name for entry in self._frames[:index + 1])
+        self._stacks[stack] = self._stacks.get(stack, 0.0) + elapsed - frame.child_time
+        if index:
+            self._frames[index - 1].child_time += elapsed
+
+    def _trace(self, frame: Any, event: str, arg: Any) -> None:
+        now = time.perf_counter()
+        if event == "call":
+            self._frames.append(_Frame(_frame_name(frame), now))
+        elif event == "c_call":
+            self._frames.append(_Frame(_builtin_name(arg), now))
+        elif len(self._frames) > self._phase_depths[-1] + 1:
+            # return, c_return or c_exception of a frame entered in the phase
+            self._close(len(self._frames) - 1, now)
+            self._frames.pop()
+
+
+class _Phase:
+
+    def __init__(self, profiler: Profiler, name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self) -> Profiler:
+        self._profiler._enter(self._name)
+        return self._profiler
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self._profiler._exit()
+
+
+_active: Optional[Profiler] = None
+
+
+def enable_profiling() -> Profiler:
+    global _active
+    if _active is None:
+        _active = Profiler()
+    return _active
+
+
+def disable_profiling() -> Optional[Profiler]:
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _active
+
+
+def phase(name: str) -> ContextManager[Any]:
+    # A shared no-op context while profiling is off
+    if _active is None:
+        return _NO_PHASE
+    return _active.phase(name)
+
+
+def _forget_in_child() -> None:
+    # Forked sweep and shard workers inherit the hook and the profiler; only
+    # the parent profiles
+    global _active
+    if _active is not None:
+        sys.setprofile(None)
+        _active = None
+
+
+def _profile_from_environment() -> None:
+    # Everything the process runs is profiled under one root phase, so the
+    # variable works without the CLI; phases opened by the CLI or by user
+    # code nest below it. Spawned worker processes inherit the variable but
+    # must not profile, or they would overwrite the parent's output.
+    directory = os.environ.get(PROFILE_ENV_VAR)
+    # A spawned child imports this while re-running the parent's main
+    # module, when its process name is already set but parent_process()
+    # is not yet
+    multiprocessing = sys.modules.get("multiprocessing")
+    if multiprocessing is not None and (multiprocessing.parent_process() is not None or
+                                        multiprocessing.current_process().name != "MainProcess"):
+        return
+    if directory:
+        profiler = enable_profiling()
+        root = profiler.phase(PROCESS_PHASE)
+        root.__enter__()
+        atexit.register(_finish_process_profile, profiler, root, directory)
+
+
+def _finish_process_profile(profiler: Profiler, root: _Phase, directory: str) -> None:
+    if _active is not profiler:
+        # A forked child that exits normally; the parent writes the profile
+        return
+    if profiler._phase_depths:
+        root.__exit__(None, None, None)
+    profiler.write(directory)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_in_child)
+_profile_from_environment()
@@ -0,0 +1,201 @@
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type, TYPE_CHECKING
+
+from .observers import ArmyObserver
+from .units import Unit, Pikeman, Archer, Knight
+
+if TYPE_CHECKING:
+    from .army import Army
+
+
+UNIT_TYPES: Dict[str, Type[Unit]] = {"Pikeman": Pikeman, "Archer": Archer, "Knight": Knight}
+
+Range = Tuple[Optional[int], Optional[int]]
+UNBOUNDED: Range = (None, None)
+
+# id(unit) -> unit, in insertion order
+_Bucket = Dict[int, Unit]
+
+
+class _SortedBuckets:
+    # Units grouped by an integer key, with the keys kept sorted for ranges
+
+    def __init__(self):
+        self.buckets: Dict[int, _Bucket] = {}
+        self.keys: List[int] = []
+
+    def add(self, key: int, unit: Unit) -> None:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {}
+            insort(self.keys, key)
+        bucket[id(unit)] = unit
+
+    def remove(self, key: int, unit: Unit) -> None:
+        bucket = self.buckets[key]
+        del bucket[id(unit)]
+        if not bucket:
+            del self.buckets[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+    def in_range(self, minimum: Optional[int], maximum: Optional[int]) -> List[_Bucket]:
+        start = 0 if minimum is None else bisect_left(self.keys, minimum)
+        stop = len(self.keys) if maximum is None else bisect_right(self.keys, maximum)
+        return [self.buckets[key] for key in self.keys[start:stop]]
+
+
+class UnitIndex(ArmyObserver):
+    # Per unit type, units bucketed by total strength and by age. Ages are
+    # stored relative to an offset so ageing a whole army is O(1) here.
+
+    def __init__(self, army: 'Army'):
+        self._army = army
+        self._age_offset = 0
+        self._entries: Dict[int, Tuple[str, int, int]] = {}
+        self._by_strength: Dict[str, _SortedBuckets] = {}
+        self._by_age: Dict[str, _SortedBuckets] = {}
+        self._dirty = True
+        army._unit_observers.append(self)
+
+    def unit_added(self, unit: Unit) -> None:
+        if self._dirty:
+            return
+        type_name = unit.__class__.__name__
+        strength = unit.total_strength
+        stored_age = unit._age_in_years - self._age_offset
+        self._entries[id(unit)] = (type_name, strength, stored_age)
+        self._by_strength[type_name].add(strength, unit)
+        self._by_age[type_name].add(stored_age, unit)
+
+    def unit_removed(self, unit: Unit) -> None:
+        if self._dirty:
+            return
+        entry = self._entries.pop(id(unit), None)
+        if entry is None:
+            return
+        type_name, strength, stored_age = entry
+        self._by_strength[type_name].remove(strength, unit)
+        self._by_age[type_name].remove(stored_age, unit)
+
+    def unit_modified(self, unit: Unit) -> None:
+        if self._dirty:
+            return
+        entry = self._entries.get(id(unit))
+        if entry != (unit.__class__.__name__, unit.total_strength,
+                     unit._age_in_years - self._age_offset):
+            self.unit_removed(unit)
+            self.unit_added(unit)
+
+    def units_aged(self, years: int) -> None:
+        self._age_offset += years
+
+    def resync(self) -> None:
+        self._dirty = True
+
+    def candidates(self, types: Tuple[str, ...], strength: Range,
+                   age: Range) -> Tuple[List[_Bucket], bool]:
+        # Buckets to scan, and whether they still need the age filter. The
+        # age index is used when its buckets hold fewer units.
+        self._refresh()
+        by_strength: List[_Bucket] = []
+        by_age: List[_Bucket] = []
+        for type_name in types:
+            by_strength.extend(self._by_strength[type_name].in_range(*strength))
+            if age != UNBOUNDED:
+                by_age.extend(self._by_age[type_name].in_range(*self._stored_age_range(age)))
+
+        if age == UNBOUNDED:
+            return by_strength, False
+        if sum(map(len, by_age)) < sum(map(len, by_strength)):
+            return by_age, False
+        return by_strength, True
+
+    def _stored_age_range(self, age: Range) -> Range:
+        minimum, maximum = age
+        return (None if minimum is None else minimum - self._age_offset,
+                None if maximum is None else maximum - self._age_offset)
+
+    def _refresh(self) -> None:
+        self._army._sync()
+        if not self._dirty:
+            return
+        self._age_offset = 0
+        self._entries = {}
+        self._by_strength = {name: _SortedBuckets() for name in UNIT_TYPES}
+        self._by_age = {name: _SortedBuckets() for name in UNIT_TYPES}
+        self._dirty = False
+        for unit in self._army._units:
+            self.unit_added(unit)
+
+
+def _within(value: int, bounds: Range) -> bool:
+    minimum, maximum = bounds
+    return (minimum is None or value >= minimum) and (maximum is None or value <= maximum)
+
+
+@dataclass(frozen=True)
+class UnitQuery:
+    # Immutable: every refinement returns a new query, so partial queries can
+    # be reused. Bounds are inclusive. Results come in index order (by
+    # strength, or by age when that index is narrower), not army order, and
+    # the army must not be changed while a result iterator is being consumed.
+    index: UnitIndex
+    types: Tuple[str, ...] = tuple(UNIT_TYPES)
+    strength_range: Range = UNBOUNDED
+    additional_range: Range = UNBOUNDED
+    age_range: Range = UNBOUNDED
+    predicates: Tuple[Callable[[Unit], bool], ...] = ()
+
+    def of_type(self, *unit_types: Type[Unit]) -> 'UnitQuery':
+        names = tuple(name for name, cls in UNIT_TYPES.items()
+                      if name in self.types and issubclass(cls, unit_types))
+        return replace(self, types=names)
+
+    def strength(self, minimum: Optional[int] = None, maximum: Optional[int] = None) -> 'UnitQuery':
+        return replace(self, strength_range=(minimum, maximum))
+
+    def additional_strength(self, minimum: Optional[int] = None,
+                            maximum: Optional[int] = None) -> 'UnitQuery':
+        return replace(self, additional_range=(minimum, maximum))
+
+    def age(self, minimum: Optional[int] = None, maximum: Optional[int] = None) -> 'UnitQuery':
+        return replace(self, age_range=(minimum, maximum))
+
+    def where(self, predicate: Callable[[Unit], bool]) -> 'UnitQuery':
+        return replace(self, predicates=self.predicates + (predicate,))
+
+    def __iter__(self) -> Iterator[Unit]:
+        buckets, check_age = self.index.candidates(self.types, self.strength_range, self.age_range)
+        # Only the index that was not scanned needs its bounds re-checked
+        check_strength = (self.age_range != UNBOUNDED and not check_age
+                          and self.strength_range != UNBOUNDED)
+        check_additional = self.additional_range != UNBOUNDED
+        for bucket in buckets:
+            for unit in bucket.values():
+                if check_age and not _within(unit._age_in_years, self.age_range):
+                    continue
+                if check_strength and not _within(unit.total_strength, self.strength_range):
+                    continue
+                if check_additional and not _within(unit._additional_strength, self.additional_range):
+                    continue
+                if self.predicates and not all(predicate(unit) for predicate in self.predicates):
+                    continue
+                yield unit
+
+    def count(self) -> int:
+        if self.additional_range == UNBOUNDED and not self.predicates:
+            buckets, check_age = self.index.candidates(self.types, self.strength_range,
+                                                       self.age_range)
+            if not check_age and (self.age_range == UNBOUNDED or self.strength_range == UNBOUNDED):
+                return sum(map(len, buckets))
+        return sum(1 for _ in self)
+
+    def first(self) -> Optional[Unit]:
+        return next(iter(self), None)
+
+    def exists(self) -> bool:
+        return self.first() is not None
+
+    def all(self) -> List[Unit]:
+        return list(self)
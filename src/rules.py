@@ -0,0 +1,297 @@
+import copyreg
+import random
+from array import array
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .battle import BattleOutcome, BattleResult, BattleSystem, _split_reward
+from .strength_index import TYPE_RANK, UnitKey
+
+if TYPE_CHECKING:
+    from .army import Army
+
+
+class LossPolicy(Enum):
+    STRONGEST = "strongest"
+    WEAKEST = "weakest"
+    RANDOM = "random"
+    # Losses split across unit types by their share of the army, strongest
+    # units first within each type
+    PROPORTIONAL = "proportional"
+
+
+_INT_FIELDS = ("winner_reward", "reward_margin_percent", "loser_reward", "losses_on_defeat",
+               "loss_margin_step", "max_losses", "tie_losses", "tie_reward")
+_OPTIONAL_FIELDS = ("loss_margin_step", "max_losses")
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    # The winner gains winner_reward plus reward_margin_percent of the
+    # strength margin, the loser gains loser_reward. The loser loses
+    # losses_on_defeat units plus one per loss_margin_step points of margin,
+    # at most max_losses (which needs loss_margin_step). On a tie both sides
+    # lose tie_losses units and gain tie_reward. The defaults are the classic
+    # BattleSystem rules.
+    name: str = "classic"
+    winner_reward: int = BattleSystem.WINNER_GOLD_REWARD
+    reward_margin_percent: int = 0
+    loser_reward: int = 0
+    losses_on_defeat: int = BattleSystem.UNITS_LOST_ON_DEFEAT
+    loss_margin_step: Optional[int] = None
+    max_losses: Optional[int] = None
+    tie_losses: int = 1
+    tie_reward: int = 0
+    loss_policy: LossPolicy = LossPolicy.STRONGEST
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        # The values are written into generated source, so only plain ints
+        # are accepted
+        for name in _INT_FIELDS:
+            value = getattr(self, name)
+            if value is None and name in _OPTIONAL_FIELDS:
+                continue
+            if type(value) is not int:
+                raise TypeError(f"{name} must be an int, got {value!r}")
+        if min(self.winner_reward, self.reward_margin_percent, self.loser_reward,
+               self.tie_reward) < 0:
+            raise ValueError("Rewards cannot be negative")
+        if min(self.losses_on_defeat, self.tie_losses) < 0:
+            raise ValueError("Loss counts cannot be negative")
+        if self.loss_margin_step is not None and self.loss_margin_step < 1:
+            raise ValueError("loss_margin_step must be at least 1")
+        if self.max_losses is not None:
+            if self.loss_margin_step is None:
+                raise ValueError("max_losses only caps margin-based losses; set loss_margin_step")
+            if self.max_losses < 0:
+                raise ValueError("max_losses cannot be negative")
+
+    @property
+    def loss_depth(self) -> Optional[int]:
+        # Most units one battle can take from an army; None if unbounded
+        if self.loss_margin_step is None:
+            defeat = self.losses_on_defeat
+        elif self.max_losses is None:
+            return None
+        else:
+            defeat = self.max_losses
+        return max(defeat, self.tie_losses)
+
+    @property
+    def is_classic_campaign(self) -> bool:
+        # Whether CampaignSimulator's fast-forward and the coalition battle
+        # rules model these rules
+        return (self.loss_policy is LossPolicy.STRONGEST and not self.reward_margin_percent
+                and not self.loser_reward and self.loss_margin_step is None
+                and self.tie_losses == 1 and not self.tie_reward)
+
+    def compile(self) -> type:
+        # Random rule sets get a fresh generator on every compile
+        if self.loss_policy is LossPolicy.RANDOM:
+            return _compile(self)
+        compiled = _COMPILED.get(self)
+        if compiled is None:
+            compiled = _COMPILED[self] = _compile(self)
+        return compiled
+
+
+@dataclass(frozen=True)
+class BatchOutcome:
+    # One entry per matchup: 1 win, -1 loss, 0 tie from the first side, gold
+    # each side gains, and units each side is to lose (before army size caps)
+    results: array
+    gold1: array
+    gold2: array
+    losses1: array
+    losses2: array
+
+
+def _strongest(army: 'Army', count: int, skip: int) -> Tuple[UnitKey, ...]:
+    return army._strongest_keys(count, skip)
+
+
+def _weakest(army: 'Army', count: int, skip: int) -> Tuple[UnitKey, ...]:
+    army._sync()
+    index = army._strength_index
+    count = min(count, index.unit_count)
+    return tuple(reversed(index.top_keys(count, index.unit_count - count)))
+
+
+def _ordered_buckets(army: 'Army') -> List[Tuple[UnitKey, int]]:
+    army._sync()
+    return sorted(army._histogram.items(), key=lambda item: (-item[0][1], -TYPE_RANK[item[0][0]]))
+
+
+def _proportional(army: 'Army', count: int, skip: int) -> Tuple[UnitKey, ...]:
+    buckets = _ordered_buckets(army)
+    type_counts = dict.fromkeys(TYPE_RANK, 0)
+    for (type_name, _), units in buckets:
+        type_counts[type_name] += units
+    count = min(count, sum(type_counts.values()))
+    shares = dict(zip(type_counts, _split_reward(count, list(type_counts.values()))))
+    keys: List[UnitKey] = []
+    for key, units in buckets:
+        take = min(units, shares[key[0]])
+        shares[key[0]] -= take
+        keys.extend([key] * take)
+    return tuple(keys)
+
+
+class _RandomLosses:
+    # Units drawn uniformly without replacement from a seeded generator
+
+    def __init__(self, seed: Optional[int]):
+        self.rng = random.Random(seed)
+
+    def __call__(self, army: 'Army', count: int, skip: int) -> Tuple[UnitKey, ...]:
+        buckets = [[key, units] for key, units in _ordered_buckets(army)]
+        remaining = sum(units for _, units in buckets)
+        keys: List[UnitKey] = []
+        randrange = self.rng.randrange
+        while len(keys) < count and remaining:
+            pick = randrange(remaining)
+            for bucket in buckets:
+                if pick < bucket[1]:
+                    keys.append(bucket[0])
+                    bucket[1] -= 1
+                    break
+                pick -= bucket[1]
+            remaining -= 1
+        return tuple(keys)
+
+
+_SELECTORS: Dict[LossPolicy, Callable[..., Tuple[UnitKey, ...]]] = {
+    LossPolicy.STRONGEST: _strongest,
+    LossPolicy.WEAKEST: _weakest,
+    LossPolicy.PROPORTIONAL: _proportional,
+}
+
+_COMPILED: Dict[RuleSet, type] = {}
+
+# Source templates; the rule values are written in as literals, so the
+# resulting functions carry no per-battle rule lookups
+_COMPUTE_SOURCE = """
+def compute_outcome(cls, army1, army2, army1_losses=0, army2_losses=0):
+    {guard}
+    strength1 = army1.strength_after_losses(army1_losses)
+    strength2 = army2.strength_after_losses(army2_losses)
+    if strength1 > strength2:
+        margin = strength1 - strength2
+        return BattleOutcome(WIN, strength1, strength2, {reward}, {loser_reward},
+                             (), select(army2, {losses}, army2_losses))
+    if strength2 > strength1:
+        margin = strength2 - strength1
+        return BattleOutcome(LOSS, strength1, strength2, {loser_reward}, {reward},
+                             select(army1, {losses}, army1_losses), ())
+    return BattleOutcome(TIE, strength1, strength2, {tie_reward}, {tie_reward},
+                         select(army1, {tie_losses}, army1_losses),
+                         select(army2, {tie_losses}, army2_losses))
+"""
+
+_BATCH_SOURCE = """
+def compute_batch(cls, strengths1, strengths2):
+    results = []
+    gold1 = []
+    gold2 = []
+    losses1 = []
+    losses2 = []
+    for strength1, strength2 in zip(strengths1, strengths2):
+        if strength1 > strength2:
+            margin = strength1 - strength2
+            results.append(1)
+            gold1.append({reward})
+            gold2.append({loser_reward})
+            losses1.append(0)
+            losses2.append({losses})
+        elif strength2 > strength1:
+            margin = strength2 - strength1
+            results.append(-1)
+            gold1.append({loser_reward})
+            gold2.append({reward})
+            losses1.append({losses})
+            losses2.append(0)
+        else:
+            results.append(0)
+            gold1.append({tie_reward})
+            gold2.append({tie_reward})
+            losses1.append({tie_losses})
+            losses2.append({tie_losses})
+    return BatchOutcome(array('b', results), array('q', gold1), array('q', gold2),
+                        array('q', losses1), array('q', losses2))
+"""
+
+
+def _expressions(rules: RuleSet) -> Dict[str, str]:
+    reward = str(rules.winner_reward)
+    if rules.reward_margin_percent:
+        reward = f"{rules.winner_reward} + margin * {rules.reward_margin_percent} // 100"
+    losses = str(rules.losses_on_defeat)
+    if rules.loss_margin_step is not None:
+        losses = f"{rules.losses_on_defeat} + margin // {rules.loss_margin_step}"
+        if rules.max_losses is not None:
+            losses = f"min({losses}, {rules.max_losses})"
+    guard = "pass"
+    if rules.loss_policy is not LossPolicy.STRONGEST:
+        guard = ("if army1_losses or army2_losses:\n"
+                 "        raise ValueError('Assumed losses need the strongest-first loss policy')")
+    return {"reward": reward, "loser_reward": str(rules.loser_reward), "losses": losses,
+            "tie_losses": str(rules.tie_losses), "tie_reward": str(rules.tie_reward),
+            "guard": guard}
+
+
+def _resolve_many(cls, matchups: Sequence[Tuple['Army', 'Army']]) -> List[BattleOutcome]:
+    # Fought in order, so an army may appear in several matchups
+    resolve = cls.resolve_battle
+    return [resolve(army1, army2) for army1, army2 in matchups]
+
+
+def _unmodelled_coalition(cls, side1: Sequence['Army'], side2: Sequence['Army']) -> None:
+    raise ValueError("Coalition battles require fixed rewards and strongest-first losses")
+
+
+class _CompiledSystemType(type):
+    pass
+
+
+def _reduce_compiled(system: type):
+    # Pickled as the rule set, so spawned workers compile the same class;
+    # subclasses of a compiled system are still pickled by reference
+    rules = system.__dict__.get("RULES")
+    if rules is None:
+        return system.__qualname__
+    return RuleSet.compile, (rules,)
+
+
+copyreg.pickle(_CompiledSystemType, _reduce_compiled)
+
+
+def _compile(rules: RuleSet) -> type:
+    if rules.loss_policy is LossPolicy.RANDOM:
+        select = _RandomLosses(rules.seed)
+    else:
+        select = _SELECTORS[rules.loss_policy]
+    scope = {"BattleOutcome": BattleOutcome, "BatchOutcome": BatchOutcome, "array": array,
+             "WIN": BattleResult.WIN, "LOSS": BattleResult.LOSS, "TIE": BattleResult.TIE,
+             "select": select}
+    expressions = _expressions(rules)
+    exec(_COMPUTE_SOURCE.format(**expressions), scope)
+    exec(_BATCH_SOURCE.format(**expressions), scope)
+
+    namespace = {
+        "RULES": rules,
+        "WINNER_GOLD_REWARD": rules.winner_reward,
+        "UNITS_LOST_ON_DEFEAT": rules.losses_on_defeat,
+        "_STRONGEST_LOSSES": rules.loss_policy is LossPolicy.STRONGEST,
+        "_DETERMINISTIC": rules.loss_policy is not LossPolicy.RANDOM,
+        "compute_outcome": classmethod(scope["compute_outcome"]),
+        "compute_batch": classmethod(scope["compute_batch"]),
+        "resolve_many": classmethod(_resolve_many),
+    }
+    if not rules.is_classic_campaign:
+        namespace["compute_coalition_outcome"] = classmethod(_unmodelled_coalition)
+    system = _CompiledSystemType("CompiledBattleSystem", (BattleSystem,), namespace)
+    system.__qualname__ = f"CompiledBattleSystem[{rules.name}]"
+    system.__module__ = __name__
+    return system
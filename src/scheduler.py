@@ -0,0 +1,155 @@
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from .battle import BattleSystem
+
+if TYPE_CHECKING:
+    from .army import Army
+    from .units import Unit
+
+
+ATTACK = "attack"
+TRAIN = "train"
+TRANSFORM = "transform"
+CALLBACK = "callback"
+
+# Heap entries: (time, sequence, kind, first, second)
+_Event = Tuple[float, int, str, Any, Any]
+EventListener = Callable[[float, str, Any], None]
+
+
+@dataclass
+class SchedulerStats:
+    events_processed: int = 0
+    batches_processed: int = 0
+    errors: List[Tuple[float, str, Exception]] = field(default_factory=list)
+
+
+class EventScheduler:
+
+    def __init__(self, battle_system: type = BattleSystem, start_time: float = 0.0,
+                 listener: Optional[EventListener] = None, collect_errors: bool = False):
+        self._battle_system = battle_system
+        self._now = start_time
+        self._queue: List[_Event] = []
+        self._sequence = 0
+        self._listener = listener
+        self._collect_errors = collect_errors
+        self._stats = SchedulerStats()
+        self._handlers = {
+            ATTACK: self._run_attack,
+            TRAIN: self._run_training,
+            TRANSFORM: self._run_transform,
+            CALLBACK: self._run_callback,
+        }
+
+    @property
+    def now(self) -> float:
+        return self._now
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    @property
+    def stats(self) -> SchedulerStats:
+        return self._stats
+
+    def next_time(self) -> Optional[float]:
+        return self._queue[0][0] if self._queue else None
+
+    def schedule_attack(self, time: float, attacker: 'Army', defender: 'Army') -> None:
+        self._push(time, ATTACK, attacker, defender)
+
+    def schedule_training(self, time: float, army: 'Army', unit: 'Unit') -> None:
+        self._push(time, TRAIN, army, unit)
+
+    def schedule_transform(self, time: float, army: 'Army', unit: 'Unit') -> None:
+        self._push(time, TRANSFORM, army, unit)
+
+    def schedule(self, time: float, callback: Callable[['EventScheduler'], Any]) -> None:
+        self._push(time, CALLBACK, callback, None)
+
+    def schedule_many(self, events: Iterable[Tuple[float, str, Any, Any]]) -> None:
+        # Bulk insert of (time, kind, first, second) tuples with one heapify;
+        # every event is checked first, so a bad one schedules nothing
+        sequence = self._sequence
+        checked: List[_Event] = []
+        for time, kind, first, second in events:
+            if kind not in self._handlers:
+                raise ValueError(f"Unknown event kind: {kind}")
+            if time < self._now:
+                raise ValueError(f"Cannot schedule an event at {time}, before now ({self._now})")
+            checked.append((time, sequence, kind, first, second))
+            sequence += 1
+        self._queue.extend(checked)
+        self._sequence = sequence
+        heapq.heapify(self._queue)
+
+    def step(self) -> int:
+        # Processes every event sharing the earliest timestamp, in the order
+        # they were scheduled; events they schedule for the same time run in
+        # the next batch
+        if not self._queue:
+            return 0
+
+        queue = self._queue
+        time = queue[0][0]
+        batch = []
+        while queue and queue[0][0] == time:
+            batch.append(heapq.heappop(queue))
+
+        self._now = time
+        handlers = self._handlers
+        listener = self._listener
+        for position, (_, _, kind, first, second) in enumerate(batch):
+            try:
+                result = handlers[kind](first, second)
+            except Exception as exc:
+                if not self._collect_errors:
+                    # The failed event is consumed; the rest of the batch
+                    # goes back on the heap with its original sequence
+                    for event in batch[position + 1:]:
+                        heapq.heappush(queue, event)
+                    self._stats.events_processed += position + 1
+                    raise
+                self._stats.errors.append((time, kind, exc))
+                continue
+            if listener is not None:
+                listener(time, kind, result)
+
+        self._stats.events_processed += len(batch)
+        self._stats.batches_processed += 1
+        return len(batch)
+
+    def run(self, until: Optional[float] = None, max_events: Optional[int] = None) -> SchedulerStats:
+        processed = 0
+        while self._queue:
+            if until is not None and self._queue[0][0] > until:
+                break
+            if max_events is not None and processed >= max_events:
+                break
+            processed += self.step()
+        if until is not None and until > self._now:
+            self._now = until
+        return self._stats
+
+    def _push(self, time: float, kind: str, first: Any, second: Any) -> None:
+        if time < self._now:
+            raise ValueError(f"Cannot schedule an event at {time}, before now ({self._now})")
+        heapq.heappush(self._queue, (time, self._sequence, kind, first, second))
+        self._sequence += 1
+
+    def _run_attack(self, attacker: 'Army', defender: 'Army') -> Any:
+        return self._battle_system.resolve_battle(attacker, defender)
+
+    def _run_training(self, army: 'Army', unit: 'Unit') -> Any:
+        army.train_unit(unit)
+        return unit
+
+    def _run_transform(self, army: 'Army', unit: 'Unit') -> Any:
+        return army.transform_unit(unit)
+
+    def _run_callback(self, callback: Callable[['EventScheduler'], Any], _: Any) -> Any:
+        return callback(self)
@@ -0,0 +1,326 @@
+import multiprocessing
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .army import Army
+from .battle import BattleOutcome, BattleRecord, BattleResult, BattleSystem, _OPPOSITE_RESULT
+from .catalog import AnyCivilization, CivilizationCatalog, civilization_id, default_catalog
+from .checkpoint import UnitState, build_unit, unit_state
+from .rules import LossPolicy
+from .strength_index import UnitKey
+
+
+class ShardError(Exception):
+    pass
+
+
+# Civilization id, gold, units, battle history
+ArmyState = Tuple[int, int, List[UnitState], List[BattleRecord]]
+
+# Army id, result, own strength, opponent strength, gold gained, removed keys,
+# opponent name, opponent civilization id
+SideUpdate = Tuple[int, BattleResult, int, int, int, Tuple[UnitKey, ...], str, Optional[int]]
+
+
+@dataclass(frozen=True)
+class BattleFront:
+    # What a shard reveals about an army for a battle on another shard: its
+    # strength and the keys of the units it would lose first. It answers the
+    # two questions BattleSystem.compute_outcome asks of an army.
+    army_id: int
+    civilization_id: int
+    civilization_name: str
+    strength: int
+    strongest: Tuple[UnitKey, ...]
+
+    def strength_after_losses(self, count: int) -> int:
+        return self.strength - sum(key[1] for key in self.strongest[:count])
+
+    def _strongest_keys(self, count: int, skip: int = 0) -> Tuple[UnitKey, ...]:
+        return self.strongest[skip:skip + count]
+
+
+@dataclass
+class ShardStats:
+    battles: int = 0
+    local_battles: int = 0
+    cross_shard_battles: int = 0
+    waves: int = 0
+    messages: int = 0
+
+
+def _front_depth(battle_system: type) -> int:
+    # How many strongest unit keys a BattleFront must carry
+    rules = getattr(battle_system, "RULES", None)
+    if rules is None:
+        return max(battle_system.UNITS_LOST_ON_DEFEAT, 1)
+    if rules.loss_policy is not LossPolicy.STRONGEST or rules.loss_depth is None:
+        raise ValueError("Cross-shard battles need bounded, strongest-first losses")
+    return max(rules.loss_depth, 1)
+
+
+class _Shard:
+    # The armies one worker process owns, and the commands it answers
+
+    def __init__(self, catalog: CivilizationCatalog, battle_system: type):
+        self._catalog = catalog
+        self._battle_system = battle_system
+        self._armies: Dict[int, Army] = {}
+        self._front_depth = _front_depth(battle_system)
+
+    def spawn(self, army_ids: List[int], civ_id: int, gold: int) -> None:
+        civilization = self._catalog.by_id(civ_id)
+        for army_id in army_ids:
+            army = Army(civilization)
+            army._gold = gold
+            self._armies[army_id] = army
+
+    def load(self, army_id: int, state: ArmyState) -> None:
+        civ_id, gold, units, history = state
+        army = Army.from_units(self._catalog.by_id(civ_id), map(build_unit, units), gold=gold)
+        army._battle_history = list(history)
+        self._armies[army_id] = army
+
+    def export(self, army_id: int) -> ArmyState:
+        army = self._armies[army_id]
+        return (army._civilization_id, army._gold, [unit_state(unit) for unit in army._units],
+                list(army._battle_history))
+
+    def strengths(self) -> Dict[int, int]:
+        return {army_id: army.total_strength for army_id, army in self._armies.items()}
+
+    def wave(self, updates: List[SideUpdate], battles: List[Tuple[int, int]],
+             fronts: List[int]) -> Tuple[List[BattleOutcome], List[BattleFront]]:
+        # Applies the previous wave's cross-shard results, fights this wave's
+        # local battles and describes the armies needed elsewhere. Armies in
+        # one wave are disjoint, so the order of the last two steps is free.
+        apply_side = self._battle_system.apply_side
+        for army_id, *side in updates:
+            apply_side(self._armies[army_id], *side)
+        resolve = self._battle_system.resolve_battle
+        outcomes = [resolve(self._armies[first], self._armies[second]) for first, second in battles]
+        return outcomes, [self._front(army_id) for army_id in fronts]
+
+    def _front(self, army_id: int) -> BattleFront:
+        army = self._armies[army_id]
+        return BattleFront(army_id, army._civilization_id, army._civilization_name,
+                           army.total_strength, army._ordered_strongest_keys(self._front_depth))
+
+
+def _shard_main(connection: Any, catalog: CivilizationCatalog, battle_system: type) -> None:
+    shard = _Shard(catalog, battle_system)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        command, arguments = message
+        try:
+            connection.send((True, getattr(shard, command)(*arguments)))
+        except Exception as error:
+            connection.send((False, error))
+    connection.close()
+
+
+class ShardedWorld:
+    # Armies partitioned across worker processes by id (army id modulo the
+    # shard count). Battles are grouped into waves in which no army appears
+    # twice; every shard fights its local battles of a wave in parallel, and
+    # battles between shards are decided here from the two BattleFronts, with
+    # each shard then applying its own side. Results are identical to
+    # fighting the battles one after another in the order given.
+
+    def __init__(self, shard_count: int = 2, catalog: CivilizationCatalog = default_catalog,
+                 battle_system: type = BattleSystem, start_method: Optional[str] = None):
+        if shard_count < 1:
+            raise ValueError("A sharded world needs at least one shard")
+        _front_depth(battle_system)
+        self._catalog = catalog
+        self._battle_system = battle_system
+        self._shard_count = shard_count
+        self._next_id = 0
+        self._stats = ShardStats()
+        # Cross-shard results waiting to ride along with the next message
+        self._pending: List[List[SideUpdate]] = [[] for _ in range(shard_count)]
+
+        context = multiprocessing.get_context(start_method)
+        self._connections = []
+        self._processes = []
+        for _ in range(shard_count):
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_main, args=(child, catalog, battle_system),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self) -> 'ShardedWorld':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    @property
+    def shard_count(self) -> int:
+        return self._shard_count
+
+    @property
+    def stats(self) -> ShardStats:
+        return ShardStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        return self._next_id
+
+    def shard_of(self, army_id: int) -> int:
+        if not 0 <= army_id < self._next_id:
+            raise IndexError(f"No army with id {army_id}")
+        return army_id % self._shard_count
+
+    def spawn(self, civilization: AnyCivilization, count: int = 1,
+              gold: int = Army.INITIAL_GOLD) -> List[int]:
+        army_ids = list(range(self._next_id, self._next_id + count))
+        by_shard: Dict[int, List[int]] = {}
+        for army_id in army_ids:
+            by_shard.setdefault(army_id % self._shard_count, []).append(army_id)
+        civ_id = civilization_id(civilization)
+        self._exchange({shard: ("spawn", (ids, civ_id, gold)) for shard, ids in by_shard.items()})
+        self._next_id += count
+        return army_ids
+
+    def add(self, army: Army) -> int:
+        # Copies the army into its shard; later changes to `army` are not seen
+        army_id = self._next_id
+        state = (army._civilization_id, army._gold, [unit_state(unit) for unit in army._units],
+                 list(army._battle_history))
+        self._exchange({army_id % self._shard_count: ("load", (army_id, state))})
+        self._next_id += 1
+        return army_id
+
+    def to_army(self, army_id: int) -> Army:
+        shard = self.shard_of(army_id)
+        civ_id, gold, units, history = self._exchange({shard: ("export", (army_id,))})[shard]
+        army = Army.from_units(self._catalog.by_id(civ_id), map(build_unit, units), gold=gold)
+        army._battle_history = history
+        return army
+
+    def strengths(self) -> Dict[int, int]:
+        strengths: Dict[int, int] = {}
+        replies = self._exchange({shard: ("strengths", ()) for shard in range(self._shard_count)})
+        for shard_strengths in replies.values():
+            strengths.update(shard_strengths)
+        return dict(sorted(strengths.items()))
+
+    def run_battles(self, matchups: Sequence[Tuple[int, int]]) -> List[BattleOutcome]:
+        # Outcomes follow the order of `matchups`, from the first army's side
+        for first, second in matchups:
+            self.shard_of(first)
+            self.shard_of(second)
+            if first == second:
+                raise ValueError("An army cannot fight itself")
+
+        outcomes: List[Optional[BattleOutcome]] = [None] * len(matchups)
+        for wave in self._waves(matchups):
+            shard_count = self._shard_count
+            local: List[List[int]] = [[] for _ in range(shard_count)]
+            cross: List[int] = []
+            fronts: List[List[int]] = [[] for _ in range(shard_count)]
+            for position in wave:
+                first, second = matchups[position]
+                if first % shard_count == second % shard_count:
+                    local[first % shard_count].append(position)
+                else:
+                    cross.append(position)
+                    fronts[first % shard_count].append(first)
+                    fronts[second % shard_count].append(second)
+
+            requests = {}
+            for shard in range(shard_count):
+                if local[shard] or fronts[shard] or self._pending[shard]:
+                    battles = [matchups[position] for position in local[shard]]
+                    requests[shard] = ("wave", (self._pending[shard], battles, fronts[shard]))
+                    self._pending[shard] = []
+            replies = self._exchange(requests)
+
+            by_army: Dict[int, BattleFront] = {}
+            for shard, (shard_outcomes, shard_fronts) in replies.items():
+                for position, outcome in zip(local[shard], shard_outcomes):
+                    outcomes[position] = outcome
+                by_army.update((front.army_id, front) for front in shard_fronts)
+            for position in cross:
+                first, second = matchups[position]
+                outcomes[position] = self._cross_battle(by_army[first], by_army[second])
+
+            self._stats.waves += 1
+            self._stats.local_battles += len(wave) - len(cross)
+            self._stats.cross_shard_battles += len(cross)
+        self._stats.battles += len(matchups)
+        return outcomes
+
+    def flush(self) -> None:
+        # Delivers cross-shard results that have not been sent yet
+        requests = {shard: ("wave", (updates, [], [])) for shard, updates
+                    in enumerate(self._pending) if updates}
+        self._pending = [[] for _ in range(self._shard_count)]
+        self._exchange(requests)
+
+    def close(self) -> None:
+        if not self._processes:
+            return
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for connection, process in zip(self._connections, self._processes):
+            process.join()
+            connection.close()
+        self._connections = []
+        self._processes = []
+
+    def _cross_battle(self, front1: BattleFront, front2: BattleFront) -> BattleOutcome:
+        outcome = self._battle_system.compute_outcome(front1, front2)
+        shard_count = self._shard_count
+        self._pending[front1.army_id % shard_count].append(
+            (front1.army_id, outcome.result, outcome.army1_strength, outcome.army2_strength,
+             outcome.army1_gold_gained, outcome.army1_removed,
+             front2.civilization_name, front2.civilization_id))
+        self._pending[front2.army_id % shard_count].append(
+            (front2.army_id, _OPPOSITE_RESULT[outcome.result], outcome.army2_strength,
+             outcome.army1_strength, outcome.army2_gold_gained, outcome.army2_removed,
+             front1.civilization_name, front1.civilization_id))
+        return outcome
+
+    @staticmethod
+    def _waves(matchups: Sequence[Tuple[int, int]]) -> List[List[int]]:
+        # Each battle goes one wave after the last battle of either army, so
+        # every army still fights its battles in the given order
+        last_wave: Dict[int, int] = {}
+        waves: List[List[int]] = []
+        for position, (first, second) in enumerate(matchups):
+            wave = max(last_wave.get(first, -1), last_wave.get(second, -1)) + 1
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(position)
+            last_wave[first] = last_wave[second] = wave
+        return waves
+
+    def _exchange(self, requests: Dict[int, Tuple[str, Tuple[Any, ...]]]) -> Dict[int, Any]:
+        # Sends every request before waiting, so the shards work in parallel
+        if not self._processes:
+            raise ShardError("Sharded world is closed")
+        if any(self._pending) and any(command != "wave" for command, _ in requests.values()):
+            self.flush()
+        for shard, request in requests.items():
+            self._connections[shard].send(request)
+        replies: Dict[int, Any] = {}
+        failure: Optional[Exception] = None
+        for shard in requests:
+            ok, reply = self._connections[shard].recv()
+            if ok:
+                replies[shard] = reply
+            elif failure is None:
+                failure = reply
+        self._stats.messages += len(requests)
+        if failure is not None:
+            raise ShardError(f"Shard command failed: {failure!r}") from failure
+        return replies
@@ -0,0 +1,204 @@
+import multiprocessing
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator, List, Optional, Tuple, Type
+
+from .army import Army, InsufficientGoldError
+from .catalog import CivilizationCatalog, default_catalog
+from .units import Unit, Pikeman, Archer, Knight
+
+
+# Unit type codes stored in shared memory
+UNIT_TYPES: Tuple[Type[Unit], ...] = (Pikeman, Archer, Knight)
+UNIT_TYPE_CODES = {unit_type.__name__: code for code, unit_type in enumerate(UNIT_TYPES)}
+_PROTOTYPES: Tuple[Unit, ...] = tuple(unit_type() for unit_type in UNIT_TYPES)
+_BASE_STRENGTH = {unit_type: prototype.total_strength
+                  for unit_type, prototype in zip(UNIT_TYPES, _PROTOTYPES)}
+_AGING_RULES = tuple(prototype.get_aging_rule() for prototype in _PROTOTYPES)
+
+# Header slots (int64): gold, unit count, civilization id, capacity
+_HEADER_SLOTS = 4
+_GOLD, _COUNT, _CIVILIZATION, _CAPACITY = range(_HEADER_SLOTS)
+
+
+class SharedStorageError(Exception):
+    pass
+
+
+class SharedArmyStore:
+    # Army state laid out as flat arrays in one shared memory block.
+    #
+    # Ownership: the process that creates the store owns the block and is the
+    # only one allowed to unlink it. Any process may read. Writes go through
+    # the mutating methods, which take the store's lock; use writing() to hold
+    # it across several operations.
+    #
+    # Every process must use the creator's lock. Passing the store as a
+    # Process argument sends only its name and lock; like the lock itself it
+    # cannot be pickled at any other time. A process that attaches by name
+    # must be given the creator's lock, e.g. inherited as a Process argument.
+
+    def __init__(self, shm: SharedMemory, lock, owner: bool):
+        self._shm = shm
+        self._lock = lock
+        self._owner = owner
+        self._map_views()
+
+    @classmethod
+    def create(cls, army: Army, capacity: Optional[int] = None, lock=None) -> 'SharedArmyStore':
+        capacity = army.unit_count if capacity is None else capacity
+        if capacity < army.unit_count:
+            raise SharedStorageError(
+                f"Capacity {capacity} is smaller than the army ({army.unit_count} units)"
+            )
+
+        size = 8 * (_HEADER_SLOTS + 2 * capacity) + max(capacity, 1)
+        shm = SharedMemory(create=True, size=size)
+        header = shm.buf[:8 * _HEADER_SLOTS].cast('q')
+        header[_CAPACITY] = capacity
+        header.release()
+
+        store = cls(shm, lock if lock is not None else multiprocessing.RLock(), owner=True)
+        store.load_from(army)
+        return store
+
+    @classmethod
+    def attach(cls, name: str, lock) -> 'SharedArmyStore':
+        # `lock` must be the one the creating store uses (store.lock)
+        if lock is None:
+            raise SharedStorageError("Attaching needs the creating store's lock")
+        return cls(SharedMemory(name=name), lock, owner=False)
+
+    def _map_views(self) -> None:
+        buffer = self._shm.buf
+        self._header = buffer[:8 * _HEADER_SLOTS].cast('q')
+        capacity = self._header[_CAPACITY]
+        additional_end = 8 * (_HEADER_SLOTS + capacity)
+        age_end = additional_end + 8 * capacity
+        self._additional = buffer[8 * _HEADER_SLOTS:additional_end].cast('q')
+        self._ages = buffer[additional_end:age_end].cast('q')
+        self._types = buffer[age_end:age_end + capacity].cast('b')
+
+    def __getstate__(self):
+        multiprocessing.context.assert_spawning(self)
+        return (self._shm.name, self._lock)
+
+    def __setstate__(self, state) -> None:
+        name, lock = state
+        self.__init__(SharedMemory(name=name), lock, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def lock(self):
+        return self._lock
+
+    @property
+    def is_owner(self) -> bool:
+        return self._owner
+
+    @property
+    def capacity(self) -> int:
+        return self._header[_CAPACITY]
+
+    @property
+    def unit_count(self) -> int:
+        return self._header[_COUNT]
+
+    @property
+    def gold(self) -> int:
+        return self._header[_GOLD]
+
+    @property
+    def civilization_id(self) -> int:
+        return self._header[_CIVILIZATION]
+
+    @contextmanager
+    def writing(self) -> Iterator['SharedArmyStore']:
+        with self._lock:
+            yield self
+
+    def unit(self, index: int) -> Tuple[str, int, int]:
+        self._check_index(index)
+        return (UNIT_TYPES[self._types[index]].__name__, self._additional[index], self._ages[index])
+
+    def unit_strength(self, index: int) -> int:
+        # Same as Unit.total_strength, including the age penalty
+        self._check_index(index)
+        code = self._types[index]
+        base = _BASE_STRENGTH[UNIT_TYPES[code]]
+        return base + self._additional[index] - _AGING_RULES[code].penalty(self._ages[index], base)
+
+    @property
+    def total_strength(self) -> int:
+        return sum(self.unit_strength(i) for i in range(self.unit_count))
+
+    def add_gold(self, amount: int) -> None:
+        with self._lock:
+            self._header[_GOLD] += amount
+
+    def train_unit(self, index: int) -> int:
+        with self._lock:
+            self._check_index(index)
+            prototype = _PROTOTYPES[self._types[index]]
+            cost = prototype.get_training_cost()
+            if self._header[_GOLD] < cost:
+                raise InsufficientGoldError(
+                    f"Not enough gold for training. Need {cost}, have {self._header[_GOLD]}"
+                )
+            self._additional[index] += prototype.get_training_strength_gain()
+            self._header[_GOLD] -= cost
+            return cost
+
+    def load_from(self, army: Army) -> None:
+        units = army._units
+        if len(units) > self.capacity:
+            raise SharedStorageError(
+                f"Army has {len(units)} units but the store holds {self.capacity}"
+            )
+        with self._lock:
+            for index, unit in enumerate(units):
+                self._types[index] = UNIT_TYPE_CODES[unit.__class__.__name__]
+                self._additional[index] = unit.additional_strength
+                self._ages[index] = unit.age_in_years
+            self._header[_COUNT] = len(units)
+            self._header[_GOLD] = army.gold
+            self._header[_CIVILIZATION] = army.civilization_id
+
+    def to_units(self) -> List[Unit]:
+        units: List[Unit] = []
+        for index in range(self.unit_count):
+            unit = UNIT_TYPES[self._types[index]](self._ages[index])
+            unit._additional_strength = self._additional[index]
+            units.append(unit)
+        return units
+
+    def store_into(self, army: Army) -> None:
+        if army.civilization_id != self.civilization_id:
+            raise SharedStorageError("Shared store belongs to a different civilization")
+        army._units = self.to_units()
+        army._gold = self.gold
+        army._sync()
+
+    def to_army(self, catalog: CivilizationCatalog = default_catalog) -> Army:
+        army = Army(catalog.by_id(self.civilization_id))
+        self.store_into(army)
+        return army
+
+    def close(self) -> None:
+        # Views must be released before the mapping can be closed
+        for view in (self._header, self._additional, self._ages, self._types):
+            view.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        if not self._owner:
+            raise SharedStorageError("Only the creating process may unlink a shared store")
+        self._shm.unlink()
+
+    def _check_index(self, index: int) -> None:
+        if not 0 <= index < self._header[_COUNT]:
+            raise IndexError(f"Unit index {index} out of range")
+
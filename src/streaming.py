@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .battle import BattleOutcome, BattleResult, BattleSystem
+
+if TYPE_CHECKING:
+    from .army import Army
+
+
+@dataclass(frozen=True)
+class ArmyDelta:
+    gold_change: int
+    strength_change: int
+    units_lost: int
+
+
+@dataclass(frozen=True)
+class BattleEvent:
+    sequence: int
+    round: int
+    army1: 'Army'
+    army2: 'Army'
+    outcome: BattleOutcome
+    army1_delta: ArmyDelta
+    army2_delta: ArmyDelta
+
+    @property
+    def winner(self) -> Optional['Army']:
+        if self.outcome.result == BattleResult.WIN:
+            return self.army1
+        if self.outcome.result == BattleResult.LOSS:
+            return self.army2
+        return None
+
+
+def stream_battles(matchups: Iterable[Tuple['Army', 'Army']], battle_system: type = BattleSystem,
+                   keep_history: bool = True, round_number: int = 0,
+                   start_sequence: int = 0) -> Iterator[BattleEvent]:
+    # Pull-based: a matchup is only taken from `matchups` and fought when the
+    # consumer asks for the next event, so a slow consumer paces the run.
+    # With keep_history=False the battle records are not retained on the
+    # armies and memory stays constant however long the stream runs; the
+    # armies' observers are told each record was dropped.
+    sequence = start_sequence
+    for army1, army2 in matchups:
+        gold1, gold2 = army1._gold, army2._gold
+        strength1, strength2 = army1.total_strength, army2.total_strength
+        count1, count2 = len(army1._units), len(army2._units)
+
+        outcome = battle_system.resolve_battle(army1, army2)
+        if not keep_history:
+            army1._forget_battle()
+            army2._forget_battle()
+
+        yield BattleEvent(
+            sequence, round_number, army1, army2, outcome,
+            ArmyDelta(army1._gold - gold1, army1.total_strength - strength1,
+                      count1 - len(army1._units)),
+            ArmyDelta(army2._gold - gold2, army2.total_strength - strength2,
+                      count2 - len(army2._units)),
+        )
+        sequence += 1
+
+
+def stream_tournament(armies: Sequence['Army'], rounds: int = 1, battle_system: type = BattleSystem,
+                      keep_history: bool = True) -> Iterator[BattleEvent]:
+    # Round robin: every pair fights once per round, in combinations() order
+    if len({id(army) for army in armies}) != len(armies):
+        raise ValueError("An army can only appear once in a tournament")
+    sequence = 0
+    for round_number in range(rounds):
+        for event in stream_battles(combinations(armies, 2), battle_system, keep_history,
+                                    round_number, sequence):
+            sequence += 1
+            yield event
+
+
+def stream_campaign(army1: 'Army', army2: 'Army', max_rounds: Optional[int] = None,
+                    battle_system: type = BattleSystem,
+                    keep_history: bool = True) -> Iterator[BattleEvent]:
+    # army1 attacks army2 until one side has no units left or max_rounds is hit
+    round_number = 0
+    while army1._units and army2._units and (max_rounds is None or round_number < max_rounds):
+        yield from stream_battles(((army1, army2),), battle_system, keep_history,
+                                  round_number, round_number)
+        round_number += 1
+
+
+class StreamTally:
+    # Constant-memory aggregation over a stream of battle events
+
+    def __init__(self):
+        self._armies: Dict[int, 'Army'] = {}
+        self._wins: Dict[int, int] = {}
+        self._gold: Dict[int, int] = {}
+        self._units_lost: Dict[int, int] = {}
+        self.battles = 0
+        self.ties = 0
+
+    def add(self, event: BattleEvent) -> None:
+        self.battles += 1
+        for army, delta in ((event.army1, event.army1_delta), (event.army2, event.army2_delta)):
+            key = id(army)
+            if key not in self._armies:
+                self._armies[key] = army
+                self._wins[key] = 0
+                self._gold[key] = 0
+                self._units_lost[key] = 0
+            self._gold[key] += delta.gold_change
+            self._units_lost[key] += delta.units_lost
+        winner = event.winner
+        if winner is None:
+            self.ties += 1
+        else:
+            self._wins[id(winner)] += 1
+
+    def consume(self, events: Iterable[BattleEvent]) -> 'StreamTally':
+        for event in events:
+            self.add(event)
+        return self
+
+    def wins(self, army: 'Army') -> int:
+        return self._wins.get(id(army), 0)
+
+    def gold_gained(self, army: 'Army') -> int:
+        return self._gold.get(id(army), 0)
+
+    def units_lost(self, army: 'Army') -> int:
+        return self._units_lost.get(id(army), 0)
+
+    def standings(self) -> List[Tuple['Army', int]]:
+        # Most wins first; armies with equal wins keep first-seen order
+        return sorted(((army, self._wins[key]) for key, army in self._armies.items()),
+                      key=lambda entry: entry[1], reverse=True)
@@ -0,0 +1,103 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Tuple
+
+from .units import Unit
+
+
+UnitKey = Tuple[str, int]
+
+# Loss selection prefers the higher unit class when strengths are equal
+TYPE_RANK = {"Pikeman": 0, "Archer": 1, "Knight": 2}
+
+
+def unit_key(unit: Unit) -> UnitKey:
+    return (unit.__class__.__name__, unit.total_strength)
+
+
+def _order_key(key: UnitKey) -> Tuple[int, int, str]:
+    return (-key[1], -TYPE_RANK[key[0]], key[0])
+
+
+class StrengthIndex:
+
+    def __init__(self, histogram: Dict[UnitKey, int]):
+        # Shares the owning army's histogram; buckets are kept strongest first
+        self._histogram = histogram
+        self._order: List[Tuple[int, int, str]] = sorted(_order_key(key) for key in histogram)
+        self._cum_counts: List[int] = []
+        self._cum_strength: List[int] = []
+        self._dirty = True
+
+    def bucket_added(self, key: UnitKey) -> None:
+        insort(self._order, _order_key(key))
+        self._dirty = True
+
+    def bucket_removed(self, key: UnitKey) -> None:
+        del self._order[bisect_left(self._order, _order_key(key))]
+        self._dirty = True
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+
+    def _refresh(self) -> None:
+        if not self._dirty:
+            return
+
+        count = 0
+        strength = 0
+        cum_counts = []
+        cum_strength = []
+        for negative_strength, _, type_name in self._order:
+            bucket = self._histogram[(type_name, -negative_strength)]
+            count += bucket
+            strength -= negative_strength * bucket
+            cum_counts.append(count)
+            cum_strength.append(strength)
+
+        self._cum_counts = cum_counts
+        self._cum_strength = cum_strength
+        self._dirty = False
+
+    @property
+    def unit_count(self) -> int:
+        self._refresh()
+        return self._cum_counts[-1] if self._cum_counts else 0
+
+    @property
+    def total_strength(self) -> int:
+        self._refresh()
+        return self._cum_strength[-1] if self._cum_strength else 0
+
+    def top_strength(self, count: int) -> int:
+        # Combined strength of the `count` strongest units
+        self._refresh()
+        if count <= 0:
+            return 0
+        if count >= self.unit_count:
+            return self.total_strength
+
+        bucket = bisect_right(self._cum_counts, count - 1)
+        before_count = self._cum_counts[bucket - 1] if bucket else 0
+        before_strength = self._cum_strength[bucket - 1] if bucket else 0
+        return before_strength - self._order[bucket][0] * (count - before_count)
+
+    def strength_without_top(self, count: int) -> int:
+        return self.total_strength - self.top_strength(count)
+
+    def top_keys(self, count: int, skip: int = 0) -> Tuple[UnitKey, ...]:
+        # Keys of the units ranked skip .. skip + count - 1, strongest first
+        self._refresh()
+        if count <= 0 or skip >= self.unit_count:
+            return ()
+
+        bucket = bisect_right(self._cum_counts, skip)
+        position = skip
+        keys: List[UnitKey] = []
+        while len(keys) < count and bucket < len(self._order):
+            negative_strength, _, type_name = self._order[bucket]
+            available = self._cum_counts[bucket] - position
+            take = min(available, count - len(keys))
+            keys.extend([(type_name, -negative_strength)] * take)
+            position += take
+            bucket += 1
+        return tuple(keys)
@@ -0,0 +1,266 @@
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from .army import Army
+from .civilizations import CivilizationConfig
+from .units import Unit
+from .world import BASE_STRENGTH, TRAINING_COST, TRAINING_GAIN, TRANSFORM_COST, UNIT_TYPES
+
+
+# Pikemen, archers, knights
+Composition = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class SweepPolicy:
+    # How a fresh army spends its gold before fighting. Units of each type in
+    # `transform` are transformed one at a time while gold lasts, in the order
+    # given (so (Pikeman, Archer) can turn pikemen into knights). The rest goes
+    # into repeated training of the first type in `train` the army still has.
+    # `reserve` gold is never spent.
+    name: str
+    transform: Tuple[Type[Unit], ...] = ()
+    train: Tuple[Type[Unit], ...] = ()
+    gold: int = Army.INITIAL_GOLD
+    reserve: int = 0
+
+    def __post_init__(self):
+        for unit_type in self.transform:
+            if unit_type not in UNIT_TYPES or TRANSFORM_COST[UNIT_TYPES.index(unit_type)] is None:
+                raise ValueError(f"{unit_type.__name__} cannot be transformed")
+
+
+def composition_of(config: Union[CivilizationConfig, Composition]) -> Composition:
+    if isinstance(config, CivilizationConfig):
+        return (config.pikemen, config.archers, config.knights)
+    return tuple(config)
+
+
+def composition_grid(pikemen: Iterable[int], archers: Iterable[int],
+                     knights: Iterable[int]) -> Iterator[Composition]:
+    return product(pikemen, archers, knights)
+
+
+def sample_compositions(count: int, max_units: int, seed: Optional[int] = None) -> List[Composition]:
+    # Distinct random compositions with up to `max_units` of each type and at
+    # least one unit overall
+    if count > (max_units + 1) ** 3 - 1:
+        raise ValueError("Cannot sample more compositions than exist")
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < count:
+        composition = (rng.randint(0, max_units), rng.randint(0, max_units), rng.randint(0, max_units))
+        if any(composition):
+            seen.add(composition)
+    return sorted(seen)
+
+
+def apply_policy(army: Army, policy: SweepPolicy) -> None:
+    # The same spending as policy_strengths, through the Army methods
+    for unit_type in policy.transform:
+        cost = TRANSFORM_COST[UNIT_TYPES.index(unit_type)]
+        for unit in army.get_units_by_type(unit_type):
+            if army.gold - policy.reserve < cost:
+                break
+            army.transform_unit(unit)
+    for unit_type in policy.train:
+        units = army.get_units_by_type(unit_type)
+        if units:
+            while army.gold - policy.reserve >= units[0].get_training_cost():
+                army.train_unit(units[0])
+            break
+
+
+def policy_strengths(compositions: Sequence[Composition], policy: SweepPolicy) -> array:
+    # Total strength of every composition after the policy, computed column
+    # by column without creating armies
+    counts = [[composition[position] for composition in compositions]
+              for position in range(len(UNIT_TYPES))]
+    gold = [policy.gold - policy.reserve] * len(compositions)
+
+    for unit_type in policy.transform:
+        position = UNIT_TYPES.index(unit_type)
+        cost = TRANSFORM_COST[position]
+        moved = [min(count, budget // cost) if budget > 0 else 0
+                 for count, budget in zip(counts[position], gold)]
+        counts[position] = [count - units for count, units in zip(counts[position], moved)]
+        counts[position + 1] = [count + units for count, units in zip(counts[position + 1], moved)]
+        gold = [budget - units * cost for budget, units in zip(gold, moved)]
+
+    strengths = [0] * len(compositions)
+    for position in range(len(UNIT_TYPES)):
+        base = BASE_STRENGTH[position]
+        strengths = [total + count * base for total, count in zip(strengths, counts[position])]
+
+    if policy.train:
+        # The remaining gold trains each army's first listed type it has units of
+        untrained = [True] * len(compositions)
+        for unit_type in policy.train:
+            position = UNIT_TYPES.index(unit_type)
+            cost, gain = TRAINING_COST[position], TRAINING_GAIN[position]
+            strengths = [total + (budget // cost) * gain if pending and count and budget > 0 else total
+                         for total, pending, count, budget
+                         in zip(strengths, untrained, counts[position], gold)]
+            untrained = [pending and not count for pending, count in zip(untrained, counts[position])]
+    return array('q', strengths)
+
+
+def _evaluate_chunk(compositions: List[Composition],
+                    policies: Tuple[SweepPolicy, ...]) -> List[array]:
+    return [policy_strengths(compositions, policy) for policy in policies]
+
+
+class SweepCache:
+    # Strength per (composition, policy), shared across sweeps. Hits and
+    # misses count compositions.
+
+    def __init__(self):
+        self._strengths: Dict[Tuple[Composition, SweepPolicy], int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._strengths)
+
+    def __contains__(self, key: Tuple[Composition, SweepPolicy]) -> bool:
+        return key in self._strengths
+
+    def get(self, composition: Composition, policy: SweepPolicy) -> Optional[int]:
+        return self._strengths.get((composition, policy))
+
+    def put(self, composition: Composition, policy: SweepPolicy, strength: int) -> None:
+        self._strengths[(composition, policy)] = strength
+
+
+@dataclass(frozen=True)
+class SweepEntry:
+    composition: Composition
+    win_rate: float
+    cost: int
+
+    @property
+    def config(self) -> CivilizationConfig:
+        return CivilizationConfig(*self.composition)
+
+
+def unit_count(composition: Composition) -> int:
+    return sum(composition)
+
+
+def _score(strength: int, opponent: int) -> float:
+    if strength > opponent:
+        return 1.0
+    if strength == opponent:
+        return 0.5
+    return 0.0
+
+
+class SweepResult:
+    # Every composition is paired against every other composition, under
+    # every combination of the two sides' policies. A fresh army's battle is
+    # decided by total strength alone; ties count as half a win.
+
+    def __init__(self, compositions: List[Composition], policies: Tuple[SweepPolicy, ...],
+                 strengths: List[array]):
+        self.compositions = compositions
+        self.policies = policies
+        self.strengths = strengths
+        self.win_rates = self._win_rates()
+        self._positions = {composition: index for index, composition in enumerate(compositions)}
+
+    def strength(self, composition: Union[CivilizationConfig, Composition],
+                 policy: SweepPolicy) -> int:
+        return self.strengths[self.policies.index(policy)][self._positions[composition_of(composition)]]
+
+    def win_rate(self, composition: Union[CivilizationConfig, Composition]) -> float:
+        return self.win_rates[self._positions[composition_of(composition)]]
+
+    def matrix(self, compositions: Optional[Sequence[Composition]] = None) -> List[List[float]]:
+        # Pairwise win rates of the row composition against the column one;
+        # quadratic, so meant for a selection such as the Pareto front
+        indices = (range(len(self.compositions)) if compositions is None
+                   else [self._positions[composition_of(c)] for c in compositions])
+        pairs = len(self.policies) ** 2
+        return [[sum(_score(mine[row], theirs[column])
+                     for mine in self.strengths for theirs in self.strengths) / pairs
+                 for column in indices] for row in indices]
+
+    def ranking(self, cost: Callable[[Composition], int] = unit_count) -> List[SweepEntry]:
+        return sorted((SweepEntry(composition, rate, cost(composition))
+                       for composition, rate in zip(self.compositions, self.win_rates)),
+                      key=lambda entry: (-entry.win_rate, entry.cost, entry.composition))
+
+    def pareto_front(self, cost: Callable[[Composition], int] = unit_count) -> List[SweepEntry]:
+        # Compositions no other composition beats on win rate at the same or
+        # lower cost, cheapest first
+        entries = sorted((SweepEntry(composition, rate, cost(composition))
+                          for composition, rate in zip(self.compositions, self.win_rates)),
+                         key=lambda entry: (entry.cost, -entry.win_rate, entry.composition))
+        front: List[SweepEntry] = []
+        for entry in entries:
+            if not front or entry.win_rate > front[-1].win_rate:
+                front.append(entry)
+        return front
+
+    def _win_rates(self) -> array:
+        # Counting opponents below each strength in one sorted list of every
+        # (composition, policy) entrant, minus the games against itself
+        everything = sorted(strength for column in self.strengths for strength in column)
+        opponents = (len(self.compositions) - 1) * len(self.policies)
+        rates = array('d', [0.0] * len(self.compositions))
+        for index in range(len(self.compositions)):
+            own = [column[index] for column in self.strengths]
+            score = 0.0
+            for strength in own:
+                below = bisect_left(everything, strength)
+                equal = bisect_right(everything, strength) - below
+                score += below + equal / 2 - sum(_score(strength, other) for other in own)
+            rates[index] = score / (opponents * len(own))
+        return rates
+
+
+class CompositionSweep:
+    # Evaluates compositions under every policy, splitting uncached work into
+    # chunks for a process pool when `workers` is above one
+
+    def __init__(self, policies: Sequence[SweepPolicy], workers: int = 1, chunk_size: int = 10000,
+                 cache: Optional[SweepCache] = None):
+        if not policies:
+            raise ValueError("A sweep needs at least one policy")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self._policies = tuple(policies)
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self.cache = cache if cache is not None else SweepCache()
+
+    def run(self, compositions: Iterable[Union[CivilizationConfig, Composition]]) -> SweepResult:
+        unique = list(dict.fromkeys(composition_of(config) for config in compositions))
+        if len(unique) < 2:
+            raise ValueError("A sweep needs at least two distinct compositions")
+
+        cache = self.cache
+        missing = [composition for composition in unique
+                   if any((composition, policy) not in cache for policy in self._policies)]
+        cache.hits += len(unique) - len(missing)
+        cache.misses += len(missing)
+        chunks = [missing[start:start + self._chunk_size]
+                  for start in range(0, len(missing), self._chunk_size)]
+        if self._workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(self._workers) as pool:
+                results = list(pool.map(_evaluate_chunk, chunks, [self._policies] * len(chunks)))
+        else:
+            results = [_evaluate_chunk(chunk, self._policies) for chunk in chunks]
+        for chunk, columns in zip(chunks, results):
+            for policy, column in zip(self._policies, columns):
+                for composition, strength in zip(chunk, column):
+                    cache.put(composition, policy, strength)
+
+        strengths = [array('q', [cache.get(composition, policy) for composition in unique])
+                     for policy in self._policies]
+        return SweepResult(unique, self._policies, strengths)
@@ -0,0 +1,192 @@
+import random
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from .army import Army
+from .battle import BattleResult, BattleSystem
+from .catalog import CivilizationCatalog, default_catalog
+from .checkpoint import CheckpointError, CheckpointWriter, read_checkpoint
+
+
+@dataclass
+class TournamentStanding:
+    wins: int = 0
+    losses: int = 0
+    ties: int = 0
+    gold_gained: int = 0
+
+    @property
+    def battles(self) -> int:
+        return self.wins + self.losses + self.ties
+
+
+def _rng_state_to_json(state: Tuple[Any, ...]) -> List[Any]:
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+
+def _rng_state_from_json(state: List[Any]) -> Tuple[Any, ...]:
+    version, internal, gauss_next = state
+    return (version, tuple(internal), gauss_next)
+
+
+class TournamentRunner:
+    # Round-robin tournament whose pairing order is shuffled every round by a
+    # seeded RNG. With a checkpoint path, army deltas, the schedule position,
+    # the RNG state and the standings are committed every `checkpoint_every`
+    # battles, and resume() continues to the same final result.
+
+    def __init__(self, armies: Dict[str, Army], rounds: int = 1, seed: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None, checkpoint_every: int = 100,
+                 compact_every: int = 100, battle_system: type = BattleSystem):
+        if len(armies) < 2:
+            raise ValueError("A tournament needs at least two armies")
+        if len({id(army) for army in armies.values()}) != len(armies):
+            raise ValueError("An army can only appear once in a tournament")
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+
+        self._armies = dict(armies)
+        self._rounds = rounds
+        self._battle_system = battle_system
+        self._pairs = list(combinations(self._armies, 2))
+        self._rng = random.Random(seed)
+        self._standings = {name: TournamentStanding() for name in self._armies}
+
+        self._round = 0
+        self._next = 0
+        self._round_rng_state: Optional[Tuple[Any, ...]] = None
+        self._order: Optional[List[Tuple[str, str]]] = None
+
+        self._checkpoint_every = checkpoint_every
+        self._since_checkpoint = 0
+        self._writer: Optional[CheckpointWriter] = None
+        if checkpoint_path is not None:
+            self._writer = CheckpointWriter(checkpoint_path, compact_every)
+            for name, army in self._armies.items():
+                self._writer.track(name, army)
+            self.checkpoint()
+
+    @classmethod
+    def resume(cls, checkpoint_path: str, checkpoint_every: int = 100, compact_every: int = 100,
+               catalog: CivilizationCatalog = default_catalog,
+               battle_system: type = BattleSystem) -> 'TournamentRunner':
+        armies, metadata = read_checkpoint(checkpoint_path, catalog)
+        if metadata is None or metadata.get("type") != "tournament":
+            raise CheckpointError(f"{checkpoint_path} holds no tournament progress")
+
+        runner = cls.__new__(cls)
+        runner._armies = {name: armies[name] for name in metadata["armies"]}
+        runner._rounds = metadata["rounds"]
+        runner._battle_system = battle_system
+        runner._pairs = list(combinations(runner._armies, 2))
+        runner._rng = random.Random()
+        runner._standings = {name: TournamentStanding(*values)
+                             for name, values in metadata["standings"].items()}
+        runner._round = metadata["round"]
+        runner._next = metadata["next"]
+        runner._order = None
+        runner._round_rng_state = None
+        runner._rng.setstate(_rng_state_from_json(metadata["rng_state"]))
+        if metadata["in_round"]:
+            # The saved state is the one the interrupted round was shuffled with
+            runner._start_round()
+        runner._checkpoint_every = checkpoint_every
+        runner._since_checkpoint = 0
+
+        # Rewriting the file as fresh snapshots drops any torn batch
+        runner._writer = CheckpointWriter(checkpoint_path, compact_every)
+        for name, army in runner._armies.items():
+            runner._writer.track(name, army)
+        runner.checkpoint()
+        runner._writer.compact()
+        return runner
+
+    @property
+    def armies(self) -> Dict[str, Army]:
+        return dict(self._armies)
+
+    @property
+    def finished(self) -> bool:
+        return self._round >= self._rounds
+
+    @property
+    def battles_fought(self) -> int:
+        return self._round * len(self._pairs) + self._next
+
+    @property
+    def total_battles(self) -> int:
+        return self._rounds * len(self._pairs)
+
+    def standings(self) -> List[Tuple[str, TournamentStanding]]:
+        return sorted(self._standings.items(), key=lambda entry: entry[1].wins, reverse=True)
+
+    def run(self, max_battles: Optional[int] = None) -> List[Tuple[str, TournamentStanding]]:
+        fought = 0
+        while not self.finished and (max_battles is None or fought < max_battles):
+            if self._order is None:
+                self._start_round()
+            first, second = self._order[self._next]
+            self._fight(first, second)
+            fought += 1
+
+            self._next += 1
+            if self._next == len(self._order):
+                self._round += 1
+                self._next = 0
+                self._order = None
+                self._round_rng_state = None
+
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self._checkpoint_every:
+                self.checkpoint()
+
+        if self._since_checkpoint:
+            self.checkpoint()
+        return self.standings()
+
+    def checkpoint(self) -> None:
+        if self._writer is not None:
+            self._writer.checkpoint(self._metadata())
+        self._since_checkpoint = 0
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _start_round(self) -> None:
+        self._round_rng_state = self._rng.getstate()
+        self._order = list(self._pairs)
+        self._rng.shuffle(self._order)
+
+    def _fight(self, first: str, second: str) -> None:
+        outcome = self._battle_system.resolve_battle(self._armies[first], self._armies[second])
+        standing1 = self._standings[first]
+        standing2 = self._standings[second]
+        standing1.gold_gained += outcome.army1_gold_gained
+        standing2.gold_gained += outcome.army2_gold_gained
+        if outcome.result == BattleResult.WIN:
+            standing1.wins += 1
+            standing2.losses += 1
+        elif outcome.result == BattleResult.LOSS:
+            standing1.losses += 1
+            standing2.wins += 1
+        else:
+            standing1.ties += 1
+            standing2.ties += 1
+
+    def _metadata(self) -> Dict[str, Any]:
+        return {
+            "type": "tournament",
+            "armies": list(self._armies),
+            "rounds": self._rounds,
+            "round": self._round,
+            "next": self._next,
+            "in_round": self._round_rng_state is not None,
+            "rng_state": _rng_state_to_json(self._rng.getstate() if self._round_rng_state is None
+                                            else self._round_rng_state),
+            "standings": {name: [standing.wins, standing.losses, standing.ties, standing.gold_gained]
+                          for name, standing in self._standings.items()},
+        }
@@ -0,0 +1,179 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Type
+
+from .army import Army, InsufficientGoldError, InvalidTransformationError
+from .strength_index import unit_key
+from .units import Unit, Pikeman, Archer, Knight
+
+
+_TRANSFORM_TARGETS: Dict[str, Type[Unit]] = {
+    "Pikeman": Pikeman,
+    "Archer": Archer,
+    "Knight": Knight,
+}
+
+_TRAINING_COSTS: Dict[Type[Unit], int] = {
+    unit_type: unit_type().get_training_cost() for unit_type in _TRANSFORM_TARGETS.values()
+}
+
+_TRAIN = "train"
+_TRAIN_ALL = "train_all"
+_TRANSFORM = "transform"
+
+
+class TransactionError(Exception):
+    pass
+
+
+@dataclass
+class TransactionResult:
+    gold_spent: int = 0
+    trained: int = 0
+    transformed: List[Unit] = field(default_factory=list)
+
+
+class ArmyTransaction:
+    # Collects train/transform operations and applies them all or none.
+    # Used as a context manager it commits on a clean exit and discards the
+    # queued operations if the block raises.
+
+    def __init__(self, army: Army):
+        self._army = army
+        self._operations: List[Tuple[str, object]] = []
+        self._result: Optional[TransactionResult] = None
+
+    def __enter__(self) -> 'ArmyTransaction':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None and self._result is None:
+            self.commit()
+
+    @property
+    def result(self) -> Optional[TransactionResult]:
+        return self._result
+
+    def train(self, unit: Unit) -> 'ArmyTransaction':
+        self._queue(_TRAIN, unit)
+        return self
+
+    def train_all(self, unit_type: Type[Unit]) -> 'ArmyTransaction':
+        self._queue(_TRAIN_ALL, unit_type)
+        return self
+
+    def transform(self, unit: Unit) -> 'ArmyTransaction':
+        self._queue(_TRANSFORM, unit)
+        return self
+
+    def _queue(self, kind: str, target: object) -> None:
+        if self._result is not None:
+            raise TransactionError("Transaction has already been committed")
+        self._operations.append((kind, target))
+
+    def commit(self) -> TransactionResult:
+        if self._result is not None:
+            raise TransactionError("Transaction has already been committed")
+
+        army = self._army
+        army._sync()
+        to_train, to_transform, new_trained, cost = self._plan()
+        if army._gold < cost:
+            raise InsufficientGoldError(
+                f"Not enough gold for transaction. Need {cost}, have {army._gold}"
+            )
+
+        gold_before = army._gold
+        units_before = list(army._units)
+        strength_before = [(unit, unit._additional_strength) for unit in to_train]
+        try:
+            self._result = self._apply(to_train, to_transform, new_trained, cost)
+        except Exception:
+            for unit, additional in strength_before:
+                unit._additional_strength = additional
+            army._gold = gold_before
+            army._units[:] = units_before
+            army._rebuild_aggregates()
+            raise
+        return self._result
+
+    def _plan(self) -> Tuple[List[Unit], List[Unit], List[int], int]:
+        # Validates every operation against the state the previous ones leave.
+        # Units a planned transformation creates are referred to by their
+        # position in the transform list; train_all trains them as well.
+        army = self._army
+        alive = {id(unit) for unit in army._units}
+        to_train: List[Unit] = []
+        to_transform: List[Unit] = []
+        new_trained: List[int] = []
+        cost = 0
+
+        for kind, target in self._operations:
+            if kind == _TRAIN_ALL:
+                units = [unit for unit in army._units
+                         if isinstance(unit, target) and id(unit) in alive]
+                for position, unit in enumerate(to_transform):
+                    new_type = _TRANSFORM_TARGETS[unit.get_transformation_target()]
+                    if issubclass(new_type, target):
+                        new_trained.append(position)
+                        cost += _TRAINING_COSTS[new_type]
+            else:
+                if id(target) not in alive:
+                    raise ValueError("Unit is not part of this army")
+                units = [target]
+
+            for unit in units:
+                if kind == _TRANSFORM:
+                    transformation_cost = unit.get_transformation_cost()
+                    if transformation_cost is None or unit.get_transformation_target() is None:
+                        raise InvalidTransformationError(
+                            f"{unit.__class__.__name__} cannot be transformed"
+                        )
+                    alive.discard(id(unit))
+                    to_transform.append(unit)
+                    cost += transformation_cost
+                else:
+                    to_train.append(unit)
+                    cost += unit.get_training_cost()
+
+        return to_train, to_transform, new_trained, cost
+
+    def _apply(self, to_train: List[Unit], to_transform: List[Unit], new_trained: List[int],
+               cost: int) -> TransactionResult:
+        army = self._army
+        observers = army._unit_observers
+        result = TransactionResult(gold_spent=cost, trained=len(to_train) + len(new_trained))
+        army._gold -= cost
+
+        for unit in to_train:
+            army._untrack(unit_key(unit))
+            unit.train()
+            army._track(unit_key(unit))
+            for observer in observers:
+                observer.unit_trained(unit)
+
+        if to_transform:
+            # A single rebuild of the unit list replaces the per-unit removals
+            removed = {id(unit) for unit in to_transform}
+            kept = [unit for unit in army._units if id(unit) not in removed]
+            for unit in to_transform:
+                army._untrack(unit_key(unit))
+                new_unit = _TRANSFORM_TARGETS[unit.get_transformation_target()](unit.age_in_years)
+                kept.append(new_unit)
+                result.transformed.append(new_unit)
+            army._units[:] = kept
+            for new_unit in result.transformed:
+                army._track(unit_key(new_unit))
+            for observer in observers:
+                for unit, new_unit in zip(to_transform, result.transformed):
+                    observer.unit_transformed(unit, new_unit)
+
+        for position in new_trained:
+            new_unit = result.transformed[position]
+            army._untrack(unit_key(new_unit))
+            new_unit.train()
+            army._track(unit_key(new_unit))
+            for observer in observers:
+                observer.unit_trained(new_unit)
+
+        army._notify_strength_watchers()
+        return result
@@ -1,13 +1,34 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import Optional
 
 
+@dataclass(frozen=True)
+class AgingRule:
+    prime_age: Optional[int] = None
+    decay_per_year: int = 0
+    retirement_age: Optional[int] = None
+    
+    def penalty(self, age: int, base_strength: int) -> int:
+        # Strength lost to age; a unit never decays below 1 base strength
+        if self.prime_age is None or age <= self.prime_age:
+            return 0
+        return min(self.decay_per_year * (age - self.prime_age), base_strength - 1)
+    
+    def is_retired(self, age: int) -> bool:
+        return self.retirement_age is not None and age >= self.retirement_age
+
+
+NO_AGING = AgingRule()
+
+
 class Unit(ABC):
     
     def __init__(self, age_in_years: int = 0):
         self._base_strength = self._get_base_strength()
         self._additional_strength = 0
         self._age_in_years = age_in_years
+        self._age_penalty = self.get_aging_rule().penalty(age_in_years, self._base_strength)
     
     @property
     def age_in_years(self) -> int:
@@ -15,7 +36,7 @@ class Unit(ABC):
     
     @property
     def total_strength(self) -> int:
-        return self._base_strength + self._additional_strength
+        return self._base_strength + self._additional_strength - self._age_penalty
     
     @property
     def additional_strength(self) -> int:
@@ -41,6 +62,13 @@ class Unit(ABC):
     def get_transformation_target(self) -> Optional[str]:
         pass
     
+    def get_aging_rule(self) -> AgingRule:
+        return NO_AGING
+    
+    def advance_age(self, years: int) -> None:
+        self._age_in_years += years
+        self._age_penalty = self.get_aging_rule().penalty(self._age_in_years, self._base_strength)
+    
     def train(self) -> int:
         cost = self.get_training_cost()
         self._additional_strength += self.get_training_strength_gain()
@@ -55,6 +83,9 @@ class Unit(ABC):
 
 
 class Pikeman(Unit):
+    
+    AGING_RULE = AgingRule(prime_age=20, decay_per_year=1, retirement_age=40)
+    
     def _get_base_strength(self) -> int:
         return 5
     
@@ -69,10 +100,15 @@ class Pikeman(Unit):
     
     def get_transformation_target(self) -> Optional[str]:
         return "Archer"
+    
+    def get_aging_rule(self) -> AgingRule:
+        return self.AGING_RULE
 
 
 class Archer(Unit):
     
+    AGING_RULE = AgingRule(prime_age=25, decay_per_year=1, retirement_age=45)
+    
     def _get_base_strength(self) -> int:
         return 10
     
@@ -87,10 +123,15 @@ class Archer(Unit):
     
     def get_transformation_target(self) -> Optional[str]:
         return "Knight"
+    
+    def get_aging_rule(self) -> AgingRule:
+        return self.AGING_RULE
 
 
 class Knight(Unit):
     
+    AGING_RULE = AgingRule(prime_age=30, decay_per_year=2, retirement_age=50)
+    
     def _get_base_strength(self) -> int:
         return 20
     
@@ -105,3 +146,6 @@ class Knight(Unit):
     
     def get_transformation_target(self) -> Optional[str]:
         return None
+    
+    def get_aging_rule(self) -> AgingRule:
+        return self.AGING_RULE
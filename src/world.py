@@ -0,0 +1,225 @@
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from .army import Army
+from .battle import BattleOutcome, BattleSystem
+from .catalog import AnyCivilization, CivilizationCatalog, civilization_id, default_catalog, unit_template
+from .units import Unit, Pikeman, Archer, Knight
+
+
+UNIT_TYPES: Tuple[Type[Unit], ...] = (Pikeman, Archer, Knight)
+
+_PROTOTYPES = tuple(unit_type() for unit_type in UNIT_TYPES)
+BASE_STRENGTH = tuple(unit._get_base_strength() for unit in _PROTOTYPES)
+TRAINING_COST = tuple(unit.get_training_cost() for unit in _PROTOTYPES)
+TRAINING_GAIN = tuple(unit.get_training_strength_gain() for unit in _PROTOTYPES)
+TRANSFORM_COST = tuple(unit.get_transformation_cost() for unit in _PROTOTYPES)
+
+
+@dataclass(frozen=True)
+class EconomyRules:
+    # Applied in order: income, upkeep per unit (gold never drops below
+    # zero), then auto-training of one unit type with the gold above `reserve`
+    income: int = 0
+    upkeep: Tuple[int, int, int] = (0, 0, 0)
+    auto_train: Optional[Type[Unit]] = None
+    reserve: int = 0
+
+
+@dataclass
+class TickReport:
+    armies: int = 0
+    income_paid: int = 0
+    upkeep_paid: int = 0
+    units_trained: int = 0
+    training_gold: int = 0
+
+
+class ArmyHandle:
+    __slots__ = ("_world", "_index")
+
+    def __init__(self, world: 'ArmyWorld', index: int):
+        self._world = world
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def civilization(self) -> AnyCivilization:
+        return self._world._catalog.by_id(self._world._civilizations[self._index])
+
+    @property
+    def gold(self) -> int:
+        return self._world._gold[self._index]
+
+    @property
+    def total_strength(self) -> int:
+        return self._world._strength_of(self._index)
+
+    @property
+    def unit_count(self) -> int:
+        return sum(counts[self._index] for counts in self._world._counts)
+
+    def get_unit_counts(self) -> Dict[str, int]:
+        return {unit_type.__name__: counts[self._index]
+                for unit_type, counts in zip(UNIT_TYPES, self._world._counts)}
+
+    def to_army(self) -> Army:
+        return self._world.to_army(self._index)
+
+    def __repr__(self) -> str:
+        return (f"ArmyHandle(index={self._index}, civilization={self.civilization}, "
+                f"units={self.unit_count}, strength={self.total_strength}, gold={self.gold})")
+
+
+class ArmyWorld:
+    # Column storage for many armies: gold, per-type unit counts and per-type
+    # training counts live in arrays indexed by army, and economy ticks update
+    # whole columns at once. Trainings within a type are spread round-robin,
+    # which is what to_army() rebuilds, so add() only accepts armies whose
+    # units of a type are at most one training apart. Unit ages and unit
+    # order are not modelled either: armies with aged units cannot be added,
+    # and to_army() lists units by type.
+
+    def __init__(self, catalog: CivilizationCatalog = default_catalog):
+        self._catalog = catalog
+        self._civilizations = array('l')
+        self._gold = array('q')
+        self._counts = tuple(array('q') for _ in UNIT_TYPES)
+        self._trainings = tuple(array('q') for _ in UNIT_TYPES)
+
+    def __len__(self) -> int:
+        return len(self._gold)
+
+    def __iter__(self) -> Iterator[ArmyHandle]:
+        return (ArmyHandle(self, index) for index in range(len(self._gold)))
+
+    def handle(self, index: int) -> ArmyHandle:
+        if not 0 <= index < len(self._gold):
+            raise IndexError(f"No army at index {index}")
+        return ArmyHandle(self, index)
+
+    def spawn(self, civilization: AnyCivilization, count: int = 1,
+              gold: int = Army.INITIAL_GOLD) -> List[ArmyHandle]:
+        # Fresh armies straight from the civilization template, without
+        # creating any Unit objects
+        template = unit_template(civilization)
+        start = len(self._gold)
+        self._civilizations.extend([civilization_id(civilization)] * count)
+        self._gold.extend([gold] * count)
+        for unit_type, counts, trainings in zip(UNIT_TYPES, self._counts, self._trainings):
+            counts.extend([template.count(unit_type)] * count)
+            trainings.extend([0] * count)
+        return [ArmyHandle(self, index) for index in range(start, start + count)]
+
+    def add(self, army: Army) -> ArmyHandle:
+        counts = [0, 0, 0]
+        trainings = [0, 0, 0]
+        fewest: List[Optional[int]] = [None, None, None]
+        most = [0, 0, 0]
+        for unit in army._units:
+            position = UNIT_TYPES.index(type(unit))
+            if unit._age_in_years:
+                raise ValueError("Aged units cannot be pooled; the world does not store ages")
+            trained, remainder = divmod(unit._additional_strength, TRAINING_GAIN[position])
+            if remainder:
+                raise ValueError("Unit strength is not a whole number of trainings")
+            counts[position] += 1
+            trainings[position] += trained
+            if fewest[position] is None or trained < fewest[position]:
+                fewest[position] = trained
+            most[position] = max(most[position], trained)
+        for position, unit_type in enumerate(UNIT_TYPES):
+            if fewest[position] is not None and most[position] - fewest[position] > 1:
+                raise ValueError(f"{unit_type.__name__} units are more than one training apart; "
+                                 "the world spreads trainings evenly")
+
+        self._civilizations.append(army.civilization_id)
+        self._gold.append(army.gold)
+        for position in range(len(UNIT_TYPES)):
+            self._counts[position].append(counts[position])
+            self._trainings[position].append(trainings[position])
+        return ArmyHandle(self, len(self._gold) - 1)
+
+    def store(self, index: int, army: Army) -> None:
+        # Writes a materialized army back, e.g. after a battle
+        replacement = ArmyWorld(self._catalog)
+        replacement.add(army)
+        self._civilizations[index] = replacement._civilizations[0]
+        self._gold[index] = replacement._gold[0]
+        for position in range(len(UNIT_TYPES)):
+            self._counts[position][index] = replacement._counts[position][0]
+            self._trainings[position][index] = replacement._trainings[position][0]
+
+    def to_army(self, index: int) -> Army:
+        units: List[Unit] = []
+        for position, unit_type in enumerate(UNIT_TYPES):
+            count = self._counts[position][index]
+            if not count:
+                continue
+            per_unit, extra = divmod(self._trainings[position][index], count)
+            gain = TRAINING_GAIN[position]
+            for number in range(count):
+                unit = unit_type()
+                unit._additional_strength = (per_unit + (number < extra)) * gain
+                units.append(unit)
+        return Army.from_units(self._catalog.by_id(self._civilizations[index]), units,
+                               gold=self._gold[index])
+
+    def resolve_battle(self, first: int, second: int,
+                       battle_system: type = BattleSystem) -> BattleOutcome:
+        army1 = self.to_army(first)
+        army2 = self.to_army(second)
+        outcome = battle_system.resolve_battle(army1, army2)
+        self.store(first, army1)
+        self.store(second, army2)
+        return outcome
+
+    def strengths(self) -> array:
+        strengths = [0] * len(self._gold)
+        for position in range(len(UNIT_TYPES)):
+            base, gain = BASE_STRENGTH[position], TRAINING_GAIN[position]
+            strengths = [total + count * base + trained * gain for total, count, trained
+                         in zip(strengths, self._counts[position], self._trainings[position])]
+        return array('q', strengths)
+
+    def total_gold(self) -> int:
+        return sum(self._gold)
+
+    def tick(self, rules: EconomyRules) -> TickReport:
+        report = TickReport(armies=len(self._gold))
+        gold = list(self._gold)
+
+        if rules.income:
+            income = rules.income
+            gold = [value + income for value in gold]
+            report.income_paid = income * len(gold)
+
+        for position, upkeep in enumerate(rules.upkeep):
+            if upkeep:
+                before = sum(gold)
+                gold = [max(value - count * upkeep, 0)
+                        for value, count in zip(gold, self._counts[position])]
+                report.upkeep_paid += before - sum(gold)
+
+        if rules.auto_train is not None:
+            position = UNIT_TYPES.index(rules.auto_train)
+            cost = TRAINING_COST[position]
+            reserve = rules.reserve
+            trained = [min(count, (value - reserve) // cost) if value > reserve else 0
+                       for value, count in zip(gold, self._counts[position])]
+            gold = [value - units * cost for value, units in zip(gold, trained)]
+            self._trainings[position][:] = array(
+                'q', [total + units for total, units in zip(self._trainings[position], trained)])
+            report.units_trained = sum(trained)
+            report.training_gold = report.units_trained * cost
+
+        self._gold[:] = array('q', gold)
+        return report
+
+    def _strength_of(self, index: int) -> int:
+        return sum(counts[index] * BASE_STRENGTH[position] + trainings[index] * TRAINING_GAIN[position]
+                   for position, (counts, trainings) in enumerate(zip(self._counts, self._trainings)))
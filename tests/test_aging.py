@@ -0,0 +1,78 @@
+import pytest
+from src.aging import WorldClock, age_armies
+from src.army import Army
+from src.civilizations import Civilization
+from src.units import AgingRule, Pikeman, Archer, Knight
+
+
+class TestAgingRules:
+    
+    def test_penalty_after_prime(self):
+        rule = AgingRule(prime_age=10, decay_per_year=2, retirement_age=20)
+        
+        assert rule.penalty(10, base_strength=20) == 0
+        assert rule.penalty(13, base_strength=20) == 6
+        assert rule.penalty(100, base_strength=20) == 19
+        assert not rule.is_retired(19)
+        assert rule.is_retired(20)
+    
+    def test_unit_advance_age(self):
+        knight = Knight(age_in_years=30)
+        knight.train()
+        
+        knight.advance_age(3)
+        
+        assert knight.age_in_years == 33
+        assert knight.total_strength == 20 + 10 - 6
+    
+    def test_old_units_start_decayed(self):
+        assert Pikeman(age_in_years=22).total_strength == 3
+        assert Archer(age_in_years=25).total_strength == 10
+
+
+class TestWorldClock:
+    
+    def test_young_units_keep_strength(self):
+        clock = WorldClock()
+        army = Army(Civilization.ENGLISH)
+        
+        report = clock.tick([army], years=5)
+        
+        assert clock.year == 5
+        assert report.units_aged == 30
+        assert report.strength_lost == 0
+        assert all(unit.age_in_years == 5 for unit in army.units)
+        assert army.total_strength == 350
+    
+    def test_decay_updates_aggregates(self):
+        army = Army(Civilization.ENGLISH)
+        
+        report = age_armies([army], years=32)
+        
+        # Pikemen: 12 years past prime (capped at 4), archers 7, knights 2 * 2
+        assert report.strength_lost == 10 * 4 + 10 * 7 + 10 * 4
+        assert army.total_strength == sum(unit.total_strength for unit in army.units)
+        assert army.state_fingerprint() == _rebuilt_fingerprint(army)
+    
+    def test_retirement_removes_units(self):
+        army = Army(Civilization.BYZANTINE)
+        other = Army(Civilization.CHINESE)
+        
+        report = WorldClock().tick([army, other], years=45)
+        
+        # Pikemen and archers retire; knights remain, decayed to 1 strength
+        assert report.units_retired == (5 + 8) + (2 + 25)
+        assert army.get_unit_counts() == {"Pikeman": 0, "Archer": 0, "Knight": 15}
+        assert other.get_unit_counts() == {"Pikeman": 0, "Archer": 0, "Knight": 2}
+        assert army.total_strength == 15
+    
+    def test_negative_years_rejected(self):
+        with pytest.raises(ValueError):
+            WorldClock().tick([], years=-1)
+
+
+def _rebuilt_fingerprint(army):
+    clone = Army(army.civilization)
+    clone._units = list(army._units)
+    clone._gold = army.gold
+    return clone.state_fingerprint()
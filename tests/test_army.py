@@ -255,4 +255,93 @@ class TestArmyStringRepresentation:
         assert "units=29" in repr_str
         assert "strength=300" in repr_str
         assert "gold=1000" in repr_str
-        assert "battles=0" in repr_str 
\ No newline at end of file
+        assert "battles=0" in repr_str 
+
+class TestArmySplitAndMerge:
+    
+    def test_split_by_count(self):
+        army = Army(Civilization.ENGLISH)
+        units = army.units
+        
+        detachment = army.split(count=12, gold=300)
+        
+        assert detachment.units == units[18:]
+        assert army.units == units[:18]
+        assert detachment.total_strength == 2 * 10 + 10 * 20
+        assert army.total_strength == 350 - 220
+        assert (army.gold, detachment.gold) == (700, 300)
+        assert detachment.civilization == Civilization.ENGLISH
+    
+    def test_split_by_unit_types(self):
+        army = Army(Civilization.BYZANTINE)
+        
+        detachment = army.split(unit_types={Knight: 4, Pikeman: 2})
+        
+        assert detachment.get_unit_counts() == {"Pikeman": 2, "Archer": 0, "Knight": 4}
+        assert army.get_unit_counts() == {"Pikeman": 3, "Archer": 8, "Knight": 11}
+        assert army.total_strength + detachment.total_strength == 405
+    
+    def test_split_by_strength(self):
+        army = Army(Civilization.CHINESE)
+        
+        detachment = army.split(strength=45)
+        
+        assert detachment.total_strength == 50
+        assert detachment.get_unit_counts()["Knight"] == 2
+        assert army.total_strength == 250
+    
+    def test_split_validation(self):
+        army = Army(Civilization.CHINESE)
+        
+        with pytest.raises(ValueError):
+            army.split()
+        with pytest.raises(ValueError):
+            army.split(count=1, strength=5)
+        with pytest.raises(InsufficientUnitsError):
+            army.split(count=30)
+        with pytest.raises(InsufficientUnitsError):
+            army.split(unit_types={Knight: 3})
+        with pytest.raises(InsufficientUnitsError):
+            army.split(strength=301)
+        with pytest.raises(InsufficientGoldError):
+            army.split(count=1, gold=1001)
+        assert army.unit_count == 29
+        assert army.total_strength == 300
+    
+    def test_merge(self):
+        army = Army(Civilization.CHINESE)
+        other = Army(Civilization.CHINESE)
+        army.train_unit(army.get_units_by_type(Knight)[0])
+        other.attack(Army(Civilization.BYZANTINE))
+        
+        army.merge(other)
+        
+        assert army.unit_count == 29 + 27
+        assert army.total_strength == 310 + 260
+        assert army.gold == 970 + 1000
+        assert len(army.battle_history) == 1
+        assert other.unit_count == 0
+        assert other.total_strength == 0
+        assert other.gold == 0
+        assert other.battle_history == []
+    
+    def test_merge_validation(self):
+        army = Army(Civilization.CHINESE)
+        
+        with pytest.raises(ValueError):
+            army.merge(army)
+        with pytest.raises(ValueError):
+            army.merge(Army(Civilization.ENGLISH))
+    
+    def test_split_then_merge_restores_strength_and_battles(self):
+        army = Army(Civilization.BYZANTINE)
+        detachment = army.split(count=20)
+        detachment.attack(Army(Civilization.CHINESE))
+        
+        army.merge(detachment)
+        
+        assert army.unit_count == 28
+        assert army.total_strength == 405
+        assert army.gold == 1100
+        assert army.query().of_type(Knight).count() == 15
+        assert army.strength_after_losses(2) == 365
@@ -148,6 +148,20 @@ class TestBattleSystem:
         # The remaining strongest units should be weaker than the original 2nd strongest
         assert max(unit_strengths_after) <= unit_strengths_before[2]
     
+    def test_equal_strength_losses_follow_unit_order(self):
+        # A pikeman trained to 20 ties the knights and comes first in the list
+        army = Army(Civilization.ENGLISH)
+        pikeman = army.get_units_by_type(Pikeman)[0]
+        for _ in range(5):
+            army.train_unit(pikeman)
+        expected = sorted(army.units, key=lambda unit: unit.total_strength, reverse=True)
+        
+        outcome = BattleSystem.resolve_battle(Army(Civilization.BYZANTINE), army)
+        
+        assert outcome.army2_removed == (("Pikeman", 20), ("Knight", 20))
+        assert pikeman not in army.units
+        assert army.units == expected[2:]
+    
     def test_multiple_battles_history(self):
         army1 = Army(Civilization.BYZANTINE)  # Stronger
         army2 = Army(Civilization.CHINESE)    # Weaker
@@ -226,4 +240,134 @@ class TestBattleSystem:
     
     def test_constants(self):
         assert BattleSystem.WINNER_GOLD_REWARD == 100
-        assert BattleSystem.UNITS_LOST_ON_DEFEAT == 2 
\ No newline at end of file
+        assert BattleSystem.UNITS_LOST_ON_DEFEAT == 2 
+
+class TestBattlePrediction:
+    
+    def test_prediction_does_not_mutate(self):
+        byzantine = Army(Civilization.BYZANTINE)
+        chinese = Army(Civilization.CHINESE)
+        
+        prediction = BattleSystem.predict(byzantine, chinese)
+        
+        assert prediction.winner is byzantine
+        assert prediction.margin == 105
+        assert prediction.outcome.army1_gold_gained == 100
+        assert byzantine.gold == 1000
+        assert chinese.unit_count == 29
+        assert chinese.battle_history == []
+    
+    def test_predicted_units_are_removed(self):
+        attacker = Army(Civilization.BYZANTINE)
+        defender = Army(Civilization.CHINESE)
+        defender.train_unit(defender.get_units_by_type(Archer)[3])
+        
+        predicted = BattleSystem.predict(attacker, defender).army2_removed_units()
+        attacker.attack(defender)
+        
+        assert len(predicted) == 2
+        assert all(unit not in defender.units for unit in predicted)
+        assert all(isinstance(unit, Knight) for unit in predicted)
+    
+    def test_prediction_after_losing_top_units(self):
+        english = Army(Civilization.ENGLISH)   # 350
+        chinese = Army(Civilization.CHINESE)   # 300
+        
+        # Without its 3 strongest units (3 knights) English drops to 290
+        prediction = BattleSystem.predict(english, chinese, army1_losses=3)
+        
+        assert prediction.outcome.army1_strength == 290
+        assert prediction.winner is chinese
+        removed = prediction.army1_removed_units()
+        assert [unit.__class__ for unit in removed] == [Knight, Knight]
+        assert removed == english.get_units_by_type(Knight)[3:5]
+    
+    def test_tie_prediction(self):
+        prediction = BattleSystem.predict(Army(Civilization.ENGLISH), Army(Civilization.ENGLISH))
+        
+        assert prediction.winner is None
+        assert prediction.margin == 0
+        assert prediction.outcome.army1_removed == (("Knight", 20),)
+
+
+class TestCoalitionBattle:
+    
+    def test_one_on_one_matches_resolve_battle(self):
+        coalition_1, coalition_2 = Army(Civilization.CHINESE), Army(Civilization.ENGLISH)
+        pair_1, pair_2 = Army(Civilization.CHINESE), Army(Civilization.ENGLISH)
+        
+        BattleSystem.resolve_coalition_battle([coalition_1], [coalition_2])
+        BattleSystem.resolve_battle(pair_1, pair_2)
+        
+        assert coalition_1.battle_history == pair_1.battle_history
+        assert coalition_2.battle_history == pair_2.battle_history
+        assert coalition_2.gold == pair_2.gold
+        assert coalition_1.state_fingerprint() == pair_1.state_fingerprint()
+    
+    def test_alliance_beats_stronger_single_army(self):
+        chinese = Army(Civilization.CHINESE)      # 300
+        english = Army(Civilization.ENGLISH)      # 350
+        byzantine = Army(Civilization.BYZANTINE)  # 405
+        
+        outcome = BattleSystem.resolve_coalition_battle([chinese, english], [byzantine])
+        
+        assert outcome.result == BattleResult.WIN
+        assert outcome.side1_strength == 650
+        # Reward split proportionally to strength: 100 * 300/650 and 100 * 350/650
+        assert outcome.side1_gold_gained == (46, 54)
+        assert chinese.gold == 1046 and english.gold == 1054
+        assert byzantine.unit_count == 26
+        
+        record = chinese.battle_history[0]
+        assert record.opponent_civilization == "Byzantine"
+        assert record.opponent_strength == 405
+        assert byzantine.battle_history[0].opponent_civilization == "Coalition(Chinese, English)"
+        assert byzantine.battle_history[0].opponent_civilization_id is None
+    
+    def test_losses_taken_from_strongest_allied_units(self):
+        chinese = Army(Civilization.CHINESE)      # 2 knights
+        english = Army(Civilization.ENGLISH)      # 10 knights
+        english.train_unit(english.get_units_by_type(Knight)[0])
+        
+        outcome = BattleSystem.resolve_coalition_battle(
+            [Army(Civilization.BYZANTINE), Army(Civilization.BYZANTINE)], [chinese, english])
+        
+        assert outcome.result == BattleResult.WIN
+        # 4 losses: the trained knight (30) first, then knights of 20 in side order
+        assert outcome.side2_removed == ((("Knight", 20),) * 2,
+                                         (("Knight", 30), ("Knight", 20)))
+        assert chinese.battle_history[0].units_lost == 2
+        assert english.battle_history[0].units_lost == 2
+    
+    def test_large_alliance_loses_its_strongest_units(self):
+        allies = []
+        for trained in range(8):
+            army = Army(Civilization.ENGLISH)
+            for knight in army.get_units_by_type(Knight)[:trained]:
+                army.train_unit(knight)
+            allies.append(army)
+        everything = sorted((unit.total_strength for army in allies for unit in army.units), reverse=True)
+        attackers = [Army(Civilization.BYZANTINE) for _ in range(10)]
+        
+        outcome = BattleSystem.resolve_coalition_battle(attackers, allies)
+        
+        assert outcome.result == BattleResult.WIN
+        lost = sorted((key[1] for keys in outcome.side2_removed for key in keys), reverse=True)
+        assert lost == everything[:2 * len(allies)]
+    
+    def test_tie_costs_one_unit_per_army(self):
+        side1 = [Army(Civilization.ENGLISH), Army(Civilization.CHINESE)]
+        side2 = [Army(Civilization.CHINESE), Army(Civilization.ENGLISH)]
+        
+        outcome = BattleSystem.resolve_coalition_battle(side1, side2)
+        
+        assert outcome.result == BattleResult.TIE
+        assert sum(army.battle_history[0].units_lost for army in side1 + side2) == 4
+    
+    def test_invalid_sides(self):
+        army = Army(Civilization.CHINESE)
+        
+        with pytest.raises(ValueError):
+            BattleSystem.resolve_coalition_battle([army], [])
+        with pytest.raises(ValueError):
+            BattleSystem.resolve_coalition_battle([army], [army])
@@ -0,0 +1,103 @@
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.battle import BattleSystem, BattleResult
+from src.campaign import CampaignSimulator
+from src.units import Pikeman, Archer, Knight
+
+
+def run_naive(army1, army2, max_rounds=None):
+    rounds = 0
+    while army1.unit_count and army2.unit_count and (max_rounds is None or rounds < max_rounds):
+        army1.attack(army2)
+        rounds += 1
+    return rounds
+
+
+def assert_same_state(army, reference):
+    assert army.gold == reference.gold
+    assert army.state_fingerprint() == reference.state_fingerprint()
+    assert [unit_state(u) for u in army.units] == [unit_state(u) for u in reference.units]
+    assert army.battle_history == reference.battle_history
+
+
+def unit_state(unit):
+    return (unit.__class__.__name__, unit.total_strength, unit.age_in_years)
+
+
+def trained_english():
+    army = Army(Civilization.ENGLISH)
+    for archer in army.get_units_by_type(Archer)[:5]:
+        army.train_unit(archer)
+    return army
+
+
+class TestCampaignSimulator:
+    
+    @pytest.mark.parametrize("civ1, civ2", [
+        (Civilization.BYZANTINE, Civilization.CHINESE),
+        (Civilization.CHINESE, Civilization.BYZANTINE),
+        (Civilization.ENGLISH, Civilization.ENGLISH),
+        (Civilization.CHINESE, Civilization.ENGLISH),
+    ])
+    def test_matches_naive_loop(self, civ1, civ2):
+        fast1, fast2 = Army(civ1), Army(civ2)
+        slow1, slow2 = Army(civ1), Army(civ2)
+        
+        result = CampaignSimulator.run(fast1, fast2)
+        rounds = run_naive(slow1, slow2)
+        
+        assert result.rounds == rounds
+        assert_same_state(fast1, slow1)
+        assert_same_state(fast2, slow2)
+    
+    def test_matches_naive_loop_with_ties_then_winner(self):
+        fast1, fast2 = trained_english(), Army(Civilization.ENGLISH)
+        slow1, slow2 = trained_english(), Army(Civilization.ENGLISH)
+        fast2._gold = slow2._gold = 0
+        # Give the defender equal strength with a different composition
+        for army in (fast2, slow2):
+            for _ in range(3):
+                army._units.append(Pikeman(age_in_years=3))
+            army._units.append(Archer())
+            army._units.append(Archer(age_in_years=1))
+        assert fast1.total_strength == fast2.total_strength
+        
+        result = CampaignSimulator.run(fast1, fast2)
+        rounds = run_naive(slow1, slow2)
+        
+        assert fast1.battle_history[0].result == BattleResult.TIE
+        assert result.winner is fast2
+        assert result.rounds == rounds
+        assert_same_state(fast1, slow1)
+        assert_same_state(fast2, slow2)
+    
+    def test_round_limit(self):
+        fast1, fast2 = Army(Civilization.BYZANTINE), Army(Civilization.CHINESE)
+        slow1, slow2 = Army(Civilization.BYZANTINE), Army(Civilization.CHINESE)
+        
+        result = CampaignSimulator.run(fast1, fast2, max_rounds=5)
+        run_naive(slow1, slow2, max_rounds=5)
+        
+        assert result.rounds == 5
+        assert result.winner is None
+        assert result.army2_units_lost == 10
+        assert result.army1_gold_gained == 500
+        assert_same_state(fast2, slow2)
+    
+    def test_winner_reported(self):
+        strong, weak = Army(Civilization.BYZANTINE), Army(Civilization.CHINESE)
+        
+        result = CampaignSimulator.run(weak, strong)
+        
+        assert result.winner is strong
+        assert weak.unit_count == 0
+        assert result.rounds == 15
+    
+    def test_requires_unit_losses(self):
+        class NoLossBattleSystem(BattleSystem):
+            UNITS_LOST_ON_DEFEAT = 0
+        
+        with pytest.raises(ValueError):
+            CampaignSimulator.run(Army(Civilization.ENGLISH), Army(Civilization.CHINESE),
+                                  battle_system=NoLossBattleSystem)
@@ -0,0 +1,128 @@
+import json
+import pytest
+from src.army import Army
+from src.battle import BattleSystem
+from src.catalog import CivilizationCatalog, CatalogError, default_catalog, unit_template
+from src.civilizations import Civilization
+from src.units import Pikeman, Archer, Knight
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    path = tmp_path / "civs.json"
+    path.write_text(json.dumps({"civilizations": [
+        {"name": "Mongol", "pikemen": 1, "archers": 5, "knights": 20},
+        {"name": "Viking", "pikemen": 20, "archers": 0, "knights": 5},
+        {"name": "Clone", "pikemen": 1, "archers": 5, "knights": 20},
+    ]}))
+    return str(path)
+
+
+class TestCivilizationCatalog:
+    
+    def test_builtins_registered_first(self):
+        catalog = CivilizationCatalog()
+        
+        assert len(catalog) == 3
+        assert catalog.get("chinese") is Civilization.CHINESE
+        assert catalog.by_id(2) is Civilization.BYZANTINE
+        assert catalog.display_name(1) == "English"
+    
+    def test_load_from_file(self, catalog_file):
+        catalog = CivilizationCatalog()
+        loaded = catalog.load(catalog_file)
+        
+        assert [civ.civ_id for civ in loaded] == [3, 4, 5]
+        mongol = catalog.get("MONGOL")
+        assert str(mongol) == "Mongol"
+        assert mongol.knights_count == 20
+    
+    def test_configs_are_interned(self, catalog_file):
+        catalog = CivilizationCatalog()
+        catalog.load(catalog_file)
+        
+        assert catalog.get("MONGOL").config is catalog.get("CLONE").config
+        assert catalog.template(3) is catalog.template(5)
+        assert catalog.intern_config(10, 10, 10) is Civilization.ENGLISH.config
+    
+    def test_duplicate_name_rejected(self):
+        catalog = CivilizationCatalog()
+        
+        with pytest.raises(CatalogError):
+            catalog.register("English", 1, 1, 1)
+    
+    def test_invalid_entry_rejected(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text(json.dumps([{"pikemen": 3}]))
+        
+        with pytest.raises(CatalogError):
+            CivilizationCatalog().load(str(path))
+    
+    def test_load_is_all_or_nothing(self, tmp_path):
+        path = tmp_path / "dupes.json"
+        path.write_text(json.dumps([
+            {"name": "Mongol", "knights": 20},
+            {"name": "Viking", "pikemen": 20},
+            {"name": "mongol", "archers": 3},
+        ]))
+        catalog = CivilizationCatalog()
+        
+        with pytest.raises(CatalogError):
+            catalog.load(str(path))
+        assert len(catalog) == 3
+        assert "VIKING" not in catalog
+        
+        path.write_text(json.dumps([{"name": "Mongol"}, {"name": "English"}]))
+        with pytest.raises(CatalogError):
+            catalog.load(str(path))
+        assert "MONGOL" not in catalog
+    
+    def test_unknown_name(self):
+        with pytest.raises(CatalogError):
+            default_catalog.get("ATLANTIS")
+
+
+class TestCatalogArmies:
+    
+    def test_builtin_template(self):
+        template = unit_template(Civilization.CHINESE)
+        
+        assert len(template) == 29
+        assert template.count(Archer) == 25
+    
+    def test_army_from_catalog_civilization(self, catalog_file):
+        catalog = CivilizationCatalog()
+        catalog.load(catalog_file)
+        army = Army(catalog.get("VIKING"))
+        
+        assert army.civilization_id == 4
+        assert army.get_unit_counts() == {"Pikeman": 20, "Archer": 0, "Knight": 5}
+        assert army.total_strength == 20 * 5 + 5 * 20
+        assert "Viking Army" in str(army)
+    
+    def test_merge_needs_the_same_catalog(self, catalog_file):
+        first, second = CivilizationCatalog(), CivilizationCatalog()
+        first.load(catalog_file)
+        second.load(catalog_file)
+        army = Army(first.get("MONGOL"))
+        
+        with pytest.raises(ValueError):
+            army.merge(Army(second.get("MONGOL")))
+        army.merge(Army(first.get("MONGOL")))
+        assert army.unit_count == 52
+        
+        english = Army(Civilization.ENGLISH)
+        english.merge(Army(second.get("ENGLISH")))
+        assert english.unit_count == 60
+    
+    def test_battle_records_carry_civilization_id(self, catalog_file):
+        catalog = CivilizationCatalog()
+        catalog.load(catalog_file)
+        mongol = Army(catalog.get("MONGOL"))
+        english = Army(Civilization.ENGLISH)
+        
+        BattleSystem.resolve_battle(mongol, english)
+        
+        assert english.battle_history[0].opponent_civilization == "Mongol"
+        assert english.battle_history[0].opponent_civilization_id == 3
+        assert mongol.battle_history[0].opponent_civilization_id == 1
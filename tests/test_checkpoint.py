@@ -0,0 +1,162 @@
+import json
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.aging import WorldClock
+from src.transaction import ArmyTransaction
+from src.units import Pikeman, Archer, Knight
+from src.checkpoint import ArmyChangeTracker, CheckpointWriter, CheckpointError, load_checkpoint
+
+
+def army_state(army):
+    return ([(unit.__class__.__name__, unit.age_in_years, unit.additional_strength, unit.total_strength)
+             for unit in army.units],
+            army.gold, [str(record) for record in army.battle_history])
+
+
+def read_lines(path):
+    with open(path) as handle:
+        return [json.loads(line) for line in handle]
+
+
+class TestArmyChangeTracker:
+    
+    def test_collects_only_changes(self):
+        army = Army(Civilization.CHINESE)
+        tracker = ArmyChangeTracker(army)
+        
+        pikeman = army.get_units_by_type(Pikeman)[0]
+        army.train_unit(pikeman)
+        archer = army.get_units_by_type(Archer)[0]
+        knight = army.transform_unit(archer)
+        changes = tracker.collect()
+        
+        assert changes.gold_change == -50
+        assert len(changes.modified) == 1
+        assert changes.modified[0][1] == ("Pikeman", 0, 3, 0)
+        assert len(changes.removed) == 1
+        assert len(changes.added) == 1
+        assert changes.added[0][1][0] == "Knight"
+        assert tracker.collect().is_empty
+    
+    def test_added_then_removed_unit_is_dropped(self):
+        army = Army(Civilization.CHINESE)
+        tracker = ArmyChangeTracker(army)
+        
+        knight = army.transform_unit(army.get_units_by_type(Archer)[0])
+        army._discard_units([knight])
+        changes = tracker.collect()
+        
+        assert changes.added == []
+        assert len(changes.removed) == 1
+    
+    def test_battle_losses_and_records(self):
+        chinese = Army(Civilization.CHINESE)
+        tracker = ArmyChangeTracker(chinese)
+        
+        chinese.attack(Army(Civilization.ENGLISH))
+        changes = tracker.collect()
+        
+        assert len(changes.removed) == 2
+        assert len(changes.battles) == 1
+    
+    def test_rebuild_requires_snapshot(self):
+        army = Army(Civilization.CHINESE)
+        tracker = ArmyChangeTracker(army)
+        
+        army._units = army._units[:3]
+        
+        assert tracker.needs_snapshot
+        with pytest.raises(CheckpointError):
+            tracker.collect()
+        tracker.snapshot()
+        assert not tracker.needs_snapshot
+    
+    def test_one_tracker_per_army(self):
+        army = Army(Civilization.CHINESE)
+        tracker = ArmyChangeTracker(army)
+        
+        with pytest.raises(CheckpointError):
+            ArmyChangeTracker(army)
+        tracker.detach()
+        ArmyChangeTracker(army)
+
+
+class TestCheckpointWriter:
+    
+    def test_replay_matches_live_armies(self, tmp_path):
+        path = str(tmp_path / "world.ckpt")
+        chinese = Army(Civilization.CHINESE)
+        byzantine = Army(Civilization.BYZANTINE)
+        clock = WorldClock()
+        
+        with CheckpointWriter(path) as writer:
+            writer.track("chinese", chinese)
+            writer.track("byzantine", byzantine)
+            
+            chinese.train_all_units_of_type(Pikeman)
+            writer.checkpoint()
+            
+            clock.tick([chinese, byzantine], years=32)
+            chinese.transform_unit(chinese.get_units_by_type(Archer)[0])
+            writer.checkpoint()
+            
+            byzantine.attack(chinese)
+            with ArmyTransaction(byzantine) as transaction:
+                transaction.train_all(Knight).transform(byzantine.get_units_by_type(Pikeman)[0])
+            writer.checkpoint()
+            
+            restored = load_checkpoint(path)
+        
+        assert army_state(restored["chinese"]) == army_state(chinese)
+        assert army_state(restored["byzantine"]) == army_state(byzantine)
+        assert restored["chinese"].total_strength == chinese.total_strength
+    
+    def test_deltas_are_small_and_unchanged_armies_skipped(self, tmp_path):
+        path = str(tmp_path / "world.ckpt")
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        
+        with CheckpointWriter(path) as writer:
+            writer.track("chinese", chinese)
+            writer.track("english", english)
+            chinese.train_unit(chinese.get_units_by_type(Knight)[0])
+            
+            assert writer.checkpoint() == 1
+        
+        lines = read_lines(path)
+        assert [line["kind"] for line in lines] == ["snapshot", "snapshot", "delta"]
+        assert set(lines[2]) == {"kind", "army", "gold", "modified"}
+    
+    def test_compaction(self, tmp_path):
+        path = str(tmp_path / "world.ckpt")
+        army = Army(Civilization.ENGLISH)
+        
+        with CheckpointWriter(path, compact_every=3) as writer:
+            writer.track("english", army)
+            for unit in army.get_units_by_type(Archer)[:5]:
+                army.train_unit(unit)
+                writer.checkpoint()
+        
+        lines = read_lines(path)
+        assert [line["kind"] for line in lines] == ["snapshot", "delta", "delta"]
+        assert army_state(load_checkpoint(path)["english"]) == army_state(army)
+    
+    def test_external_rebuild_writes_snapshot(self, tmp_path):
+        path = str(tmp_path / "world.ckpt")
+        army = Army(Civilization.ENGLISH)
+        
+        with CheckpointWriter(path) as writer:
+            writer.track("english", army)
+            army._units = army._units[5:]
+            writer.checkpoint()
+        
+        assert [line["kind"] for line in read_lines(path)] == ["snapshot", "snapshot"]
+        assert load_checkpoint(path)["english"].unit_count == 25
+    
+    def test_delta_without_snapshot_is_rejected(self, tmp_path):
+        path = tmp_path / "broken.ckpt"
+        path.write_text('{"kind":"delta","army":"x","gold":5}\n')
+        
+        with pytest.raises(CheckpointError):
+            load_checkpoint(str(path))
@@ -0,0 +1,155 @@
+import io
+import os
+import subprocess
+import sys
+import pytest
+from src.cli import BatchSimulator, CommandError, main
+
+
+class TestBatchSimulator:
+    
+    def test_create_and_status(self):
+        simulator = BatchSimulator()
+        
+        assert simulator.execute("create a chinese") == ["created a Chinese strength=300 gold=1000"]
+        assert simulator.execute("  # comment only") == []
+        assert simulator.execute("status a")[0].startswith("status a Chinese Army")
+    
+    def test_train_and_transform(self):
+        simulator = BatchSimulator()
+        simulator.execute("create a english")
+        
+        assert simulator.execute("train a knights 2") == ["trained a Knight count=2 gold=940"]
+        assert simulator.execute("transform a pikeman 3") == ["transformed a Pikeman->Archer count=3 gold=850"]
+        assert simulator.armies["a"].get_unit_counts() == {"Pikeman": 7, "Archer": 13, "Knight": 10}
+    
+    def test_attack(self):
+        simulator = BatchSimulator()
+        simulator.execute("create a byzantine")
+        simulator.execute("create b chinese")
+        
+        assert simulator.execute("attack a b") == ["battle a vs b WIN 405-300"]
+    
+    def test_tournament(self):
+        simulator = BatchSimulator()
+        for name, civ in (("a", "chinese"), ("b", "english"), ("c", "byzantine")):
+            simulator.execute(f"create {name} {civ}")
+        
+        output = simulator.execute("tournament a b c")
+        
+        assert len(output) == 4
+        assert output[-1] == "tournament c=2 b=1 a=0"
+    
+    def test_errors(self):
+        simulator = BatchSimulator()
+        
+        with pytest.raises(CommandError):
+            simulator.execute("fly away")
+        with pytest.raises(CommandError):
+            simulator.execute("status missing")
+    
+    def test_counts_must_be_positive(self):
+        simulator = BatchSimulator()
+        simulator.execute("create a chinese")
+        
+        for count in ("-1", "0", "many"):
+            with pytest.raises(CommandError):
+                simulator.execute(f"train a archer {count}")
+            with pytest.raises(CommandError):
+                simulator.execute(f"transform a pikeman {count}")
+        assert simulator.armies["a"].gold == 1000
+    
+    def test_unaffordable_request_changes_nothing(self):
+        simulator = BatchSimulator()
+        simulator.execute("create a chinese")
+        army = simulator.armies["a"]
+        
+        # 25 archer transformations cost 1000, training 25 archers 500
+        simulator.execute("train a archer 1")
+        with pytest.raises(CommandError):
+            simulator.execute("transform a archer 25")
+        assert army.get_unit_counts() == {"Pikeman": 2, "Archer": 25, "Knight": 2}
+        assert army.gold == 980
+        with pytest.raises(CommandError):
+            simulator.execute("transform a knight 1")
+        
+        army._gold = 100
+        with pytest.raises(CommandError):
+            simulator.execute("train a archer 6")
+        assert army.total_strength == 307
+        assert army.gold == 100
+    
+    def test_run_batches_and_reports_errors(self):
+        simulator = BatchSimulator()
+        lines = ["create a chinese", "create a chinese", "create b english", "attack a b"]
+        
+        blocks = list(simulator.run(lines, batch_size=2))
+        
+        assert len(blocks) == 2
+        assert blocks[0].splitlines()[1] == "error line 2: Army a already exists"
+        assert blocks[1].splitlines()[-1] == "battle a vs b LOSS 300-350"
+
+
+class TestMain:
+    
+    def test_reads_stdin(self):
+        stdout = io.StringIO()
+        
+        main([], stdin=io.StringIO("create a english\nstatus a\n"), stdout=stdout)
+        
+        assert stdout.getvalue().splitlines()[0] == "created a English strength=350 gold=1000"
+    
+    def test_reads_file(self, tmp_path):
+        path = tmp_path / "commands.txt"
+        path.write_text("create a byzantine\n")
+        stdout = io.StringIO()
+        
+        main([str(path)], stdout=stdout)
+        
+        assert stdout.getvalue() == "created a Byzantine strength=405 gold=1000\n"
+    
+    def test_bad_catalog_is_a_usage_error(self, tmp_path, capsys):
+        path = tmp_path / "civs.json"
+        path.write_text('[{"name": "Mongol"}, {"name": "mongol"}]')
+        
+        for catalog in (str(path), str(tmp_path / "missing.json")):
+            with pytest.raises(SystemExit) as exit_info:
+                main(["--catalog", catalog], stdin=io.StringIO(""), stdout=io.StringIO())
+            assert exit_info.value.code == 2
+        assert "cannot load catalog" in capsys.readouterr().err
+    
+    def test_profile_flag_writes_phase_output(self, tmp_path):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        commands = "create a english\ncreate b chinese\ntrain a archer all\nattack a b\n"
+        
+        main(["--profile", str(tmp_path)], stdin=io.StringIO(commands), stdout=stdout, stderr=stderr)
+        
+        assert len(stdout.getvalue().splitlines()) == 4
+        table = stderr.getvalue().splitlines()
+        assert table[0].split() == ["phase", "calls", "total", "s", "mean", "ms", "share"]
+        assert [row.split()[:2] for row in table[1:]] == [
+            ["army_creation", "2"], ["battles", "1"], ["economy", "1"]]
+        assert (tmp_path / "battles.folded").exists()
+        assert (tmp_path / "timings.txt").exists()
+    
+    def test_package_imports_submodules_lazily(self):
+        code = "import sys, src; print(any(m.startswith('src.') for m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        
+        assert result.stdout.strip() == "False"
+
+
+class TestColdStart:
+    
+    def test_cli_import_skips_optional_modules(self):
+        # Regression check for start-up cost: the modules -X importtime sees
+        # loading for the CLI must not include the optional features
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.cli"],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        loaded = {line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()[1:]}
+        
+        assert "src.army" in loaded
+        for module in ("src.events", "src.query", "src.profiling", "json", "threading"):
+            assert module not in loaded
@@ -0,0 +1,186 @@
+import threading
+import pytest
+from src.army import Army
+from src.battle import BattleSystem, BattleResult
+from src.civilizations import Civilization
+from src.aging import WorldClock
+from src.transaction import ArmyTransaction
+from src.units import Pikeman, Archer, Knight
+from src.ladder import RatingLadder
+from src.matchmaking import MatchmakingIndex
+from src.events import (ArmyReset, BattleFought, BattleResolved, CoalitionBattleResolved, EventBus,
+                        OverflowPolicy, UnitModified, UnitRemoved, UnitTrained,
+                        UnitTransformed, UnitsAged)
+
+
+class TestArmyEvents:
+
+    def test_no_observer_without_subscribers(self):
+        army = Army(Civilization.CHINESE)
+        assert army.events.subscriber_count == 0
+        assert army._unit_observers == []
+
+        subscription = army.events.subscribe()
+        assert len(army._unit_observers) == 1
+        subscription.close()
+        assert army._unit_observers == []
+        assert not army.events.active
+
+    def test_train_and_transform_events(self):
+        army = Army(Civilization.ENGLISH)
+        with army.events.subscribe() as subscription:
+            army.train_unit(army.get_units_by_type(Knight)[0])
+            army.transform_unit(army.get_units_by_type(Pikeman)[0])
+            events = subscription.drain()
+
+        assert events == [
+            UnitTrained(army, 970, "Knight", 30),
+            UnitTransformed(army, 940, "Pikeman", "Archer", 10),
+        ]
+
+    def test_battle_and_aging_events(self):
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        with chinese.events.subscribe(event_types=(BattleFought, UnitRemoved, UnitsAged)) as subscription:
+            english.attack(chinese)
+            WorldClock().tick([chinese], years=60)
+            events = list(subscription)
+
+        assert [type(event) for event in events[:3]] == [UnitRemoved, UnitRemoved, BattleFought]
+        assert events[2].record.result == BattleResult.LOSS
+        assert events[2].record == chinese.battle_history[0]
+        assert isinstance(events[3], UnitsAged) and events[3].years == 60
+        # Every remaining unit is past retirement age
+        assert len(events) == 4 + 27
+        assert chinese.unit_count == 0
+
+    def test_full_blocking_queue_leaves_state_consistent(self):
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        ladder = RatingLadder()
+        index = MatchmakingIndex([chinese, english])
+        subscription = chinese.events.subscribe(maxsize=1, policy=OverflowPolicy.BLOCK, block_timeout=0.01)
+        ladder.register(chinese)
+        ladder.register(english)
+        
+        chinese.train_unit(chinese.get_units_by_type(Archer)[0])
+        chinese.transform_unit(chinese.get_units_by_type(Pikeman)[0])
+        ladder.resolve_battle(english, chinese)
+        
+        # Trained, transformed, two units removed and the battle
+        assert len(subscription) == 1 and subscription.dropped == 4
+        assert subscription.drain() == [UnitTrained(chinese, 980, "Archer", 17)]
+        assert chinese.gold == 1000 - 20 - 30
+        assert chinese.unit_count == 29 - 2
+        assert chinese.total_strength == sum(unit.total_strength for unit in chinese.units)
+        assert index.nearest(chinese.total_strength, 1, 0) == [chinese]
+        assert ladder.games_played(chinese) == 1
+        assert len(chinese.battle_history) == 1
+        assert ladder.rating(chinese) < ladder.rating(english)
+
+    def test_age_penalties_are_published(self):
+        army = Army(Civilization.ENGLISH)
+        with army.events.subscribe(event_types=(UnitModified,)) as subscription:
+            WorldClock().tick([army], years=35)
+            events = list(subscription)
+
+        penalized = [unit for unit in army.units if unit.total_strength < type(unit)().total_strength]
+        assert penalized
+        assert sorted((event.unit_type, event.strength) for event in events) == \
+            sorted((unit.__class__.__name__, unit.total_strength) for unit in penalized)
+
+    def test_transaction_events_carry_gold_after_commit(self):
+        army = Army(Civilization.BYZANTINE)
+        with army.events.subscribe() as subscription:
+            with ArmyTransaction(army) as transaction:
+                transaction.train_all(Knight)
+            events = subscription.drain()
+
+        assert len(events) == 15
+        assert all(event.gold == army.gold == 550 for event in events)
+
+    def test_split_publishes_reset(self):
+        army = Army(Civilization.BYZANTINE)
+        with army.events.subscribe() as subscription:
+            army.split(count=3)
+            assert subscription.drain() == [ArmyReset(army, 1000, 25)]
+
+
+class TestSubscription:
+
+    def test_drop_oldest(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=2)
+        for number in range(5):
+            bus.publish(number)
+        assert subscription.drain() == [3, 4]
+        assert subscription.dropped == 3
+
+    def test_drop_newest(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=2, policy=OverflowPolicy.DROP_NEWEST)
+        for number in range(5):
+            bus.publish(number)
+        assert subscription.drain() == [0, 1]
+        assert subscription.dropped == 3
+
+    def test_block_times_out(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=1, policy=OverflowPolicy.BLOCK, block_timeout=0.01)
+        bus.publish(1)
+        bus.publish(2)
+        assert subscription.drain() == [1]
+        assert subscription.dropped == 1
+
+    def test_block_waits_for_consumer(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=2, policy=OverflowPolicy.BLOCK, block_timeout=5)
+        received = []
+
+        def consume():
+            while len(received) < 50:
+                received.append(subscription.get(timeout=5))
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for number in range(50):
+            bus.publish(number)
+        consumer.join()
+        assert received == list(range(50))
+        assert subscription.dropped == 0
+
+    def test_get_times_out_and_close_ends_stream(self):
+        bus = EventBus()
+        subscription = bus.subscribe()
+        assert subscription.get(timeout=0.01) is None
+        bus.publish("event")
+        subscription.close()
+        assert subscription.get() == "event"
+        assert subscription.get() is None
+        assert not bus.active
+
+    def test_every_subscriber_gets_the_event(self):
+        bus = EventBus()
+        first, second = bus.subscribe(), bus.subscribe(event_types=(int,))
+        bus.publish(1)
+        bus.publish("two")
+        assert first.drain() == [1, "two"]
+        assert second.drain() == [1]
+
+
+class TestBattleSystemEvents:
+
+    def test_resolved_battles_are_published(self):
+        army1 = Army(Civilization.BYZANTINE)
+        army2 = Army(Civilization.CHINESE)
+        with BattleSystem.events.subscribe() as subscription:
+            outcome = BattleSystem.resolve_battle(army1, army2)
+            assert subscription.drain() == [BattleResolved(army1, army2, outcome)]
+        assert not BattleSystem.events.active
+
+    def test_coalition_battles_are_published(self):
+        side1 = [Army(Civilization.BYZANTINE), Army(Civilization.CHINESE)]
+        side2 = [Army(Civilization.ENGLISH)]
+        with BattleSystem.events.subscribe() as subscription:
+            outcome = BattleSystem.resolve_coalition_battle(side1, side2)
+            assert subscription.drain() == [CoalitionBattleResolved(tuple(side1), tuple(side2), outcome)]
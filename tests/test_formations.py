@@ -0,0 +1,101 @@
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.battle import BattleResult
+from src.formations import FormationTree, FormationError
+from src.units import Pikeman, Archer, Knight
+
+
+@pytest.fixture
+def tree():
+    army = Army(Civilization.ENGLISH)  # 10 of each type
+    tree = FormationTree(army)
+    north = tree.add_division("north")
+    south = tree.add_division("south")
+    tree.assign(army.get_units_by_type(Knight), tree.add_squad(north, "cavalry"))
+    tree.assign(army.get_units_by_type(Archer), tree.add_squad(north, "bows"))
+    tree.assign(army.get_units_by_type(Pikeman)[:6], tree.add_squad(south, "pikes"))
+    return tree
+
+
+def formation(tree, *path):
+    node = tree.root
+    for name in path:
+        node = next(child for child in node.children if child.name == name)
+    return node
+
+
+class TestFormationTree:
+    
+    def test_subtree_strengths(self, tree):
+        assert tree.strength(formation(tree, "north")) == 200 + 100
+        assert tree.strength(formation(tree, "north", "bows")) == 100
+        assert tree.strength(formation(tree, "south")) == 30
+        assert tree.strength(tree.root) == 350
+        assert tree.unit_counts(formation(tree, "north")) == {"Pikeman": 0, "Archer": 10, "Knight": 10}
+    
+    def test_training_updates_ancestors(self, tree):
+        archer = tree.army.get_units_by_type(Archer)[0]
+        
+        tree.train_unit(archer)
+        
+        assert tree.strength(formation(tree, "north", "bows")) == 107
+        assert tree.strength(formation(tree, "north")) == 307
+        assert tree.strength(formation(tree, "south")) == 30
+    
+    def test_transform_keeps_squad(self, tree):
+        pikeman = tree.army.get_units_by_type(Pikeman)[0]
+        pikes = formation(tree, "south", "pikes")
+        
+        archer = tree.transform_unit(pikeman)
+        
+        assert tree.squad_of(archer) is pikes
+        assert tree.squad_of(pikeman) is None
+        assert tree.unit_counts(pikes) == {"Pikeman": 5, "Archer": 1, "Knight": 0}
+        assert tree.strength(pikes) == 25 + 10
+    
+    def test_battle_commits_only_selected_formations(self, tree):
+        opponent = Army(Civilization.CHINESE)  # 300
+        
+        outcome = tree.resolve_battle([formation(tree, "south")], opponent)
+        
+        assert outcome.result == BattleResult.LOSS
+        assert outcome.army1_strength == 30
+        assert tree.army.unit_count == 28
+        assert tree.army.get_unit_counts()["Knight"] == 10
+        assert tree.strength(formation(tree, "south")) == 20
+        assert tree.army.battle_history[0].own_strength == 30
+    
+    def test_battle_with_winning_formation(self, tree):
+        opponent = Army(Civilization.CHINESE)  # 300
+        tree.train_unit(tree.army.get_units_by_type(Archer)[0])  # north: 307
+        
+        tree.resolve_battle([formation(tree, "north")], opponent)
+        
+        assert tree.army.gold == 1000 - 20 + 100
+        assert opponent.unit_count == 27
+    
+    def test_changes_outside_tree_are_picked_up(self, tree):
+        Army(Civilization.BYZANTINE).attack(tree.army)  # English loses 2 knights
+        
+        assert tree.strength(formation(tree, "north", "cavalry")) == 160
+        assert tree.unit_counts(formation(tree, "north"))["Knight"] == 8
+    
+    def test_transform_outside_tree_keeps_squad(self, tree):
+        pikes = formation(tree, "south", "pikes")
+        pikeman = next(tree.units(pikes))
+        
+        archer = tree.army.transform_unit(pikeman)
+        
+        assert tree.squad_of(archer) is pikes
+        assert tree.squad_of(pikeman) is None
+        assert tree.unit_counts(pikes) == {"Pikeman": 5, "Archer": 1, "Knight": 0}
+        assert tree.strength(formation(tree, "south")) == 5 * 5 + 10
+    
+    def test_structure_errors(self, tree):
+        with pytest.raises(FormationError):
+            tree.add_squad(tree.root, "bad")
+        with pytest.raises(FormationError):
+            tree.assign([], formation(tree, "north"))
+        with pytest.raises(ValueError):
+            tree.assign([Knight()], formation(tree, "north", "cavalry"))
@@ -0,0 +1,94 @@
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.battle import BattleSystem
+from src.ladder import RatingLadder
+
+
+class TestRatingLadder:
+    
+    def test_register_assigns_sequential_ids(self):
+        ladder = RatingLadder()
+        armies = [Army(Civilization.CHINESE) for _ in range(3)]
+        
+        assert [ladder.register(army) for army in armies] == [0, 1, 2]
+        assert ladder.register(armies[1]) == 1
+        assert len(ladder) == 3
+        assert ladder.rating(armies[0]) == RatingLadder.INITIAL_RATING
+    
+    def test_win_moves_ratings(self):
+        ladder = RatingLadder()
+        winner = Army(Civilization.BYZANTINE)
+        loser = Army(Civilization.CHINESE)
+        
+        ladder.resolve_battle(winner, loser)
+        
+        assert ladder.rating(winner) == pytest.approx(1516.0)
+        assert ladder.rating(loser) == pytest.approx(1484.0)
+        assert ladder.games_played(winner) == 1
+    
+    def test_tie_between_equals_keeps_ratings(self):
+        ladder = RatingLadder()
+        army1, army2 = Army(Civilization.ENGLISH), Army(Civilization.ENGLISH)
+        
+        outcome = BattleSystem.resolve_battle(army1, army2)
+        ladder.record(army1, army2, outcome)
+        
+        assert ladder.rating(army1) == pytest.approx(1500.0)
+        assert ladder.rating(army2) == pytest.approx(1500.0)
+    
+    def test_rank_and_top(self):
+        ladder = RatingLadder()
+        armies = [Army(Civilization.ENGLISH) for _ in range(5)]
+        for i, army in enumerate(armies):
+            ladder.register(army, rating=1000.0 + 100 * i)
+        
+        assert ladder.rank(armies[4]) == 1
+        assert ladder.rank(armies[0]) == 5
+        
+        top = ladder.top(3)
+        assert [army for army, _ in top] == [armies[4], armies[3], armies[2]]
+        assert [rating for _, rating in top] == [1400.0, 1300.0, 1200.0]
+    
+    def test_top_orders_within_bucket(self):
+        ladder = RatingLadder(resolution=100.0)
+        low, mid, high = Army(Civilization.CHINESE), Army(Civilization.CHINESE), Army(Civilization.CHINESE)
+        ladder.register(low, rating=1510.0)
+        ladder.register(high, rating=1590.0)
+        ladder.register(mid, rating=1550.0)
+        
+        assert [army for army, _ in ladder.top(2)] == [high, mid]
+        assert [ladder.rank(army) for army in (high, mid, low)] == [1, 2, 3]
+    
+    def test_equal_ratings_share_rank(self):
+        ladder = RatingLadder()
+        armies = [Army(Civilization.CHINESE) for _ in range(4)]
+        for army in armies:
+            ladder.register(army)
+        ladder.register(Army(Civilization.ENGLISH), rating=1600.0)
+        
+        assert [ladder.rank(army) for army in armies] == [2, 2, 2, 2]
+        assert [army for army, _ in ladder.top(3)[1:]] == armies[:2]
+    
+    def test_rank_follows_updates_within_a_bucket(self):
+        ladder = RatingLadder(resolution=1000.0)
+        armies = [Army(Civilization.CHINESE) for _ in range(6)]
+        for army in armies:
+            ladder.register(army)
+        for first, second in ((0, 1), (2, 3), (0, 2), (5, 4)):
+            ladder.resolve_battle(armies[first], armies[second])
+        
+        ratings = [ladder.rating(army) for army in armies]
+        assert [ladder.rank(army) for army in armies] == \
+            [1 + sum(other > rating for other in ratings) for rating in ratings]
+        assert [rating for _, rating in ladder.top(6)] == sorted(ratings, reverse=True)
+    
+    def test_top_more_than_population(self):
+        ladder = RatingLadder()
+        ladder.register(Army(Civilization.CHINESE))
+        
+        assert len(ladder.top(10)) == 1
+    
+    def test_unregistered_army(self):
+        with pytest.raises(ValueError):
+            RatingLadder().rating(Army(Civilization.CHINESE))
@@ -0,0 +1,65 @@
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.matchmaking import MatchmakingIndex
+from src.units import Archer
+
+
+class TestMatchmakingIndex:
+    
+    def test_nearest_within_range(self):
+        chinese = Army(Civilization.CHINESE)      # 300
+        english = Army(Civilization.ENGLISH)      # 350
+        byzantine = Army(Civilization.BYZANTINE)  # 405
+        index = MatchmakingIndex([chinese, english, byzantine])
+        
+        assert index.nearest(340, k=3, max_difference=100) == [english, chinese, byzantine]
+        assert index.nearest(340, k=3, max_difference=50) == [english, chinese]
+        assert index.nearest(340, k=1, max_difference=50) == [english]
+    
+    def test_find_opponents_excludes_same_civilization(self):
+        army = Army(Civilization.ENGLISH)
+        twin = Army(Civilization.ENGLISH)
+        chinese = Army(Civilization.CHINESE)
+        index = MatchmakingIndex([army, twin, chinese])
+        
+        assert index.find_opponents(army, k=5, max_difference=100) == [chinese]
+        assert index.find_opponents(army, k=5, max_difference=100,
+                                    exclude_same_civilization=False) == [twin, chinese]
+    
+    def test_excluded_cluster_is_skipped(self):
+        # Hundreds of same-civilization armies sit at the query strength
+        cluster = [Army(Civilization.ENGLISH) for _ in range(300)]
+        chinese = Army(Civilization.CHINESE)
+        byzantine = Army(Civilization.BYZANTINE)
+        index = MatchmakingIndex(cluster + [byzantine, chinese])
+        
+        assert index.find_opponents(cluster[0], k=2, max_difference=100) == [chinese, byzantine]
+        assert index.find_opponents(cluster[0], k=3, max_difference=50) == [chinese]
+        assert index.nearest(350, k=3, max_difference=0) == cluster[:3]
+    
+    def test_index_follows_training_and_battles(self):
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        byzantine = Army(Civilization.BYZANTINE)
+        index = MatchmakingIndex([chinese, english, byzantine])
+        
+        for archer in chinese.get_units_by_type(Archer)[:15]:
+            chinese.train_unit(archer)  # 300 -> 405
+        assert index.nearest(405, k=1, max_difference=0) in ([chinese], [byzantine])
+        assert len(index.nearest(405, k=5, max_difference=0)) == 2
+        
+        byzantine.attack(english)  # English loses two knights: 350 -> 310
+        assert index.nearest(310, k=1, max_difference=0) == [english]
+    
+    def test_remove(self):
+        army = Army(Civilization.CHINESE)
+        index = MatchmakingIndex([army])
+        index.remove(army)
+        
+        assert len(index) == 0
+        assert army not in index
+        army.train_unit(army.get_units_by_type(Archer)[0])
+        
+        with pytest.raises(ValueError):
+            index.remove(army)
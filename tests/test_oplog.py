@@ -0,0 +1,151 @@
+import io
+import pytest
+from src.army import Army
+from src.battle import BattleSystem
+from src.campaign import CampaignSimulator
+from src.civilizations import Civilization
+from src.aging import WorldClock
+from src.transaction import ArmyTransaction
+from src.units import Pikeman, Archer, Knight
+from src.oplog import OperationLog, OperationLogError, RECORD, replay
+from src.streaming import stream_battles
+
+
+def army_state(army):
+    return ([(unit.__class__.__name__, unit.age_in_years, unit.additional_strength, unit.total_strength)
+             for unit in army.units],
+            army.gold, [str(record) for record in army.battle_history],
+            [record.opponent_civilization_id for record in army.battle_history])
+
+
+class TestOperationLog:
+
+    def test_train_and_transform_replay(self):
+        buffer = io.BytesIO()
+        with OperationLog(buffer) as log:
+            army = log.create(Civilization.CHINESE)
+            army.train_unit(army.get_units_by_type(Pikeman)[0])
+            army.train_unit(army.get_units_by_type(Pikeman)[0])
+            knight = army.transform_unit(army.get_units_by_type(Archer)[3])
+            army.train_unit(knight)
+            army.transform_unit(army.get_units_by_type(Pikeman)[1])
+
+        replayed = replay(buffer.getvalue())
+        assert list(replayed) == [0]
+        assert army_state(replayed[0]) == army_state(army)
+        assert replayed[0].total_strength == army.total_strength
+
+    def test_records_are_fixed_size(self):
+        buffer = io.BytesIO()
+        with OperationLog(buffer) as log:
+            army = log.create(Civilization.ENGLISH)
+            for _ in range(5):
+                army.train_unit(army.get_units_by_type(Knight)[0])
+        assert len(buffer.getvalue()) == 6 * RECORD.size
+
+    def test_battles_aging_and_transactions_replay(self):
+        buffer = io.BytesIO()
+        clock = WorldClock()
+        with OperationLog(buffer) as log:
+            chinese = log.create(Civilization.CHINESE)
+            english = log.create(Civilization.ENGLISH)
+            byzantine = log.create(Civilization.BYZANTINE)
+            chinese.attack(english)
+            clock.tick([chinese, byzantine], years=32)
+            byzantine.attack(chinese)
+            with ArmyTransaction(english) as transaction:
+                transaction.train_all(Pikeman).transform(english.get_units_by_type(Archer)[0])
+            CampaignSimulator.run(english, chinese, max_rounds=5)
+            clock.tick([english], years=50)
+
+        replayed = replay(buffer.getvalue())
+        for army_id, army in enumerate((chinese, english, byzantine)):
+            assert army_state(replayed[army_id]) == army_state(army)
+
+    def test_streams_without_history_replay(self):
+        buffer = io.BytesIO()
+        with OperationLog(buffer) as log:
+            chinese = log.create(Civilization.CHINESE)
+            english = log.create(Civilization.ENGLISH)
+            chinese.attack(english)
+            list(stream_battles([(chinese, english)] * 3, keep_history=False))
+
+        replayed = replay(buffer.getvalue())
+        assert len(replayed[0].battle_history) == 1
+        for army_id, army in enumerate((chinese, english)):
+            assert army_state(replayed[army_id]) == army_state(army)
+
+    def test_coalition_names_replay(self):
+        buffer = io.BytesIO()
+        with OperationLog(buffer) as log:
+            chinese = log.create(Civilization.CHINESE)
+            english = log.create(Civilization.ENGLISH)
+            byzantine = log.create(Civilization.BYZANTINE)
+            BattleSystem.resolve_coalition_battle([chinese, english], [byzantine])
+            BattleSystem.resolve_coalition_battle([chinese, english], [byzantine])
+
+        data = buffer.getvalue()
+        replayed = replay(data)
+        assert army_state(replayed[2]) == army_state(byzantine)
+        assert replayed[2].battle_history[0].opponent_civilization_id is None
+        # The coalition name is written once and referenced afterwards
+        assert data.count(byzantine.battle_history[0].opponent_civilization.encode()) == 1
+
+    def test_split_and_merge_are_logged_as_rebuilds(self):
+        buffer = io.BytesIO()
+        with OperationLog(buffer) as log:
+            army = log.create(Civilization.BYZANTINE)
+            detachment = army.split(count=5, gold=300)
+            log.attach(detachment)
+            detachment.train_unit(detachment.units[0])
+            army.train_unit(army.units[-1])
+            army.merge(detachment)
+            army.train_unit(army.units[-1])
+
+        replayed = replay(buffer.getvalue())
+        assert army_state(replayed[0]) == army_state(army)
+        assert army_state(replayed[1]) == army_state(detachment)
+
+    def test_attach_existing_army(self):
+        army = Army(Civilization.ENGLISH)
+        army.train_unit(army.units[0])
+        buffer = io.BytesIO()
+        with OperationLog(buffer) as log:
+            assert log.attach(army) == 0
+            army.transform_unit(army.units[0])
+        assert army_state(replay(buffer.getvalue())[0]) == army_state(army)
+
+    def test_detach_stops_logging(self):
+        buffer = io.BytesIO()
+        log = OperationLog(buffer)
+        army = log.create(Civilization.CHINESE)
+        log.detach(army)
+        army.train_unit(army.units[0])
+        log.close()
+        assert len(buffer.getvalue()) == RECORD.size
+        with pytest.raises(OperationLogError):
+            log.army_id(army)
+
+    def test_small_buffer_flushes_to_file(self, tmp_path):
+        path = str(tmp_path / "armies.oplog")
+        log = OperationLog(path, buffer_size=RECORD.size * 2)
+        army = log.create(Civilization.ENGLISH)
+        for unit in army.get_units_by_type(Pikeman):
+            army.train_unit(unit)
+        assert (tmp_path / "armies.oplog").stat().st_size >= RECORD.size * 10
+        log.close()
+        assert army_state(replay(path)[0]) == army_state(army)
+
+    def test_truncated_log_is_rejected(self):
+        buffer = io.BytesIO()
+        with OperationLog(buffer) as log:
+            army = log.create(Civilization.CHINESE)
+            army.train_unit(army.units[0])
+        with pytest.raises(OperationLogError):
+            replay(buffer.getvalue()[:-3])
+
+    def test_closed_log_rejects_armies(self):
+        log = OperationLog(io.BytesIO())
+        log.close()
+        with pytest.raises(OperationLogError):
+            log.create(Civilization.CHINESE)
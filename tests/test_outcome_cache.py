@@ -0,0 +1,105 @@
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.battle import BattleSystem, BattleResult
+from src.outcome_cache import BattleOutcomeCache
+from src.units import Archer, Pikeman
+
+
+class TestArmyFingerprint:
+    
+    def test_fresh_armies_share_fingerprint(self):
+        assert Army(Civilization.CHINESE).state_fingerprint() == Army(Civilization.CHINESE).state_fingerprint()
+        assert Army(Civilization.CHINESE).state_fingerprint() != Army(Civilization.ENGLISH).state_fingerprint()
+    
+    def test_fingerprint_tracks_training_and_gold(self):
+        army = Army(Civilization.CHINESE)
+        before = army.state_fingerprint()
+        
+        army.train_unit(army.get_units_by_type(Archer)[0])
+        after = army.state_fingerprint()
+        
+        assert after != before
+        assert after[0] == before[0] - 20
+        
+        army._gold = before[0]
+        assert army.state_fingerprint() != before
+
+
+class TestBattleOutcomeCache:
+    
+    def test_repeat_matchups_hit(self):
+        cache = BattleOutcomeCache()
+        
+        for _ in range(5):
+            BattleSystem.resolve_battle(Army(Civilization.BYZANTINE), Army(Civilization.CHINESE), cache=cache)
+        
+        assert cache.misses == 1
+        assert cache.hits == 4
+        assert cache.hit_rate == pytest.approx(0.8)
+    
+    def test_cached_outcome_matches_uncached(self):
+        cache = BattleOutcomeCache()
+        for _ in range(2):
+            cached_1, cached_2 = Army(Civilization.ENGLISH), Army(Civilization.ENGLISH)
+            cached_2.train_unit(cached_2.get_units_by_type(Archer)[0])
+            BattleSystem.resolve_battle(cached_1, cached_2, cache=cache)
+        
+        plain_1, plain_2 = Army(Civilization.ENGLISH), Army(Civilization.ENGLISH)
+        plain_2.train_unit(plain_2.get_units_by_type(Archer)[0])
+        outcome = BattleSystem.resolve_battle(plain_1, plain_2)
+        
+        assert cache.hits == 1
+        assert outcome.result == BattleResult.LOSS
+        assert cached_1.state_fingerprint() == plain_1.state_fingerprint()
+        assert cached_2.state_fingerprint() == plain_2.state_fingerprint()
+        assert cached_1.battle_history == plain_1.battle_history
+        assert cached_2.battle_history == plain_2.battle_history
+    
+    def test_cached_battles_leave_the_same_survivors(self):
+        # A trained pikeman ties with the knights; both paths take it first
+        def trained():
+            army = Army(Civilization.ENGLISH)
+            for _ in range(5):
+                army.train_unit(army.get_units_by_type(Pikeman)[0])
+            return army
+        
+        cache = BattleOutcomeCache()
+        BattleSystem.resolve_battle(Army(Civilization.BYZANTINE), trained(), cache=cache)
+        cached_army = trained()
+        cached = BattleSystem.resolve_battle(Army(Civilization.BYZANTINE), cached_army, cache=cache)
+        plain_army = trained()
+        plain = BattleSystem.resolve_battle(Army(Civilization.BYZANTINE), plain_army)
+        
+        assert cache.hits == 1
+        assert cached.army2_removed == plain.army2_removed == (("Pikeman", 20), ("Knight", 20))
+        assert [(type(unit), unit.total_strength) for unit in cached_army.units] == \
+            [(type(unit), unit.total_strength) for unit in plain_army.units]
+    
+    def test_outcome_contains_removal_set(self):
+        outcome = BattleSystem.resolve_battle(Army(Civilization.BYZANTINE), Army(Civilization.CHINESE))
+        
+        assert outcome.result == BattleResult.WIN
+        assert outcome.army1_removed == ()
+        assert outcome.army2_removed == (("Knight", 20), ("Knight", 20))
+    
+    def test_lru_eviction(self):
+        cache = BattleOutcomeCache(max_size=2)
+        civs = [Civilization.CHINESE, Civilization.ENGLISH, Civilization.BYZANTINE]
+        
+        for civ in civs:
+            BattleSystem.resolve_battle(Army(civ), Army(civ), cache=cache)
+        
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.stats()["misses"] == 3
+    
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            BattleOutcomeCache(max_size=0)
+    
+    def test_attack_accepts_cache(self):
+        cache = BattleOutcomeCache()
+        Army(Civilization.BYZANTINE).attack(Army(Civilization.CHINESE), cache=cache)
+        
+        assert len(cache) == 1
@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.profiling import (Profiler, PROFILE_ENV_VAR, active_profiler, disable_profiling,
+                           enable_profiling, phase)
+
+
+def profiling_state():
+    return sys.getprofile() is None, active_profiler() is None
+
+
+def fight(army1, army2, rounds):
+    for _ in range(rounds):
+        army1.attack(army2)
+
+
+class TestProfiler:
+    
+    def test_phases_are_timed_and_stacks_collapsed(self):
+        profiler = Profiler()
+        with profiler.phase("creation"):
+            chinese = Army(Civilization.CHINESE)
+            english = Army(Civilization.ENGLISH)
+        with profiler.phase("battles"):
+            fight(english, chinese, 3)
+        
+        timings = profiler.timings
+        assert set(timings) == {"creation", "battles"}
+        assert timings["battles"].calls == 1
+        stacks = profiler.collapsed_stacks()
+        assert all(line.split(";")[0].split(" ")[0] in ("creation", "battles") for line in stacks)
+        assert any(line.startswith("battles;test_profiling.py:fight;army.py:Army.attack;")
+                   for line in stacks)
+        assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in stacks)
+    
+    def test_nested_phases(self):
+        profiler = Profiler()
+        with profiler.phase("turn"):
+            army = Army(Civilization.CHINESE)
+            for _ in range(2):
+                with profiler.phase("economy"):
+                    army.train_all_units_of_type(type(army.units[0]))
+        
+        assert profiler.timings["turn/economy"].calls == 2
+        assert any(line.startswith("turn;economy;army.py:Army.train_all_units_of_type")
+                   for line in profiler.collapsed_stacks())
+        assert not any("__enter__" in line or "__exit__" in line
+                       for line in profiler.collapsed_stacks())
+    
+    def test_profiler_is_removed_after_phase(self):
+        profiler = Profiler()
+        with profiler.phase("work"):
+            pass
+        
+        assert sys.getprofile() is None
+    
+    def test_write(self, tmp_path):
+        profiler = Profiler()
+        with profiler.phase("battles"):
+            fight(Army(Civilization.BYZANTINE), Army(Civilization.CHINESE), 2)
+        
+        profiler.write(str(tmp_path))
+        
+        assert sorted(os.listdir(tmp_path)) == ["battles.folded", "profile.folded", "timings.txt"]
+        assert (tmp_path / "timings.txt").read_text().startswith("phase")
+
+
+class TestGlobalProfiling:
+    
+    def test_phase_is_a_no_op_when_disabled(self):
+        assert active_profiler() is None
+        with phase("anything"):
+            assert sys.getprofile() is None
+    
+    def test_enable_and_disable(self):
+        profiler = enable_profiling()
+        try:
+            assert enable_profiling() is profiler
+            with phase("battles"):
+                Army(Civilization.CHINESE)
+        finally:
+            assert disable_profiling() is profiler
+        
+        assert profiler.timings["battles"].calls == 1
+        assert active_profiler() is None
+    
+    def test_environment_variable(self, tmp_path):
+        code = ("from src.profiling import phase\n"
+                "from src.army import Army\n"
+                "from src.civilizations import Civilization\n"
+                "with phase('army_creation'):\n"
+                "    Army(Civilization.ENGLISH)\n")
+        env = dict(os.environ, **{PROFILE_ENV_VAR: str(tmp_path)})
+        subprocess.run([sys.executable, "-c", code], check=True, env=env,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        
+        assert "process;army_creation;" in (tmp_path / "process.folded").read_text()
+        assert "process/army_creation" in (tmp_path / "timings.txt").read_text()
+    
+    def test_environment_variable_without_cli_or_phases(self, tmp_path):
+        # Importing the package is enough; the whole process is profiled
+        code = ("from src import Army, Civilization\n"
+                "Army(Civilization.BYZANTINE).attack(Army(Civilization.CHINESE))\n")
+        env = dict(os.environ, **{PROFILE_ENV_VAR: str(tmp_path)})
+        subprocess.run([sys.executable, "-c", code], check=True, env=env,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        
+        assert "army.py:Army.attack" in (tmp_path / "process.folded").read_text()
+        assert (tmp_path / "timings.txt").read_text().splitlines()[1].startswith("process")
+    
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                        reason="needs the fork start method")
+    def test_forked_workers_do_not_profile(self):
+        profiler = enable_profiling()
+        try:
+            with phase("sweep"):
+                with multiprocessing.get_context("fork").Pool(1) as pool:
+                    child = pool.apply(profiling_state)
+        finally:
+            disable_profiling()
+        
+        assert child == (True, True)
+        assert profiler.timings["sweep"].calls == 1
+    
+    def test_spawned_workers_leave_the_parent_profile(self, tmp_path):
+        code = ("import multiprocessing\n"
+                "from src.army import Army\n"
+                "from src.civilizations import Civilization\n"
+                "from src.profiling import active_profiler\n"
+                "if __name__ == '__main__':\n"
+                "    with multiprocessing.get_context('spawn').Pool(1) as pool:\n"
+                "        assert pool.apply(active_profiler) is None\n"
+                "    Army(Civilization.ENGLISH)\n")
+        script = tmp_path / "job.py"
+        script.write_text(code)
+        env = dict(os.environ, **{PROFILE_ENV_VAR: str(tmp_path / "out")},
+                   PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        subprocess.run([sys.executable, str(script)], check=True, env=env)
+        
+        assert "army.py:Army.__init__" in (tmp_path / "out" / "process.folded").read_text()
@@ -0,0 +1,107 @@
+from src.army import Army
+from src.civilizations import Civilization
+from src.aging import WorldClock
+from src.transaction import ArmyTransaction
+from src.units import Unit, Pikeman, Archer, Knight
+
+
+def brute_force(army, unit_type=Unit, strength=(None, None), additional=(None, None), age=(None, None)):
+    def within(value, bounds):
+        return (bounds[0] is None or value >= bounds[0]) and (bounds[1] is None or value <= bounds[1])
+    return sorted(id(unit) for unit in army.units
+                  if isinstance(unit, unit_type) and within(unit.total_strength, strength)
+                  and within(unit.additional_strength, additional) and within(unit.age_in_years, age))
+
+
+class TestUnitQuery:
+    
+    def test_filter_by_type_and_strength(self):
+        army = Army(Civilization.CHINESE)
+        for archer in army.get_units_by_type(Archer)[:3]:
+            army.train_unit(archer)
+        query = army.query().of_type(Archer).strength(minimum=17)
+        
+        assert query.count() == 3
+        assert all(isinstance(unit, Archer) and unit.total_strength == 17 for unit in query)
+        assert army.query().of_type(Archer).count() == 25
+        assert army.query().of_type(Pikeman, Knight).count() == 4
+        assert army.query().count() == 29
+    
+    def test_queries_are_composable_and_reusable(self):
+        army = Army(Civilization.ENGLISH)
+        army.train_unit(army.get_units_by_type(Knight)[0])
+        knights = army.query().of_type(Knight)
+        
+        assert knights.strength(minimum=30).count() == 1
+        assert knights.strength(maximum=20).count() == 9
+        assert knights.additional_strength(minimum=1).first().additional_strength == 10
+        assert knights.count() == 10
+        assert not knights.strength(minimum=100).exists()
+    
+    def test_index_follows_mutations(self):
+        army = Army(Civilization.CHINESE)
+        query = army.query().of_type(Knight)
+        assert query.count() == 2
+        
+        army.transform_unit(army.get_units_by_type(Archer)[0])
+        assert query.count() == 3
+        
+        army.attack(Army(Civilization.BYZANTINE))
+        assert query.count() == 1
+        
+        with ArmyTransaction(army) as transaction:
+            transaction.train_all(Knight)
+        assert query.strength(minimum=30).count() == 1
+    
+    def test_age_queries_after_aging(self):
+        army = Army(Civilization.ENGLISH)
+        clock = WorldClock()
+        assert army.query().age(maximum=0).count() == 30
+        
+        clock.tick([army], years=21)
+        pikeman = army.transform_unit(army.get_units_by_type(Pikeman)[0])
+        
+        assert army.query().age(minimum=21).count() == 30
+        assert army.query().of_type(Pikeman).strength(maximum=4).count() == 9
+        assert army.query().of_type(Archer).age(minimum=21).strength(minimum=10).count() == 11
+        
+        clock.tick([army], years=20)
+        assert army.query().of_type(Pikeman).count() == 0
+        assert army.query().age(minimum=41).count() == 21
+    
+    def test_matches_brute_force(self):
+        army = Army(Civilization.BYZANTINE)
+        WorldClock().tick([army], years=26)
+        for unit in army.get_units_by_type(Archer)[:4] + army.get_units_by_type(Knight)[:3]:
+            army.train_unit(unit)
+        army.transform_unit(army.get_units_by_type(Pikeman)[0])
+        
+        cases = [
+            dict(unit_type=Archer, strength=(10, None)),
+            dict(unit_type=Knight, strength=(None, 25), age=(20, 30)),
+            dict(additional=(1, None)),
+            dict(age=(None, 5)),
+            dict(strength=(9, 16), age=(26, 26)),
+        ]
+        for case in cases:
+            query = army.query().of_type(case.get("unit_type", Unit))
+            query = query.strength(*case.get("strength", (None, None)))
+            query = query.additional_strength(*case.get("additional", (None, None)))
+            query = query.age(*case.get("age", (None, None)))
+            expected = brute_force(army, **case)
+            assert sorted(id(unit) for unit in query) == expected
+            assert query.count() == len(expected)
+    
+    def test_direct_unit_list_changes_rebuild_the_index(self):
+        army = Army(Civilization.ENGLISH)
+        assert army.query().count() == 30
+        
+        army._units = army._units[:12]
+        
+        assert army.query().count() == 12
+        assert army.query().of_type(Archer).count() == 2
+    
+    def test_where_predicate(self):
+        army = Army(Civilization.CHINESE)
+        
+        assert army.query().where(lambda unit: unit.get_transformation_target() == "Knight").count() == 25
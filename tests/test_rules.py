@@ -0,0 +1,168 @@
+import pickle
+import pytest
+from src.army import Army
+from src.battle import BattleResult, BattleSystem
+from src.campaign import CampaignSimulator
+from src.civilizations import Civilization
+from src.outcome_cache import BattleOutcomeCache
+from src.units import Knight
+from src.rules import LossPolicy, RuleSet
+
+
+def trained_army(civilization, knights_trained):
+    army = Army(civilization)
+    for knight in army.get_units_by_type(Knight)[:knights_trained]:
+        army.train_unit(knight)
+    return army
+
+
+class TestRuleSet:
+
+    def test_classic_rules_match_battle_system(self):
+        classic = RuleSet().compile()
+        for first in Civilization:
+            for second in Civilization:
+                for trained in range(3):
+                    expected = BattleSystem.compute_outcome(trained_army(first, trained), Army(second))
+                    assert classic.compute_outcome(trained_army(first, trained), Army(second)) == expected
+
+    def test_compiled_system_is_cached(self):
+        assert RuleSet(name="arena").compile() is RuleSet(name="arena").compile()
+        assert RuleSet(name="arena").compile() is not RuleSet(name="arena", winner_reward=5).compile()
+        assert issubclass(RuleSet().compile(), BattleSystem)
+
+    def test_compiled_system_pickles_as_its_rules(self):
+        system = RuleSet(name="pickled", winner_reward=40).compile()
+        assert pickle.loads(pickle.dumps(system)) is system
+
+        random_system = RuleSet(name="pickled-random", loss_policy=LossPolicy.RANDOM, seed=3).compile()
+        restored = pickle.loads(pickle.dumps(random_system))
+        assert restored.RULES == random_system.RULES
+
+    def test_margin_based_reward_and_losses(self):
+        system = RuleSet(name="margin", reward_margin_percent=10, loser_reward=15,
+                         loss_margin_step=50, max_losses=3).compile()
+        byzantine = Army(Civilization.BYZANTINE)
+        chinese = Army(Civilization.CHINESE)
+
+        outcome = system.resolve_battle(byzantine, chinese)
+        assert outcome.result == BattleResult.WIN
+        assert (outcome.army1_gold_gained, outcome.army2_gold_gained) == (100 + 105 * 10 // 100, 15)
+        assert len(outcome.army2_removed) == 3
+        assert chinese.unit_count == 26
+        assert byzantine.gold == 1110
+
+    def test_tie_rules(self):
+        system = RuleSet(name="ties", tie_losses=2, tie_reward=7).compile()
+        army1, army2 = Army(Civilization.ENGLISH), Army(Civilization.ENGLISH)
+        outcome = system.resolve_battle(army1, army2)
+        assert outcome.result == BattleResult.TIE
+        assert army1.unit_count == army2.unit_count == 28
+        assert army1.gold == army2.gold == 1007
+
+    def test_weakest_losses(self):
+        system = RuleSet(name="weakest", loss_policy=LossPolicy.WEAKEST, losses_on_defeat=3).compile()
+        english = Army(Civilization.ENGLISH)
+        system.resolve_battle(Army(Civilization.BYZANTINE), english)
+        assert english.get_unit_counts() == {"Pikeman": 7, "Archer": 10, "Knight": 10}
+
+    def test_proportional_losses(self):
+        system = RuleSet(name="proportional", loss_policy=LossPolicy.PROPORTIONAL,
+                         losses_on_defeat=10).compile()
+        english = trained_army(Civilization.ENGLISH, 1)
+        outcome = system.compute_outcome(english, Army(Civilization.BYZANTINE))
+        # An even 10 : 10 : 10 army; the leftover loss goes to the first type,
+        # and the trained knight is the first knight lost
+        assert outcome.result == BattleResult.LOSS
+        assert outcome.army1_removed.count(("Pikeman", 5)) == 4
+        assert outcome.army1_removed.count(("Archer", 10)) == 3
+        assert outcome.army1_removed[:3] == (("Knight", 30), ("Knight", 20), ("Knight", 20))
+        assert len(outcome.army1_removed) == 10
+
+    def test_random_losses_are_seeded(self):
+        def removed(seed):
+            system = RuleSet(name=f"random-{seed}", loss_policy=LossPolicy.RANDOM,
+                             losses_on_defeat=6, seed=seed).compile()
+            chinese = Army(Civilization.CHINESE)
+            system.resolve_battle(Army(Civilization.BYZANTINE), chinese)
+            return chinese.get_unit_counts()
+
+        counts = removed(11)
+        assert sum(counts.values()) == 29 - 6
+        assert counts == removed(11)
+        assert [removed(seed) for seed in range(5)] == [removed(seed) for seed in range(5)]
+
+    def test_random_losses_cannot_be_cached(self):
+        system = RuleSet(name="random-cache", loss_policy=LossPolicy.RANDOM, seed=1).compile()
+        chinese = Army(Civilization.CHINESE)
+        with pytest.raises(ValueError):
+            system.resolve_battle(Army(Civilization.BYZANTINE), chinese, cache=BattleOutcomeCache())
+        assert chinese.unit_count == 29 and not chinese.battle_history
+
+    def test_assumed_losses_need_strongest_policy(self):
+        system = RuleSet(name="weak-predict", loss_policy=LossPolicy.WEAKEST).compile()
+        with pytest.raises(ValueError):
+            system.predict(Army(Civilization.ENGLISH), Army(Civilization.CHINESE), army1_losses=1)
+
+    def test_batch_matches_single_battles(self):
+        system = RuleSet(name="batch", reward_margin_percent=20, loss_margin_step=40,
+                         max_losses=6, tie_losses=2).compile()
+        armies = [trained_army(civilization, trained)
+                  for civilization in Civilization for trained in range(0, 6, 2)]
+        pairs = [(first, second) for first in armies for second in armies]
+        batch = system.compute_batch([first.total_strength for first, _ in pairs],
+                                     [second.total_strength for _, second in pairs])
+
+        for index, (first, second) in enumerate(pairs):
+            outcome = system.compute_outcome(first, second)
+            code = {BattleResult.WIN: 1, BattleResult.LOSS: -1, BattleResult.TIE: 0}[outcome.result]
+            assert batch.results[index] == code
+            assert (batch.gold1[index], batch.gold2[index]) == (outcome.army1_gold_gained,
+                                                                outcome.army2_gold_gained)
+            assert (batch.losses1[index], batch.losses2[index]) == (len(outcome.army1_removed),
+                                                                    len(outcome.army2_removed))
+
+    def test_resolve_many_fights_in_order(self):
+        system = RuleSet(name="many", winner_reward=40).compile()
+        byzantine, english, chinese = (Army(civilization) for civilization in
+                                       (Civilization.BYZANTINE, Civilization.ENGLISH, Civilization.CHINESE))
+        outcomes = system.resolve_many([(byzantine, english), (byzantine, chinese)])
+        assert [outcome.result for outcome in outcomes] == [BattleResult.WIN, BattleResult.WIN]
+        assert byzantine.gold == 1080
+
+    def test_campaigns_reject_unmodelled_rules(self):
+        with pytest.raises(ValueError):
+            CampaignSimulator.run(Army(Civilization.ENGLISH), Army(Civilization.CHINESE),
+                                  battle_system=RuleSet(name="c", loser_reward=5).compile())
+        result = CampaignSimulator.run(Army(Civilization.ENGLISH), Army(Civilization.CHINESE),
+                                       battle_system=RuleSet(name="c", winner_reward=50).compile())
+        assert result.army1_gold_gained == 50 * result.rounds
+
+    def test_invalid_rules(self):
+        with pytest.raises(ValueError):
+            RuleSet(losses_on_defeat=-1)
+        with pytest.raises(ValueError):
+            RuleSet(loss_margin_step=0)
+        with pytest.raises(ValueError):
+            RuleSet(losses_on_defeat=3, max_losses=1)
+        with pytest.raises(ValueError):
+            RuleSet(loss_margin_step=10, max_losses=-1)
+        with pytest.raises(ValueError):
+            RuleSet(loser_reward=-5)
+
+    def test_rule_values_must_be_ints(self):
+        for value in ("1; import os", 2.5, True):
+            with pytest.raises(TypeError):
+                RuleSet(winner_reward=value)
+        with pytest.raises(TypeError):
+            RuleSet(loss_margin_step=10, max_losses="3")
+
+    def test_coalitions_reject_unmodelled_rules(self):
+        side1 = [Army(Civilization.BYZANTINE), Army(Civilization.CHINESE)]
+        side2 = [Army(Civilization.ENGLISH)]
+        with pytest.raises(ValueError):
+            RuleSet(name="c", loser_reward=5).compile().resolve_coalition_battle(side1, side2)
+        assert side1[0].battle_history == []
+
+        outcome = RuleSet(name="c", winner_reward=50).compile().resolve_coalition_battle(side1, side2)
+        assert sum(outcome.side1_gold_gained) == 50
@@ -0,0 +1,119 @@
+import pytest
+from src.army import Army, InsufficientGoldError
+from src.civilizations import Civilization
+from src.battle import BattleResult
+from src.scheduler import EventScheduler, ATTACK, CALLBACK, TRAIN
+from src.units import Pikeman, Archer
+
+
+class TestEventScheduler:
+    
+    def test_events_run_in_time_order(self):
+        scheduler = EventScheduler()
+        order = []
+        scheduler.schedule(5, lambda s: order.append(("late", s.now)))
+        scheduler.schedule(1, lambda s: order.append(("early", s.now)))
+        scheduler.schedule(1, lambda s: order.append(("early-second", s.now)))
+        
+        stats = scheduler.run()
+        
+        assert order == [("early", 1), ("early-second", 1), ("late", 5)]
+        assert stats.events_processed == 3
+        assert stats.batches_processed == 2
+        assert scheduler.now == 5
+    
+    def test_training_and_attack_events(self):
+        scheduler = EventScheduler()
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        
+        # Training 8 archers lifts the Chinese army from 300 to 356 before the attack
+        scheduler.schedule_many((2, TRAIN, chinese, archer)
+                                for archer in chinese.get_units_by_type(Archer)[:8])
+        scheduler.schedule_attack(3, chinese, english)
+        scheduler.run()
+        
+        assert chinese.total_strength == 356
+        assert chinese.battle_history[0].result == BattleResult.WIN
+    
+    def test_transform_event(self):
+        scheduler = EventScheduler()
+        army = Army(Civilization.CHINESE)
+        scheduler.schedule_transform(1, army, army.get_units_by_type(Pikeman)[0])
+        
+        scheduler.run()
+        
+        assert army.get_unit_counts()["Archer"] == 26
+    
+    def test_run_until(self):
+        scheduler = EventScheduler()
+        seen = []
+        for time in (1, 2, 3):
+            scheduler.schedule(time, lambda s: seen.append(s.now))
+        
+        scheduler.run(until=2)
+        
+        assert seen == [1, 2]
+        assert scheduler.pending == 1
+        assert scheduler.next_time() == 3
+    
+    def test_listener_receives_results(self):
+        results = []
+        scheduler = EventScheduler(listener=lambda time, kind, result: results.append((time, kind, result.result)))
+        scheduler.schedule_attack(4, Army(Civilization.BYZANTINE), Army(Civilization.CHINESE))
+        
+        scheduler.run()
+        
+        assert results == [(4, ATTACK, BattleResult.WIN)]
+    
+    def test_errors_raise_or_collect(self):
+        army = Army(Civilization.CHINESE)
+        army._gold = 0
+        unit = army.get_units_by_type(Pikeman)[0]
+        
+        failing = EventScheduler()
+        failing.schedule_training(1, army, unit)
+        with pytest.raises(InsufficientGoldError):
+            failing.run()
+        
+        collecting = EventScheduler(collect_errors=True)
+        collecting.schedule_training(1, army, unit)
+        stats = collecting.run()
+        assert len(stats.errors) == 1
+        assert isinstance(stats.errors[0][2], InsufficientGoldError)
+    
+    def test_failed_event_keeps_the_rest_of_its_batch(self):
+        scheduler = EventScheduler()
+        chinese, english = Army(Civilization.CHINESE), Army(Civilization.ENGLISH)
+        
+        def fail(s):
+            raise RuntimeError("boom")
+        
+        scheduler.schedule(1, fail)
+        scheduler.schedule_attack(1, chinese, english)
+        scheduler.schedule_attack(1, english, chinese)
+        with pytest.raises(RuntimeError):
+            scheduler.run()
+        
+        assert scheduler.pending == 2
+        scheduler.run()
+        assert [record.result for record in english.battle_history] == [BattleResult.WIN, BattleResult.WIN]
+        assert scheduler.stats.events_processed == 3
+    
+    def test_cannot_schedule_in_the_past(self):
+        scheduler = EventScheduler(start_time=10)
+        
+        with pytest.raises(ValueError):
+            scheduler.schedule(5, lambda s: None)
+        with pytest.raises(ValueError):
+            scheduler.schedule_many([(1, "teleport", None, None)])
+    
+    def test_bad_bulk_event_schedules_nothing(self):
+        scheduler = EventScheduler(start_time=10)
+        scheduler.schedule(30, lambda s: None)
+        
+        with pytest.raises(ValueError):
+            scheduler.schedule_many([(20, CALLBACK, lambda s: None, None), (5, CALLBACK, lambda s: None, None)])
+        
+        assert scheduler.pending == 1
+        assert scheduler.next_time() == 30
@@ -0,0 +1,143 @@
+import random
+import pytest
+from src.army import Army
+from src.battle import BattleSystem
+from src.civilizations import Civilization
+from src.units import Knight
+from src.rules import LossPolicy, RuleSet
+from src.sharding import BattleFront, ShardedWorld, ShardError
+
+
+CIVILIZATIONS = [Civilization.CHINESE, Civilization.ENGLISH, Civilization.BYZANTINE]
+
+
+def army_state(army):
+    return ([(unit.__class__.__name__, unit.age_in_years, unit.additional_strength, unit.total_strength)
+             for unit in army.units],
+            army.gold, [str(record) for record in army.battle_history])
+
+
+def random_matchups(army_count, battles, seed):
+    rng = random.Random(seed)
+    return [tuple(rng.sample(range(army_count), 2)) for _ in range(battles)]
+
+
+def sequential(civilizations, matchups):
+    armies = [Army(civilization) for civilization in civilizations]
+    outcomes = [BattleSystem.resolve_battle(armies[first], armies[second])
+                for first, second in matchups]
+    return armies, outcomes
+
+
+class TestShardedWorld:
+
+    @pytest.mark.parametrize("shard_count", [1, 2, 3])
+    def test_matches_sequential_battles(self, shard_count):
+        civilizations = [CIVILIZATIONS[index % 3] for index in range(12)]
+        matchups = random_matchups(len(civilizations), 60, seed=shard_count)
+        armies, expected = sequential(civilizations, matchups)
+
+        with ShardedWorld(shard_count) as world:
+            for civilization in civilizations:
+                world.spawn(civilization)
+            outcomes = world.run_battles(matchups)
+            assert outcomes == expected
+            for army_id, army in enumerate(armies):
+                assert army_state(world.to_army(army_id)) == army_state(army)
+            assert world.strengths() == {army_id: army.total_strength
+                                         for army_id, army in enumerate(armies)}
+
+    def test_armies_are_partitioned_by_id(self):
+        with ShardedWorld(3) as world:
+            assert world.spawn(Civilization.ENGLISH, count=5) == [0, 1, 2, 3, 4]
+            assert [world.shard_of(army_id) for army_id in range(5)] == [0, 1, 2, 0, 1]
+            with pytest.raises(IndexError):
+                world.shard_of(5)
+
+    def test_local_and_cross_shard_battles_are_counted(self):
+        with ShardedWorld(2) as world:
+            world.spawn(Civilization.BYZANTINE, count=4)
+            world.run_battles([(0, 2), (1, 3), (0, 1), (2, 3)])
+            stats = world.stats
+            assert stats.battles == 4
+            assert stats.local_battles == 2
+            assert stats.cross_shard_battles == 2
+            assert stats.waves == 2
+
+    def test_added_army_keeps_its_state(self):
+        army = Army(Civilization.CHINESE)
+        for knight in army.get_units_by_type(Knight):
+            army.train_unit(knight)
+        army.attack(Army(Civilization.ENGLISH))
+
+        with ShardedWorld(2) as world:
+            world.spawn(Civilization.ENGLISH)
+            army_id = world.add(army)
+            assert world.shard_of(army_id) == 1
+            assert army_state(world.to_army(army_id)) == army_state(army)
+
+            expected = BattleSystem.resolve_battle(army, Army(Civilization.ENGLISH))
+            assert world.run_battles([(army_id, 0)]) == [expected]
+            assert army_state(world.to_army(army_id)) == army_state(army)
+
+    def test_invalid_matchups_are_rejected(self):
+        with ShardedWorld(2) as world:
+            world.spawn(Civilization.CHINESE, count=2)
+            with pytest.raises(ValueError):
+                world.run_battles([(0, 0)])
+            with pytest.raises(IndexError):
+                world.run_battles([(0, 7)])
+
+    def test_rejects_rules_fronts_cannot_express(self):
+        with pytest.raises(ValueError):
+            ShardedWorld(1, battle_system=RuleSet(name="weakest", loss_policy=LossPolicy.WEAKEST).compile())
+        with pytest.raises(ValueError):
+            ShardedWorld(1, battle_system=RuleSet(name="unbounded", loss_margin_step=10).compile())
+
+    def test_compiled_rules_across_shards(self):
+        rules = RuleSet(name="sharded", reward_margin_percent=50, loss_margin_step=30, max_losses=4)
+        system = rules.compile()
+        civilizations = [CIVILIZATIONS[index % 3] for index in range(6)]
+        matchups = random_matchups(len(civilizations), 20, seed=5)
+        armies = [Army(civilization) for civilization in civilizations]
+        expected = [system.resolve_battle(armies[first], armies[second]) for first, second in matchups]
+
+        with ShardedWorld(2, battle_system=system) as world:
+            for civilization in civilizations:
+                world.spawn(civilization)
+            assert world.run_battles(matchups) == expected
+            assert world.strengths() == {army_id: army.total_strength
+                                         for army_id, army in enumerate(armies)}
+
+    def test_compiled_rules_in_spawned_shards(self):
+        system = RuleSet(name="spawned", winner_reward=60, max_losses=3, loss_margin_step=40).compile()
+        armies = [Army(civilization) for civilization in CIVILIZATIONS]
+        expected = [system.resolve_battle(armies[0], armies[1]), system.resolve_battle(armies[2], armies[1])]
+
+        with ShardedWorld(2, battle_system=system, start_method="spawn") as world:
+            for civilization in CIVILIZATIONS:
+                world.spawn(civilization)
+            assert world.run_battles([(0, 1), (2, 1)]) == expected
+            assert world.strengths() == {army_id: army.total_strength
+                                         for army_id, army in enumerate(armies)}
+
+    def test_closed_world_rejects_commands(self):
+        world = ShardedWorld(1)
+        world.close()
+        world.close()
+        with pytest.raises(ShardError):
+            world.spawn(Civilization.CHINESE)
+
+
+class TestBattleFront:
+
+    def test_answers_compute_outcome(self):
+        army1 = Army(Civilization.BYZANTINE)
+        army2 = Army(Civilization.ENGLISH)
+        front1 = BattleFront(0, army1.civilization_id, "Byzantine", army1.total_strength,
+                             army1._strongest_keys(2))
+        front2 = BattleFront(1, army2.civilization_id, "English", army2.total_strength,
+                             army2._strongest_keys(2))
+        assert (BattleSystem.compute_outcome(front1, front2)
+                == BattleSystem.compute_outcome(army1, army2))
+        assert front1.strength_after_losses(1) == army1.strength_after_losses(1)
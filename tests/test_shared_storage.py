@@ -0,0 +1,108 @@
+import multiprocessing
+import pickle
+import pytest
+from src.aging import WorldClock
+from src.army import Army, InsufficientGoldError
+from src.civilizations import Civilization
+from src.shared_storage import SharedArmyStore, SharedStorageError
+from src.units import Archer
+
+
+def train_first_archers(store, count):
+    with store.writing():
+        for index in range(store.unit_count):
+            if count and store.unit(index)[0] == "Archer":
+                store.train_unit(index)
+                count -= 1
+    store.close()
+
+
+@pytest.fixture
+def store():
+    army = Army(Civilization.CHINESE)
+    army.train_unit(army.get_units_by_type(Archer)[0])
+    shared = SharedArmyStore.create(army, capacity=40)
+    yield shared
+    shared.close()
+    shared.unlink()
+
+
+class TestSharedArmyStore:
+    
+    def test_round_trip(self, store):
+        army = store.to_army()
+        
+        assert army.civilization == Civilization.CHINESE
+        assert army.gold == 980
+        assert army.total_strength == 307
+        assert army.get_unit_counts() == {"Pikeman": 2, "Archer": 25, "Knight": 2}
+        assert store.total_strength == 307
+        assert store.capacity == 40
+    
+    def test_in_place_training(self, store):
+        index = next(i for i in range(store.unit_count) if store.unit(i)[0] == "Knight")
+        
+        assert store.train_unit(index) == 30
+        assert store.unit(index) == ("Knight", 10, 0)
+        assert store.unit_strength(index) == 30
+        assert store.gold == 950
+        
+        store.add_gold(-store.gold)
+        with pytest.raises(InsufficientGoldError):
+            store.train_unit(index)
+    
+    def test_attach_by_name(self, store):
+        other = SharedArmyStore.attach(store.name, store.lock)
+        other.add_gold(20)
+        
+        assert store.gold == 1000
+        assert not other.is_owner
+        assert other.lock is store.lock
+        with pytest.raises(SharedStorageError):
+            other.unlink()
+        other.close()
+    
+    def test_attach_needs_the_creators_lock(self, store):
+        with pytest.raises(SharedStorageError):
+            SharedArmyStore.attach(store.name, None)
+    
+    def test_only_process_arguments_carry_the_store(self, store):
+        with pytest.raises(RuntimeError):
+            pickle.dumps(store)
+    
+    def test_strength_includes_age_penalty(self):
+        army = Army(Civilization.ENGLISH)
+        WorldClock().tick([army], years=35)
+        shared = SharedArmyStore.create(army)
+        try:
+            assert [shared.unit_strength(i) for i in range(shared.unit_count)] == \
+                [unit.total_strength for unit in army.units]
+            assert shared.total_strength == army.total_strength
+            assert shared.to_army().total_strength == army.total_strength
+        finally:
+            shared.close()
+            shared.unlink()
+    
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                        reason="requires fork start method")
+    def test_worker_updates_in_place(self, store):
+        context = multiprocessing.get_context("fork")
+        worker = context.Process(target=train_first_archers, args=(store, 5))
+        worker.start()
+        worker.join()
+        
+        assert worker.exitcode == 0
+        assert store.gold == 980 - 5 * 20
+        army = Army(Civilization.CHINESE)
+        store.store_into(army)
+        assert army.total_strength == 307 + 5 * 7
+    
+    def test_capacity_checks(self):
+        army = Army(Civilization.ENGLISH)
+        
+        with pytest.raises(SharedStorageError):
+            SharedArmyStore.create(army, capacity=10)
+    
+    def test_index_checks(self, store):
+        with pytest.raises(IndexError):
+            store.unit(29)
@@ -0,0 +1,110 @@
+import pytest
+from itertools import islice
+from src.army import Army
+from src.civilizations import Civilization
+from src.battle import BattleResult
+from src.streaming import stream_battles, stream_tournament, stream_campaign, StreamTally
+
+
+class TestStreamBattles:
+    
+    def test_battles_are_fought_lazily(self):
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        events = stream_battles([(chinese, english), (english, chinese)])
+        
+        assert len(chinese.battle_history) == 0
+        
+        first = next(events)
+        assert len(chinese.battle_history) == 1
+        assert first.outcome.result == BattleResult.LOSS
+        assert first.winner is english
+        
+        second = next(events)
+        assert second.sequence == 1
+        assert len(chinese.battle_history) == 2
+    
+    def test_deltas_describe_the_change(self):
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        
+        event = next(stream_battles([(chinese, english)]))
+        
+        assert event.army1_delta.gold_change == 0
+        assert event.army1_delta.units_lost == 2
+        assert event.army1_delta.strength_change == -40
+        assert event.army2_delta.gold_change == 100
+        assert event.army2_delta.strength_change == 0
+    
+    def test_without_history(self):
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        
+        list(stream_battles([(chinese, english)] * 5, keep_history=False))
+        
+        assert chinese.battle_history == []
+        assert english.battle_history == []
+        assert chinese.unit_count == 19
+
+
+class TestStreamTournament:
+    
+    def test_round_robin_order(self):
+        armies = [Army(Civilization.CHINESE), Army(Civilization.ENGLISH), Army(Civilization.BYZANTINE)]
+        
+        events = list(stream_tournament(armies, rounds=2))
+        
+        assert len(events) == 6
+        assert [event.sequence for event in events] == list(range(6))
+        assert [event.round for event in events] == [0, 0, 0, 1, 1, 1]
+        assert (events[0].army1, events[0].army2) == (armies[0], armies[1])
+        assert (events[2].army1, events[2].army2) == (armies[1], armies[2])
+    
+    def test_stops_when_consumer_stops(self):
+        armies = [Army(Civilization.CHINESE), Army(Civilization.ENGLISH), Army(Civilization.BYZANTINE)]
+        
+        list(islice(stream_tournament(armies, rounds=10), 2))
+        
+        assert sum(len(army.battle_history) for army in armies) == 4
+    
+    def test_duplicate_armies_rejected(self):
+        army = Army(Civilization.CHINESE)
+        
+        with pytest.raises(ValueError):
+            list(stream_tournament([army, army]))
+    
+    def test_tally(self):
+        chinese = Army(Civilization.CHINESE)
+        english = Army(Civilization.ENGLISH)
+        byzantine = Army(Civilization.BYZANTINE)
+        
+        tally = StreamTally().consume(stream_tournament([chinese, english, byzantine]))
+        
+        assert tally.battles == 3
+        assert tally.ties == 0
+        assert tally.wins(byzantine) == 2
+        assert tally.gold_gained(byzantine) == 200
+        assert tally.units_lost(chinese) == 4
+        assert tally.standings()[0] == (byzantine, 2)
+
+
+class TestStreamCampaign:
+    
+    def test_runs_until_elimination(self):
+        chinese = Army(Civilization.CHINESE)
+        byzantine = Army(Civilization.BYZANTINE)
+        
+        events = list(stream_campaign(chinese, byzantine))
+        
+        assert chinese.unit_count == 0
+        assert [event.round for event in events] == list(range(len(events)))
+        assert all(event.outcome.result == BattleResult.LOSS for event in events)
+    
+    def test_max_rounds(self):
+        chinese = Army(Civilization.CHINESE)
+        byzantine = Army(Civilization.BYZANTINE)
+        
+        events = list(stream_campaign(chinese, byzantine, max_rounds=3))
+        
+        assert len(events) == 3
+        assert chinese.unit_count == 23
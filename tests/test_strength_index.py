@@ -0,0 +1,41 @@
+from src.strength_index import StrengthIndex
+
+
+class TestStrengthIndex:
+    
+    def make_index(self):
+        return StrengthIndex({("Pikeman", 5): 3, ("Archer", 17): 1, ("Knight", 20): 2, ("Pikeman", 20): 1})
+    
+    def test_totals(self):
+        index = self.make_index()
+        
+        assert index.unit_count == 7
+        assert index.total_strength == 15 + 17 + 40 + 20
+    
+    def test_top_keys_prefers_higher_class_on_ties(self):
+        index = self.make_index()
+        
+        assert index.top_keys(4) == (("Knight", 20), ("Knight", 20), ("Pikeman", 20), ("Archer", 17))
+        assert index.top_keys(2, skip=2) == (("Pikeman", 20), ("Archer", 17))
+        assert index.top_keys(5, skip=5) == (("Pikeman", 5), ("Pikeman", 5))
+        assert index.top_keys(1, skip=7) == ()
+    
+    def test_strength_without_top(self):
+        index = self.make_index()
+        
+        assert index.top_strength(0) == 0
+        assert index.top_strength(3) == 60
+        assert index.strength_without_top(4) == 15
+        assert index.strength_without_top(10) == 0
+    
+    def test_bucket_updates(self):
+        histogram = {("Archer", 10): 2}
+        index = StrengthIndex(histogram)
+        
+        histogram[("Knight", 30)] = 1
+        index.bucket_added(("Knight", 30))
+        assert index.top_keys(1) == (("Knight", 30),)
+        
+        del histogram[("Archer", 10)]
+        index.bucket_removed(("Archer", 10))
+        assert index.total_strength == 30
@@ -0,0 +1,108 @@
+import pytest
+from src.army import Army
+from src.battle import BattleResult, BattleSystem
+from src.catalog import CivilizationCatalog
+from src.civilizations import Civilization, CivilizationConfig
+from src.units import Pikeman, Archer, Knight
+from src.sweep import (CompositionSweep, SweepCache, SweepPolicy, apply_policy, composition_grid,
+                       policy_strengths, sample_compositions)
+
+
+POLICIES = [
+    SweepPolicy("idle"),
+    SweepPolicy("knights", train=(Knight, Archer, Pikeman)),
+    SweepPolicy("upgrade", transform=(Pikeman, Archer), train=(Pikeman, Archer)),
+    SweepPolicy("careful", transform=(Archer,), train=(Archer,), reserve=400),
+]
+
+
+def army_for(composition, policy):
+    catalog = CivilizationCatalog()
+    civilization = catalog.register("TRIAL", *composition)
+    army = Army(civilization)
+    army._gold = policy.gold
+    apply_policy(army, policy)
+    return army
+
+
+def brute_force_score(first, second):
+    army1 = army_for(*first)
+    army2 = army_for(*second)
+    result = BattleSystem.resolve_battle(army1, army2).result
+    return {BattleResult.WIN: 1.0, BattleResult.TIE: 0.5, BattleResult.LOSS: 0.0}[result]
+
+
+class TestPolicyStrengths:
+
+    @pytest.mark.parametrize("policy", POLICIES, ids=lambda policy: policy.name)
+    def test_matches_armies(self, policy):
+        compositions = list(composition_grid(range(0, 12, 5), range(0, 30, 9), range(0, 20, 6)))
+        strengths = policy_strengths(compositions, policy)
+        for composition, strength in zip(compositions, strengths):
+            assert strength == army_for(composition, policy).total_strength
+
+    def test_knights_cannot_be_transformed(self):
+        with pytest.raises(ValueError):
+            SweepPolicy("bad", transform=(Knight,))
+
+
+class TestCompositionSweep:
+
+    def test_win_rates_and_matrix_match_battles(self):
+        compositions = [(2, 25, 2), (10, 10, 10), (5, 8, 15), (0, 0, 40), (30, 0, 0)]
+        result = CompositionSweep(POLICIES[:3]).run(compositions)
+
+        matrix = result.matrix()
+        for row, first in enumerate(compositions):
+            for column, second in enumerate(compositions):
+                expected = sum(brute_force_score((first, mine), (second, theirs))
+                               for mine in POLICIES[:3] for theirs in POLICIES[:3]) / 9
+                assert matrix[row][column] == pytest.approx(expected)
+            others = [matrix[row][column] for column in range(len(compositions)) if column != row]
+            assert result.win_rate(first) == pytest.approx(sum(others) / len(others))
+
+    def test_accepts_civilization_configs(self):
+        result = CompositionSweep(POLICIES[:1]).run(
+            [civilization.config for civilization in Civilization])
+        assert result.compositions == [(2, 25, 2), (10, 10, 10), (5, 8, 15)]
+        assert result.strength(CivilizationConfig(5, 8, 15), POLICIES[0]) == 405
+        assert result.win_rate(Civilization.BYZANTINE.config) == 1.0
+
+    def test_pareto_front(self):
+        compositions = [(1, 0, 0), (0, 0, 1), (2, 0, 0), (0, 2, 0), (0, 0, 2), (3, 0, 0)]
+        front = CompositionSweep([SweepPolicy("idle")]).run(compositions).pareto_front()
+
+        assert [entry.composition for entry in front] == [(0, 0, 1), (0, 0, 2)]
+        assert [entry.cost for entry in front] == [1, 2]
+        assert front[-1].config == CivilizationConfig(0, 0, 2)
+
+    def test_cache_skips_evaluated_compositions(self):
+        cache = SweepCache()
+        sweep = CompositionSweep(POLICIES, cache=cache)
+        sweep.run(composition_grid(range(3), range(3), range(1, 3)))
+        assert (cache.hits, cache.misses) == (0, 18)
+
+        result = sweep.run(composition_grid(range(4), range(3), range(1, 3)))
+        assert (cache.hits, cache.misses) == (18, 24)
+        assert len(cache) == 24 * len(POLICIES)
+        assert len(result.compositions) == 24
+
+    def test_process_pool_matches_in_process(self):
+        compositions = sample_compositions(300, 30, seed=7)
+        serial = CompositionSweep(POLICIES).run(compositions)
+        pooled = CompositionSweep(POLICIES, workers=2, chunk_size=50).run(compositions)
+        assert list(pooled.win_rates) == list(serial.win_rates)
+        assert pooled.pareto_front() == serial.pareto_front()
+
+    def test_needs_two_compositions(self):
+        with pytest.raises(ValueError):
+            CompositionSweep(POLICIES).run([(1, 1, 1), (1, 1, 1)])
+
+
+class TestSampleCompositions:
+
+    def test_distinct_and_seeded(self):
+        sample = sample_compositions(50, 10, seed=3)
+        assert len(set(sample)) == 50
+        assert sample == sample_compositions(50, 10, seed=3)
+        assert all(any(composition) and max(composition) <= 10 for composition in sample)
@@ -0,0 +1,100 @@
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.checkpoint import CheckpointError, load_checkpoint
+from src.tournament import TournamentRunner
+
+
+def make_armies():
+    return {
+        "chinese": Army(Civilization.CHINESE),
+        "english": Army(Civilization.ENGLISH),
+        "byzantine": Army(Civilization.BYZANTINE),
+        "english2": Army(Civilization.ENGLISH),
+    }
+
+
+def summary(runner):
+    return ([(name, standing.wins, standing.losses, standing.ties, standing.gold_gained)
+             for name, standing in runner.standings()],
+            {name: (army.gold, army.total_strength, army.unit_count, len(army.battle_history))
+             for name, army in runner.armies.items()})
+
+
+class TestTournamentRunner:
+    
+    def test_runs_every_pairing_each_round(self):
+        runner = TournamentRunner(make_armies(), rounds=3, seed=7)
+        
+        standings = runner.run()
+        
+        assert runner.finished
+        assert runner.battles_fought == runner.total_battles == 18
+        assert sum(standing.battles for _, standing in standings) == 36
+        assert all(standing.battles == 9 for _, standing in standings)
+    
+    def test_seed_makes_runs_reproducible(self):
+        first = TournamentRunner(make_armies(), rounds=3, seed=11)
+        second = TournamentRunner(make_armies(), rounds=3, seed=11)
+        first.run()
+        second.run()
+        
+        assert summary(first) == summary(second)
+    
+    def test_resume_gives_identical_results(self, tmp_path):
+        expected = TournamentRunner(make_armies(), rounds=4, seed=3)
+        expected.run()
+        
+        path = str(tmp_path / "tournament.ckpt")
+        interrupted = TournamentRunner(make_armies(), rounds=4, seed=3,
+                                       checkpoint_path=path, checkpoint_every=2)
+        interrupted.run(max_battles=9)
+        interrupted.close()
+        
+        resumed = TournamentRunner.resume(path, checkpoint_every=2)
+        assert resumed.battles_fought == 9
+        resumed.run()
+        resumed.close()
+        
+        assert summary(resumed) == summary(expected)
+    
+    def test_resume_ignores_uncommitted_tail(self, tmp_path):
+        path = str(tmp_path / "tournament.ckpt")
+        runner = TournamentRunner(make_armies(), rounds=2, seed=5,
+                                  checkpoint_path=path, checkpoint_every=4)
+        runner.run(max_battles=4)
+        runner.close()
+        committed = load_checkpoint(path)
+        with open(path, "a") as handle:
+            handle.write('{"kind":"delta","army":"chinese","gold":500}\n{"kind":"del')
+        
+        resumed = TournamentRunner.resume(path)
+        
+        assert resumed.battles_fought == 4
+        assert resumed.armies["chinese"].gold == committed["chinese"].gold
+        resumed.close()
+    
+    def test_checkpoints_are_incremental(self, tmp_path):
+        path = str(tmp_path / "tournament.ckpt")
+        runner = TournamentRunner(make_armies(), rounds=1, seed=1,
+                                  checkpoint_path=path, checkpoint_every=1)
+        runner.run()
+        runner.close()
+        
+        with open(path) as handle:
+            kinds = [line.split('"kind":"')[1].split('"')[0] for line in handle]
+        assert kinds.count("snapshot") == 4
+        assert kinds.count("commit") == 7
+        assert kinds.count("delta") <= 12
+    
+    def test_validation(self, tmp_path):
+        army = Army(Civilization.CHINESE)
+        with pytest.raises(ValueError):
+            TournamentRunner({"a": army})
+        with pytest.raises(ValueError):
+            TournamentRunner({"a": army, "b": army})
+        
+        path = tmp_path / "plain.ckpt"
+        path.write_text("")
+        with pytest.raises(CheckpointError):
+            TournamentRunner.resume(str(path))
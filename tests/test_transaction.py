@@ -0,0 +1,114 @@
+import pytest
+from src.army import Army, InsufficientGoldError, InvalidTransformationError
+from src.civilizations import Civilization
+from src.transaction import ArmyTransaction, TransactionError
+from src.units import Pikeman, Archer, Knight
+
+
+class TestArmyTransaction:
+    
+    def test_batch_matches_sequential_calls(self):
+        batched = Army(Civilization.ENGLISH)
+        sequential = Army(Civilization.ENGLISH)
+        
+        with ArmyTransaction(batched) as tx:
+            tx.train_all(Archer)
+            for pikeman in batched.get_units_by_type(Pikeman)[:3]:
+                tx.transform(pikeman)
+        sequential.train_all_units_of_type(Archer)
+        for pikeman in sequential.get_units_by_type(Pikeman)[:3]:
+            sequential.transform_unit(pikeman)
+        
+        assert tx.result.gold_spent == 10 * 20 + 3 * 30
+        assert tx.result.trained == 10
+        assert all(isinstance(unit, Archer) for unit in tx.result.transformed)
+        assert batched.gold == sequential.gold
+        assert batched.get_unit_counts() == sequential.get_unit_counts()
+        assert batched.state_fingerprint() == sequential.state_fingerprint()
+    
+    def test_train_all_includes_units_transformed_earlier(self):
+        batched = Army(Civilization.ENGLISH)
+        sequential = Army(Civilization.ENGLISH)
+        
+        with ArmyTransaction(batched) as tx:
+            tx.transform(batched.get_units_by_type(Pikeman)[0])
+            tx.train_all(Archer)
+            tx.train_all(Archer)
+        sequential.transform_unit(sequential.get_units_by_type(Pikeman)[0])
+        sequential.train_all_units_of_type(Archer)
+        sequential.train_all_units_of_type(Archer)
+        
+        assert tx.result.trained == 22
+        assert tx.result.gold_spent == 30 + 22 * 20
+        assert tx.result.transformed[0].total_strength == 24
+        assert batched.gold == sequential.gold == 530
+        assert batched.total_strength == sequential.total_strength == 509
+        assert batched.state_fingerprint() == sequential.state_fingerprint()
+    
+    def test_insufficient_gold_applies_nothing(self):
+        army = Army(Civilization.ENGLISH)
+        army._gold = 100
+        before = army.state_fingerprint()
+        
+        with pytest.raises(InsufficientGoldError):
+            with ArmyTransaction(army) as tx:
+                tx.train_all(Knight)
+        
+        assert army.state_fingerprint() == before
+    
+    def test_invalid_operation_applies_nothing(self):
+        army = Army(Civilization.CHINESE)
+        before = army.state_fingerprint()
+        
+        tx = ArmyTransaction(army)
+        tx.train(army.get_units_by_type(Archer)[0])
+        tx.transform(army.get_units_by_type(Knight)[0])
+        
+        with pytest.raises(InvalidTransformationError):
+            tx.commit()
+        assert army.state_fingerprint() == before
+    
+    def test_transformed_unit_cannot_be_reused(self):
+        army = Army(Civilization.CHINESE)
+        pikeman = army.get_units_by_type(Pikeman)[0]
+        
+        with pytest.raises(ValueError, match="Unit is not part of this army"):
+            ArmyTransaction(army).transform(pikeman).train(pikeman).commit()
+    
+    def test_rollback_on_apply_error(self):
+        army = Army(Civilization.CHINESE)
+        archer = army.get_units_by_type(Archer)[0]
+        units_before = army.units
+        fingerprint_before = army.state_fingerprint()
+        
+        def failing_watcher(_army):
+            raise RuntimeError("observer failed")
+        
+        army.add_strength_watcher(failing_watcher)
+        with pytest.raises(RuntimeError):
+            ArmyTransaction(army).train(archer).transform(army.get_units_by_type(Pikeman)[0]).commit()
+        army.remove_strength_watcher(failing_watcher)
+        
+        assert army.units == units_before
+        assert archer.total_strength == 10
+        assert army.state_fingerprint() == fingerprint_before
+    
+    def test_block_error_discards_operations(self):
+        army = Army(Civilization.CHINESE)
+        
+        with pytest.raises(KeyError):
+            with ArmyTransaction(army) as tx:
+                tx.train_all(Archer)
+                raise KeyError("abort")
+        
+        assert army.gold == 1000
+        assert tx.result is None
+    
+    def test_commit_only_once(self):
+        tx = ArmyTransaction(Army(Civilization.CHINESE))
+        tx.commit()
+        
+        with pytest.raises(TransactionError):
+            tx.commit()
+        with pytest.raises(TransactionError):
+            tx.train_all(Archer)
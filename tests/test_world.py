@@ -0,0 +1,141 @@
+import pytest
+from src.army import Army
+from src.civilizations import Civilization
+from src.battle import BattleResult
+from src.units import Pikeman, Archer, Knight
+from src.world import ArmyWorld, EconomyRules
+
+
+class TestArmyWorld:
+    
+    def test_spawn_matches_regular_armies(self):
+        world = ArmyWorld()
+        handles = world.spawn(Civilization.BYZANTINE, count=3)
+        
+        assert len(world) == 3
+        for handle in handles:
+            assert handle.civilization == Civilization.BYZANTINE
+            assert handle.total_strength == Army(Civilization.BYZANTINE).total_strength
+            assert handle.get_unit_counts() == {"Pikeman": 5, "Archer": 8, "Knight": 15}
+            assert handle.gold == 1000
+    
+    def test_add_and_materialize_round_trip(self):
+        army = Army(Civilization.ENGLISH)
+        for knight in army.get_units_by_type(Knight)[:4]:
+            army.train_unit(knight)
+        world = ArmyWorld()
+        
+        handle = world.add(army)
+        restored = handle.to_army()
+        
+        assert handle.total_strength == army.total_strength == 390
+        assert restored.total_strength == army.total_strength
+        assert restored.gold == army.gold
+        assert restored.get_unit_counts() == army.get_unit_counts()
+        assert sorted(unit.total_strength for unit in restored.units) == \
+            sorted(unit.total_strength for unit in army.units)
+    
+    def test_uneven_training_is_rejected(self):
+        army = Army(Civilization.ENGLISH)
+        knight = army.get_units_by_type(Knight)[0]
+        for _ in range(5):
+            army.train_unit(knight)
+        
+        world = ArmyWorld()
+        
+        with pytest.raises(ValueError):
+            world.add(army)
+        assert len(world) == 0
+    
+    def test_round_trip_fights_like_the_army(self):
+        army = Army(Civilization.ENGLISH)
+        for knight in army.get_units_by_type(Knight)[:3]:
+            army.train_unit(knight)
+        for archer in army.get_units_by_type(Archer)[:2]:
+            army.train_unit(archer)
+        world = ArmyWorld()
+        handle = world.add(army)
+        attacker = world.spawn(Civilization.BYZANTINE)[0]
+        
+        world.resolve_battle(attacker.index, handle.index)
+        Army(Civilization.BYZANTINE).attack(army)
+        
+        assert handle.total_strength == army.total_strength == 394 - 2 * 30
+        assert handle.get_unit_counts() == army.get_unit_counts()
+        assert handle.gold == army.gold
+        assert sorted(unit.total_strength for unit in handle.to_army().units) == \
+            sorted(unit.total_strength for unit in army.units)
+    
+    def test_aged_units_are_rejected(self):
+        # Even before any penalty applies, the age itself would be lost
+        for age in (40, 10):
+            with pytest.raises(ValueError):
+                ArmyWorld().add(Army.from_units(Civilization.ENGLISH, [Knight(age)]))
+    
+    def test_tick_income_and_upkeep(self):
+        world = ArmyWorld()
+        chinese, english = world.spawn(Civilization.CHINESE)[0], world.spawn(Civilization.ENGLISH)[0]
+        
+        report = world.tick(EconomyRules(income=50, upkeep=(1, 2, 5)))
+        
+        assert chinese.gold == 1000 + 50 - (2 * 1 + 25 * 2 + 2 * 5)
+        assert english.gold == 1000 + 50 - (10 * 1 + 10 * 2 + 10 * 5)
+        assert report.income_paid == 100
+        assert report.upkeep_paid == 62 + 80
+    
+    def test_upkeep_never_leaves_negative_gold(self):
+        world = ArmyWorld()
+        handle = world.spawn(Civilization.ENGLISH, gold=30)[0]
+        
+        report = world.tick(EconomyRules(upkeep=(0, 0, 10)))
+        
+        assert handle.gold == 0
+        assert report.upkeep_paid == 30
+    
+    def test_auto_train_matches_train_all(self):
+        world = ArmyWorld()
+        handle = world.spawn(Civilization.CHINESE, gold=350)[0]
+        army = Army(Civilization.CHINESE)
+        army._gold = 350
+        
+        report = world.tick(EconomyRules(auto_train=Archer, reserve=0))
+        army.train_all_units_of_type(Archer)
+        
+        assert report.units_trained == 17
+        assert report.training_gold == 340
+        assert handle.gold == army.gold == 10
+        assert handle.total_strength == army.total_strength
+        assert sorted(unit.total_strength for unit in handle.to_army().units) == \
+            sorted(unit.total_strength for unit in army.units)
+    
+    def test_auto_train_keeps_reserve_and_spreads_training(self):
+        world = ArmyWorld()
+        handle = world.spawn(Civilization.ENGLISH, gold=500)[0]
+        
+        for _ in range(3):
+            world.tick(EconomyRules(auto_train=Pikeman, reserve=400))
+        
+        assert handle.gold == 400
+        pikemen = [unit.total_strength for unit in handle.to_army().get_units_by_type(Pikeman)]
+        assert sorted(pikemen) == [8] * 10
+    
+    def test_battles_write_back(self):
+        world = ArmyWorld()
+        chinese = world.spawn(Civilization.CHINESE)[0]
+        byzantine = world.spawn(Civilization.BYZANTINE)[0]
+        
+        outcome = world.resolve_battle(chinese.index, byzantine.index)
+        
+        assert outcome.result == BattleResult.LOSS
+        assert chinese.unit_count == 27
+        assert chinese.total_strength == 260
+        assert byzantine.gold == 1100
+    
+    def test_strengths_column(self):
+        world = ArmyWorld()
+        world.spawn(Civilization.CHINESE, count=2)
+        world.spawn(Civilization.ENGLISH)
+        
+        assert list(world.strengths()) == [300, 300, 350]
+        assert world.total_gold() == 3000
+        assert [handle.index for handle in world] == [0, 1, 2]